@@ -0,0 +1,14 @@
+from django.core.cache import caches
+
+import pytest
+from flexdentaldemoapi.tokens import revoked_tokens
+from kanban.cache import snapshots
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Row ids are reused between tests, so cached data must not be."""
+    for cache in caches.all():
+        cache.clear()
+    snapshots.reset_stats()
+    revoked_tokens.reset()
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class FlexDentalDemoConfig(AppConfig):
+    name = "flexdentaldemoapi"
+
+    def ready(self):
+        # Connect the signal receivers, before any request or command can
+        # change a user, group, or permission.
+        from . import auth
+
+        auth.connect()
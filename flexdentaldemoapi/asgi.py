@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flexdentaldemoapi.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Board event streams are served in front of Django (see kanban.asgi).
+from kanban.asgi import BoardEventStream  # noqa: E402
+
+application = BoardEventStream(django_application)
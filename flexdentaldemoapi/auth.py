@@ -0,0 +1,118 @@
+"""
+Authentication from the cache.
+
+An authenticated request otherwise reads its session, its user, and the
+user's permissions (through their groups, and directly) from the
+database, every time. Here:
+
+- Sessions are read from the cache (SESSION_ENGINE is cached_db, which
+  falls back to the database only on a miss).
+- CachedModelBackend keeps each user, by id, until the user is saved or
+  deleted.
+- It also keeps each user's permission set, under a token that changes
+  whenever a group, a permission, or who has which of them changes.
+  Those changes are rare, and may affect any number of users.
+
+So a request whose session, user, and permissions are cached runs no
+queries to authenticate. Any AUTH_USER_MODEL that ModelBackend works
+with will do: the stock User, or todo.DemoUser.
+
+As with VersionToken, use a cache shared by every process when running
+more than one; otherwise, a change seen by one process may go unseen by
+the others until their entries expire (see AUTH_CACHE).
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .conditional import VersionToken
+
+permissions_version = VersionToken("auth:permissions:version")
+
+
+def user_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def permissions_key(user_id):
+    return f"auth:user:{user_id}:permissions:{permissions_version.get()}"
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, reading users and their permissions from the cache."""
+
+    def get_user(self, user_id):
+        key = user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, timeout=settings.AUTH_CACHE["timeout"])
+        return user
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        # ModelBackend keeps the set on the user for the rest of the request.
+        if not hasattr(user_obj, "_perm_cache"):
+            key = permissions_key(user_obj.pk)
+            permissions = cache.get(key)
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                cache.set(key, permissions, timeout=settings.AUTH_CACHE["timeout"])
+            user_obj._perm_cache = permissions
+        return user_obj._perm_cache
+
+    def _get_user_permissions(self, user_obj):
+        return Permission.objects.filter(
+            pk__in=related_ids(user_obj, "user_permissions")
+        )
+
+    def _get_group_permissions(self, user_obj):
+        return Permission.objects.filter(group__in=related_ids(user_obj, "groups"))
+
+
+def related_ids(user, field_name):
+    """
+    The ids of a user's groups or permissions, read from the join table
+    alone. ModelBackend's own queries go through the reverse query name
+    "user", which the stock User and todo.DemoUser both claim while both
+    are installed, and so may join the other model's table.
+    """
+
+    field = user._meta.get_field(field_name)
+    return field.remote_field.through.objects.filter(
+        **{field.m2m_field_name(): user.pk}
+    ).values(field.m2m_reverse_field_name())
+
+
+def forget_user(sender, instance, **kwargs):
+    cache.delete_many([user_key(instance.pk), permissions_key(instance.pk)])
+
+
+def forget_permissions(sender, action=None, **kwargs):
+    # m2m_changed is sent before and after each change; one bump will do.
+    if action is None or action.startswith("post_"):
+        permissions_version.bump()
+
+
+def connect():
+    """Connect the receivers; see FlexDentalDemoConfig.ready."""
+
+    User = get_user_model()
+    post_save.connect(forget_user, sender=User)
+    post_delete.connect(forget_user, sender=User)
+    for model in (Group, Permission):
+        post_save.connect(forget_permissions, sender=model)
+        post_delete.connect(forget_permissions, sender=model)
+    for through in (
+        User.groups.through,
+        User.user_permissions.through,
+        Group.permissions.through,
+    ):
+        m2m_changed.connect(forget_permissions, sender=through)
@@ -0,0 +1,66 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.db.backends.sqlite3 import base
+from django.dispatch import receiver
+
+TRANSACTION_MODES = ["DEFERRED", "IMMEDIATE", "EXCLUSIVE"]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Django's SQLite backend, with two more OPTIONS:
+
+    - pragmas: the PRAGMAs to set on every new connection, in order,
+      e.g. {"journal_mode": "wal", "synchronous": "normal"}.
+    - transaction_mode: how write transactions begin: DEFERRED (SQLite's
+      default), IMMEDIATE or EXCLUSIVE.
+
+    A deferred transaction that reads before it writes has to upgrade its
+    lock. If another connection is writing, the upgrade fails at once with
+    "database is locked" instead of waiting out the busy timeout. IMMEDIATE
+    transactions take the write lock up front, so they wait their turn.
+
+    The mode applies to the blocks that say they write, with
+    flexdentaldemoapi.transactions.atomic_write. Other transactions begin
+    DEFERRED: in WAL mode, they read alongside the writer, rather than
+    queueing behind it for the write lock.
+    """
+
+    # Set by atomic_write while its transaction begins.
+    writing = False
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+
+        # These are ours, not sqlite3.connect()'s.
+        params.pop("pragmas", None)
+        mode = params.pop("transaction_mode", None)
+
+        if mode is not None and mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}."
+            )
+
+        return params
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict["OPTIONS"].get("transaction_mode")
+        if mode is None or not self.writing:
+            return super()._start_transaction_under_autocommit()
+
+        self.cursor().execute(f"BEGIN {mode}")
+
+
+def set_pragmas(cursor, pragmas):
+    """Set each of a dict of PRAGMAs on a connection, through one of its cursors."""
+
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(connection_created, sender=DatabaseWrapper)
+def apply_pragmas(sender, connection, **kwargs):
+    pragmas = connection.settings_dict["OPTIONS"].get("pragmas")
+    if pragmas:
+        with connection.cursor() as cursor:
+            set_pragmas(cursor, pragmas)
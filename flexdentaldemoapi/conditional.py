@@ -0,0 +1,98 @@
+import uuid
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    Answers conditional GETs (If-None-Match, If-Modified-Since) for a
+    viewset's `list` and `retrieve` actions.
+
+    The validators come from `get_validators()`, which must be cheap:
+    a version counter or an updated-at column, never the response body.
+    A 304 is returned before the queryset is evaluated or serialized.
+    """
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Return an (etag, last_modified) pair for the requested resource.
+        Either may be None. An etag is any string, unquoted; it is made
+        strong and specific to the negotiated format here.
+        """
+
+        return None, None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag, last_modified = prepare_validators(
+            *self.get_validators(request, *args, **kwargs),
+            request.accepted_renderer.format,
+        )
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+
+        return set_validators(response, etag, last_modified)
+
+
+def prepare_validators(etag, last_modified, format):
+    """
+    Turn an (etag, last_modified) pair, as returned by `get_validators()`,
+    into the validators of the response in the given format.
+    """
+
+    # The same resource renders differently as JSON or browsable HTML.
+    if etag is not None:
+        etag = quote_etag(f"{etag}-{format}")
+    if last_modified is not None:
+        last_modified = int(last_modified.timestamp())
+
+    return etag, last_modified
+
+
+def set_validators(response, etag, last_modified):
+    """Send prepared validators with a successful or not-modified response."""
+
+    if response.status_code in (200, 304):
+        if etag is not None:
+            response.headers["ETag"] = etag
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(last_modified)
+
+    return response
+
+
+class VersionToken:
+    """
+    A token, kept in the default cache, that changes whenever any row of
+    a collection changes. Tokens are random rather than counters, so a
+    cache that was cleared can never hand out a token seen before.
+
+    A cache shared by every process (e.g. Redis or Memcached) is required
+    when running more than one: with locmem, each process has its own
+    token, bumped only by the writes it handles, and so may answer for a
+    collection another process changed with a stale 304 (see CACHES).
+    """
+
+    def __init__(self, key):
+        self.key = key
+
+    def get(self):
+        token = cache.get(self.key)
+        if token is None:
+            cache.add(self.key, uuid.uuid4().hex, timeout=None)
+            token = cache.get(self.key)
+        return token
+
+    def bump(self, *args, **kwargs):
+        cache.set(self.key, uuid.uuid4().hex, timeout=None)
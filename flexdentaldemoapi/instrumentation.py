@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+
+def wrapping_queries(wrapper):
+    """
+    Add an execute wrapper to the connection of every database alias,
+    until the returned context manager exits (or is closed).
+    """
+
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(wrapper))
+    return stack
+
+
+class QueryTimer:
+    """An execute wrapper (see `connection.execute_wrapper`) that counts and times queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+class RequestMetrics:
+    """What one request cost: wall time, queries, rendering and response size."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = QueryTimer()
+        self.render_seconds = 0.0
+        self.seconds = None
+        self.size = None
+
+    def timed(self, response):
+        """
+        Time the rendering of a TemplateResponse (and so a DRF Response,
+        whose rendering is its serialization to JSON or HTML).
+        """
+
+        start = time.perf_counter()
+
+        def rendered(response):
+            self.render_seconds += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+
+    def finish(self, response):
+        self.seconds = time.perf_counter() - self.start
+        if not response.streaming:
+            self.size = len(response.content)
+
+    def server_timing(self):
+        def ms(seconds):
+            return f"{seconds * 1000:.1f}"
+
+        return ", ".join(
+            [
+                f"total;dur={ms(self.seconds)}",
+                f'db;dur={ms(self.queries.seconds)};desc="{self.queries.count} queries"',
+                f"render;dur={ms(self.render_seconds)}",
+            ]
+        )
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        # Counts are per bucket here, and made cumulative when exported.
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """
+    Per-route request metrics of this process, and the counters other
+    modules register with it, exported in Prometheus' text format. Each
+    worker process keeps (and exports) its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latency = {}
+            self.totals = {}
+
+    def counter(self, name, help, read):
+        """
+        Export a counter kept elsewhere in this process: `read()` returns
+        its value whenever the metrics are rendered.
+        """
+
+        with self._lock:
+            self.counters[name] = (help, read)
+
+    def observe(self, route, method, metrics):
+        labels = (route, method)
+        with self._lock:
+            if labels not in self.latency:
+                self.latency[labels] = Histogram(
+                    settings.INSTRUMENTATION["latency_buckets"]
+                )
+                self.totals[labels] = dict.fromkeys(TOTALS, 0)
+
+            self.latency[labels].observe(metrics.seconds)
+            totals = self.totals[labels]
+            totals["queries"] += metrics.queries.count
+            totals["sql_seconds"] += metrics.queries.seconds
+            totals["render_seconds"] += metrics.render_seconds
+            totals["response_bytes"] += metrics.size or 0
+
+    def render(self):
+        with self._lock:
+            lines = [
+                "# HELP http_request_duration_seconds Request wall time, by route.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for labels, histogram in self.latency.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f"http_request_duration_seconds_bucket"
+                        f'{{{format_labels(labels)},le="{bound}"}} {cumulative}'
+                    )
+                lines += [
+                    f"http_request_duration_seconds_bucket"
+                    f'{{{format_labels(labels)},le="+Inf"}} {histogram.count}',
+                    f"http_request_duration_seconds_sum"
+                    f"{{{format_labels(labels)}}} {histogram.sum}",
+                    f"http_request_duration_seconds_count"
+                    f"{{{format_labels(labels)}}} {histogram.count}",
+                ]
+
+            for name, help in TOTALS.items():
+                metric = f"http_request_{name}_total"
+                lines += [f"# HELP {metric} {help}", f"# TYPE {metric} counter"]
+                for labels, totals in self.totals.items():
+                    lines.append(f"{metric}{{{format_labels(labels)}}} {totals[name]}")
+
+            for name, (help, read) in self.counters.items():
+                lines += [
+                    f"# HELP {name} {help}",
+                    f"# TYPE {name} counter",
+                    f"{name} {read()}",
+                ]
+
+        return "\n".join(lines) + "\n"
+
+
+TOTALS = {
+    "queries": "SQL queries run, by route.",
+    "sql_seconds": "Time spent in SQL queries, by route.",
+    "render_seconds": "Time spent rendering responses, by route.",
+    "response_bytes": "Bytes of non-streaming response bodies, by route.",
+}
+
+
+def format_labels(labels):
+    def escape(value):
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    route, method = labels
+    return f'route="{escape(route)}",method="{escape(method)}"'
+
+
+registry = MetricsRegistry()
+
+
+class InstrumentationMiddleware:
+    """
+    Measures every request (wall time, SQL queries and their time,
+    rendering time, response size) and sends the measurements back in a
+    Server-Timing header. They are also aggregated per route into
+    `registry`, which the `metrics` view exports, and a request that runs
+    more queries than its route's budget is logged as a warning.
+
+    Opt in with settings.INSTRUMENTATION["enabled"]. Put it first in
+    MIDDLEWARE, so that it measures the rest of the stack too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION["enabled"]:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+
+        # Tell Django's handler that this middleware is a coroutine
+        # function under ASGI, as django.utils.deprecation.MiddlewareMixin does.
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        else:
+            self._is_coroutine = None
+
+    def __call__(self, request):
+        if self._is_coroutine:
+            return self.__acall__(request)
+
+        metrics = request.metrics = RequestMetrics()
+        with wrapping_queries(metrics.queries):
+            response = self.get_response(request)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        # Async views query through thread-sensitive sync_to_async(), on
+        # the connections of the thread that runs it, which this task may
+        # not share; so the execute wrappers are added on that thread.
+        metrics = request.metrics = RequestMetrics()
+        queries = await sync_to_async(wrapping_queries)(metrics.queries)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(queries.close)()
+        return self.finish(request, response)
+
+    def process_template_response(self, request, response):
+        request.metrics.timed(response)
+        return response
+
+    def finish(self, request, response):
+        metrics = request.metrics
+        metrics.finish(response)
+        response.headers["Server-Timing"] = metrics.server_timing()
+
+        match = request.resolver_match
+        route = match.view_name if match else "<unmatched>"
+        registry.observe(route, request.method, metrics)
+
+        budgets = settings.INSTRUMENTATION["query_budgets"]
+        budget = budgets.get(route, settings.INSTRUMENTATION["query_budget"])
+        if budget is not None and metrics.queries.count > budget:
+            logger.warning(
+                "%s %s (%s) ran %d queries, over its budget of %d.",
+                request.method,
+                request.path,
+                route,
+                metrics.queries.count,
+                budget,
+            )
+
+        return response
+
+
+def metrics(request):
+    """Export `registry` in Prometheus' text format."""
+
+    if not settings.INSTRUMENTATION["enabled"]:
+        raise Http404()
+
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.5 on 2026-10-17 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="RevokedToken",
+            fields=[
+                (
+                    "token_id",
+                    models.CharField(max_length=32, primary_key=True, serialize=False),
+                ),
+                ("expires", models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
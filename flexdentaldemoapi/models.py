@@ -0,0 +1,9 @@
+from django.db import models
+
+
+class RevokedToken(models.Model):
+    """A signed token revoked before it expired; see flexdentaldemoapi.tokens."""
+
+    token_id = models.CharField(max_length=32, primary_key=True)
+    # Once the token has expired, the row is no longer needed.
+    expires = models.DateTimeField(db_index=True)
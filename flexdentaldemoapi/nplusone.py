@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import os
+import re
+import sys
+from functools import lru_cache
+
+import sqlparse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from sqlparse import tokens
+
+from .instrumentation import wrapping_queries
+
+logger = logging.getLogger(__name__)
+
+# Values, and the placeholders of values, all look alike in a fingerprint.
+VALUE_TOKENS = (tokens.Number, tokens.String.Single, tokens.Name.Placeholder)
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    """
+    Return the shape of an SQL statement: its values replaced by ?, the
+    lists of them (e.g. IN (?, ?) or VALUES (?), (?)) collapsed to one,
+    comments dropped and whitespace normalized. Statements that differ
+    only in their values have the same fingerprint.
+    """
+
+    parts = []
+    for token in sqlparse.parse(sql)[0].flatten():
+        if token.ttype in tokens.Comment:
+            continue
+        elif token.is_whitespace:
+            parts.append(" ")
+        elif any(token.ttype in ttype for ttype in VALUE_TOKENS):
+            parts.append("?")
+        elif token.is_keyword:
+            parts.append(token.normalized)
+        else:
+            parts.append(token.value)
+
+    shape = re.sub(r"\s+", " ", "".join(parts)).strip()
+    shape = re.sub(r"\(\s*\?(?:\s*,\s*\?)*\s*\)", "(?+)", shape)
+    return re.sub(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+", "(?+)", shape)
+
+
+def is_project_file(filename):
+    return filename.startswith(str(settings.BASE_DIR)) and (
+        "site-packages" not in filename and filename != __file__
+    )
+
+
+def is_test_file(filename):
+    name = os.path.basename(filename)
+    return (
+        name.startswith("test")
+        or name == "conftest.py"
+        or f"{os.sep}tests{os.sep}" in filename
+    )
+
+
+class Repeat:
+    """A statement shape, how many times it ran and where it went over the limit."""
+
+    def __init__(self, shape, sql):
+        self.shape = shape
+        self.sql = sql
+        self.count = 0
+        self.location = None
+
+    def __str__(self):
+        return f"{self.count} x {self.shape}\n    at {self.location or '<unknown>'}"
+
+
+class RepeatedQueries:
+    """
+    An execute wrapper (see `connection.execute_wrapper`) that counts
+    the statements of each shape, and reports the shapes that ran more
+    than `threshold` times.
+
+    With `per_call`, statements are counted per call into project code:
+    the outermost project (non-test) frame a statement runs under. A test
+    that creates a hundred rows in a loop makes a hundred calls; a view
+    that runs a query per row repeats them within one. Statements that
+    run under no such frame (e.g. a test's own queries) are not counted.
+    Without `per_call`, every statement is counted together, e.g. for
+    one request.
+    """
+
+    def __init__(self, threshold, per_call=False):
+        self.threshold = threshold
+        self.per_call = per_call
+        self.repeats = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        self.record(sql)
+        return execute(sql, params, many, context)
+
+    def record(self, sql):
+        frames = self.project_frames()
+        if self.per_call:
+            calls = [
+                frame for frame in frames if not is_test_file(frame.f_code.co_filename)
+            ]
+            if not calls:
+                return
+            # The frame itself, not its id: it is kept alive while it is
+            # a key here, so no later frame can be mistaken for it.
+            scope = calls[-1]
+        else:
+            scope = None
+
+        shape = fingerprint(sql)
+        repeat = self.repeats.get((scope, shape))
+        if repeat is None:
+            repeat = self.repeats[scope, shape] = Repeat(shape, sql)
+
+        repeat.count += 1
+        if repeat.count == self.threshold + 1 and frames:
+            # The line that ran the statement: the innermost project frame.
+            frame = frames[0]
+            repeat.location = f"{frame.f_code.co_filename}:{frame.f_lineno}"
+
+    @staticmethod
+    def project_frames():
+        """Return the project's frames on the stack, innermost first."""
+
+        frames = []
+        frame = sys._getframe(2)
+        while frame is not None:
+            if is_project_file(frame.f_code.co_filename):
+                frames.append(frame)
+            frame = frame.f_back
+        return frames
+
+    def report(self):
+        """Return the shapes that ran more than `threshold` times."""
+
+        return [
+            repeat for repeat in self.repeats.values() if repeat.count > self.threshold
+        ]
+
+
+class NPlusOneMiddleware:
+    """
+    Logs a warning for each statement shape that runs more than
+    settings.NPLUSONE["threshold"] times in one request, and where.
+
+    For development: the SQL of every statement is parsed (once per
+    distinct statement). Opt in with settings.NPLUSONE["enabled"].
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.NPLUSONE["enabled"]:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+
+        # As in InstrumentationMiddleware.
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        else:
+            self._is_coroutine = None
+
+    def __call__(self, request):
+        if self._is_coroutine:
+            return self.__acall__(request)
+
+        repeated = RepeatedQueries(settings.NPLUSONE["threshold"])
+        with wrapping_queries(repeated):
+            response = self.get_response(request)
+        self.warn(request, repeated)
+        return response
+
+    async def __acall__(self, request):
+        repeated = RepeatedQueries(settings.NPLUSONE["threshold"])
+        queries = await sync_to_async(wrapping_queries)(repeated)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(queries.close)()
+        self.warn(request, repeated)
+        return response
+
+    @staticmethod
+    def warn(request, repeated):
+        for repeat in repeated.report():
+            logger.warning(
+                "%s %s repeated a query: %s", request.method, request.path, repeat
+            )
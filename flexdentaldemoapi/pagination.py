@@ -0,0 +1,212 @@
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginates on a unique key, e.g. ("id",) or ("kanban_list", "ordinal"),
+    named by the view's `keyset` attribute (the primary key by default).
+
+    A cursor holds the key of the row it starts after (or before), not an
+    offset: every page is one indexed range scan of at most page_size + 1
+    rows, however deep it is. Rows written or moved elsewhere while a
+    client pages do not shift the pages after its cursor.
+
+    DRF's CursorPagination positions on the first ordering field alone,
+    and falls back to offsets for the rest; this takes the whole key.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.keyset = tuple(getattr(view, "keyset", ("pk",)))
+        self.attnames = [self.attname(queryset.model, field) for field in self.keyset]
+        self.columns = list(queryset.query.values_select)
+        page_size = self.get_page_size(request)
+
+        after, reverse = self.decode_cursor(request)
+
+        # Order and filter on the columns (kanban_list_id, not kanban_list):
+        # ordering on a relation would order on the related model's ordering.
+        ordering = [f"-{field}" if reverse else field for field in self.attnames]
+        queryset = queryset.order_by(*ordering)
+        if after is not None:
+            queryset = queryset.filter(self.beyond(after, reverse))
+
+        rows = list(queryset[: page_size + 1])
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        # Going forward, there are more rows ahead if the query found
+        # them, and rows behind if there was a cursor; and vice versa.
+        ahead, behind = (
+            (after is not None, more) if reverse else (more, after is not None)
+        )
+        self.next = self.key(rows[-1]) if rows and ahead else None
+        self.previous = self.key(rows[0]) if rows and behind else None
+
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_next_link(self):
+        return self.link(self.next, reverse=False)
+
+    def get_previous_link(self):
+        return self.link(self.previous, reverse=True)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def beyond(self, key, reverse):
+        """
+        Return a filter for the rows past `key` in the key order:
+        (a > x) OR (a = x AND b > y) OR ..., or backwards with <.
+        """
+
+        lookup = "lt" if reverse else "gt"
+        condition = Q()
+        for i, field in enumerate(self.attnames):
+            equal = {f: value for f, value in zip(self.attnames[:i], key)}
+            condition |= Q(**equal, **{f"{field}__{lookup}": key[i]})
+        return condition
+
+    def key(self, row):
+        # Rows are model instances, or tuples from `.values_list()`.
+        if isinstance(row, tuple):
+            return [row[self.columns.index(attname)] for attname in self.attnames]
+        return [getattr(row, attname) for attname in self.attnames]
+
+    @staticmethod
+    def attname(model, field):
+        meta = model._meta
+        return meta.pk.attname if field == "pk" else meta.get_field(field).attname
+
+    def link(self, key, reverse):
+        if key is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        cursor = json.dumps({"key": key, "reverse": reverse}, separators=(",", ":"))
+        encoded = base64.urlsafe_b64encode(cursor.encode()).decode()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        """Return the key a page starts past, and whether it goes backwards."""
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            key, reverse = cursor["key"], bool(cursor["reverse"])
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        # Every key paged on is made of integers (ids and ordinals).
+        if (
+            not isinstance(key, list)
+            or len(key) != len(self.keyset)
+            or not all(type(value) is int for value in key)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+        return key, reverse
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+
+class RankedPagination(KeysetPagination):
+    """
+    Paginates results ordered by rank (e.g. search hits) rather than by a
+    unique key, which a keyset cannot page: by page number, `?page=<n>`.
+
+    The results are anything that can be sliced, a queryset or otherwise.
+    Each page is one slice of page_size + 1 results, the extra one telling
+    whether there is a next page; there is never a count.
+    """
+
+    page_query_param = "page"
+    invalid_page_message = "Invalid page."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        try:
+            page = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        if page < 1:
+            raise NotFound(self.invalid_page_message)
+
+        start = (page - 1) * page_size
+        rows = list(queryset[start : start + page_size + 1])
+
+        self.next = page + 1 if len(rows) > page_size else None
+        self.previous = page - 1 if page > 1 else None
+        return rows[:page_size]
+
+    def link(self, page, reverse):
+        if page is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, page)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.page_query_param,
+                "required": False,
+                "in": "query",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -0,0 +1,69 @@
+"""
+A pytest plugin that fails a test when the code it tests runs the same
+statement shape more than `nplusone_threshold` times in one call: the
+N+1 queries of a view, serializer or manager method that queries once
+per row. See flexdentaldemoapi.nplusone.RepeatedQueries.
+
+It checks the tests under the `nplusone_paths` of pytest.ini. A test can
+set its own threshold with @pytest.mark.nplusone(threshold=N), or opt
+out with @pytest.mark.nplusone(threshold=None).
+"""
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addini(
+        "nplusone_paths",
+        type="paths",
+        default=[],
+        help="Directories whose tests are checked for repeated queries.",
+    )
+    parser.addini(
+        "nplusone_threshold",
+        default="5",
+        help="How many times a statement shape may run in one call.",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "nplusone(threshold): how many times a statement shape may run in one "
+        "call of this test's code under test; None to allow any number.",
+    )
+
+
+def threshold_for(item):
+    marker = item.get_closest_marker("nplusone")
+    if marker is not None:
+        return marker.kwargs.get("threshold", marker.args[0] if marker.args else None)
+
+    paths = item.config.getini("nplusone_paths")
+    if any(item.path.is_relative_to(path) for path in paths):
+        return int(item.config.getini("nplusone_threshold"))
+
+    return None
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    threshold = threshold_for(item)
+    if threshold is None:
+        return (yield)
+
+    from .instrumentation import wrapping_queries
+    from .nplusone import RepeatedQueries
+
+    repeated = RepeatedQueries(threshold, per_call=True)
+    with wrapping_queries(repeated):
+        result = yield
+
+    repeats = repeated.report()
+    if repeats:
+        pytest.fail(
+            f"Repeated queries (more than {threshold} of one shape in one call):\n"
+            + "\n".join(f"  {repeat}" for repeat in repeats),
+            pytrace=False,
+        )
+    return result
@@ -0,0 +1,68 @@
+import re
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+# A number, as orjson writes it, that Python would write in exponent
+# notation: in exponent notation itself, or below 1e-4. It may also match
+# inside a string, which only costs a fallback to DRF's rendering.
+EXPONENT_FLOAT = re.compile(rb"(?:^|[:,\[])-?(?:0\.0000|\d[\d.]*e)")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    DRF's JSONRenderer, rendering through orjson when it is installed,
+    byte for byte the same as DRF would.
+
+    orjson passes dates and times (and anything else it does not know,
+    e.g. Decimals) to DRF's encoder, so they are formatted as DRF formats
+    them. DRF's renderer renders whatever orjson cannot do the same way:
+    indented output (e.g. for the browsable API), escaped non-ASCII,
+    non-strict floats (NaN), anything orjson fails on, e.g. integers
+    wider than 64 bits, and floats that Python writes in exponent
+    notation, which orjson writes otherwise (1e16 for 1e+16, 0.00001 for
+    1e-05).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if not self.renders_fast(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            rendered = self.dumps(data)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if EXPONENT_FLOAT.search(rendered):
+            return super().render(data, accepted_media_type, renderer_context)
+        return rendered
+
+    def renders_fast(self, accepted_media_type, renderer_context):
+        return (
+            orjson is not None
+            and self.compact
+            and not self.ensure_ascii
+            and self.strict
+            and self.get_indent(accepted_media_type, renderer_context or {}) is None
+        )
+
+    def dumps(self, data):
+        rendered = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+
+        # As DRF does, escape the line terminators that JSON allows in
+        # strings and JavaScript does not.
+        return rendered.replace("\u2028".encode(), b"\\u2028").replace(
+            "\u2029".encode(), b"\\u2029"
+        )
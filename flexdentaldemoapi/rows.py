@@ -0,0 +1,98 @@
+from operator import itemgetter
+
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+# Stands in for a primary key while a detail URL is reversed once, to be
+# split into the prefix and suffix that every row's URL shares.
+URL_SENTINEL = "8675309"
+
+
+class RowSerializer:
+    """
+    A read-only serializer of `.values_list()` rows of its `columns`, for
+    hot reads of many rows: the fast twin of a ModelSerializer, with the
+    same output.
+
+    The work a ModelSerializer does for every row (building fields,
+    reading attributes, reversing a URL) is done once, when the row
+    serializer is made, into a plan of one getter per output field.
+    Serializing a row is then one dict comprehension over that plan.
+    """
+
+    # The output fields, in order. Each is read from the column of the
+    # same name, unless it is mapped to another column in `sources`.
+    fields = []
+    sources = {}
+
+    # DRF fields whose `to_representation` converts a column's value
+    # for output, e.g. {"updated_at": serializers.DateTimeField()}.
+    conversions = {}
+
+    # A field named "url" is the hyperlink to this view for the row's id.
+    url_view_name = None
+
+    def __init__(self, request=None, format=None):
+        self.columns = ["id"] if "url" in self.fields else []
+        self.plan = []
+
+        for name in self.fields:
+            if name == "url":
+                self.plan.append((name, self.url_getter(request, format)))
+                continue
+
+            column = self.sources.get(name, name)
+            if column not in self.columns:
+                self.columns.append(column)
+
+            getter = itemgetter(self.columns.index(column))
+            if name in self.conversions:
+                getter = self.converter(self.conversions[name], getter)
+            self.plan.append((name, getter))
+
+    def serialize(self, rows):
+        plan = self.plan
+        return [{name: get(row) for name, get in plan} for row in rows]
+
+    def url_getter(self, request, format):
+        # Reverse once, as HyperlinkedIdentityField would for every row.
+        url = reverse(
+            self.url_view_name,
+            kwargs={"pk": URL_SENTINEL},
+            request=request,
+            format=format,
+        )
+        prefix, _, suffix = url.rpartition(URL_SENTINEL)
+        id = self.columns.index("id")
+        return lambda row: f"{prefix}{row[id]}{suffix}"
+
+    @staticmethod
+    def converter(field, getter):
+        to_representation = field.to_representation
+
+        def get(row):
+            value = getter(row)
+            return None if value is None else to_representation(value)
+
+        return get
+
+
+class RowListModelMixin:
+    """
+    Lists a viewset's objects through its `row_serializer_class`, from
+    `.values_list()` rows, instead of through its serializer class.
+    """
+
+    row_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.row_serializer_class(request, self.format_kwarg)
+        queryset = self.filter_queryset(self.get_queryset()).values_list(
+            *serializer.columns
+        )
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+
+        return Response(serializer.serialize(queryset))
@@ -1,8 +1,17 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
 
+from .rows import RowSerializer
+
 
 class UserSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
         model = User
         fields = ["url", "username", "email", "is_staff"]
+
+
+class UserRowSerializer(RowSerializer):
+    """The fast twin of UserSerializer, for listing users."""
+
+    fields = UserSerializer.Meta.fields
+    url_view_name = "user-detail"
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -39,11 +41,17 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "rest_framework",
-    # "kanban",
+    "kanban",
     "todo",
+    # For its AppConfig: see flexdentaldemoapi.apps.
+    "flexdentaldemoapi",
 ]
 
 MIDDLEWARE = [
+    # First, to measure the rest; off unless INSTRUMENTATION["enabled"].
+    "flexdentaldemoapi.instrumentation.InstrumentationMiddleware",
+    # Off unless NPLUSONE["enabled"]; see below.
+    "flexdentaldemoapi.nplusone.NPlusOneMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -77,11 +85,111 @@ WSGI_APPLICATION = "flexdentaldemoapi.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# The database engine is chosen with DJANGO_DB_ENGINE: "sqlite" (the
+# default) or "postgresql" (which needs psycopg2). PostgreSQL is reached
+# with the DJANGO_DB_NAME/USER/PASSWORD/HOST/PORT variables.
+DB_ENGINE = os.getenv("DJANGO_DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "sqlite":
+    DATABASES = {
+        "default": {
+            # Django's SQLite backend, plus the `pragmas` and `transaction_mode`
+            # OPTIONS (see flexdentaldemoapi.backends.sqlite3).
+            "ENGINE": "flexdentaldemoapi.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+            # Reuse connections between requests, checking them first.
+            # Under ASGI, each request gets its own thread, and so its own
+            # connection, so this mainly helps WSGI workers.
+            "CONN_MAX_AGE": 60,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                # Write transactions (see flexdentaldemoapi.transactions)
+                # wait for each other rather than failing with "database is
+                # locked". Other transactions begin DEFERRED.
+                "transaction_mode": "IMMEDIATE",
+                "pragmas": {
+                    # Readers and the writer no longer block each other.
+                    "journal_mode": "wal",
+                    # In WAL mode, only a power loss can lose the latest
+                    # commits; the database cannot be corrupted.
+                    "synchronous": "normal",
+                    # How long, in milliseconds, to wait for a lock.
+                    "busy_timeout": 5000,
+                    # Negative: in KiB of page cache per connection.
+                    "cache_size": -20000,
+                    "mmap_size": 256 * 1024 * 1024,
+                    "temp_store": "memory",
+                },
+            },
+        }
+    }
+elif DB_ENGINE == "postgresql":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("DJANGO_DB_NAME", "kanban"),
+            "USER": os.getenv("DJANGO_DB_USER", ""),
+            "PASSWORD": os.getenv("DJANGO_DB_PASSWORD", ""),
+            "HOST": os.getenv("DJANGO_DB_HOST", ""),
+            "PORT": os.getenv("DJANGO_DB_PORT", ""),
+            "CONN_MAX_AGE": 60,
+            "CONN_HEALTH_CHECKS": True,
+        }
     }
+else:
+    raise ImproperlyConfigured(
+        f"DJANGO_DB_ENGINE must be sqlite or postgresql, not {DB_ENGINE!r}."
+    )
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    # Holds the VersionTokens that the users' ETags come from (see
+    # flexdentaldemoapi.conditional), cached sessions, and the users and
+    # permissions of flexdentaldemoapi.auth. Each process bumps a token
+    # only for the writes it handles itself, so with more than one
+    # process this MUST be a cache they share (e.g. Redis or Memcached):
+    # with locmem, a process that missed a write answers If-None-Match
+    # with a stale 304, and serves stale permissions until they expire.
+    # An evicted token is harmless: it is remade, and the next
+    # conditional GET of its collection is a full 200.
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Board snapshots. Swap the backend (e.g. for Redis or Memcached)
+    # to share snapshots between processes. Least recently used entries
+    # are evicted past MAX_ENTRIES; all entries expire after TIMEOUT.
+    "kanban": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "kanban-snapshots",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+}
+
+
+# Authentication
+# https://docs.djangoproject.com/en/4.1/topics/auth/customizing/
+
+# Users and their permissions, and sessions, are read from the default
+# cache; see flexdentaldemoapi.auth.
+AUTHENTICATION_BACKENDS = ["flexdentaldemoapi.auth.CachedModelBackend"]
+
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+AUTH_CACHE = {
+    # How long, in seconds, a user or their permissions may be served from
+    # the cache. Changes are seen at once by any process that shares it.
+    "timeout": 300,
+}
+
+AUTH_TOKENS = {
+    # How long, in seconds, a signed token is good for once issued.
+    "lifetime": 60 * 60,
+    # How often, in seconds, each process reloads the revoked tokens.
+    "revocations_refresh": 5,
 }
 
 
@@ -131,12 +239,79 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly"
         # TODO: Assess whether this is the optimal default permission class for this use case.
-    ]
+    ],
+    # Signed tokens first: they need neither a session nor a query.
+    # See flexdentaldemoapi.tokens.
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "flexdentaldemoapi.tokens.SignedTokenAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
+        "rest_framework.authentication.BasicAuthentication",
+    ],
+    # Every listing is paginated on a unique key; see the views' `keyset`.
+    "DEFAULT_PAGINATION_CLASS": "flexdentaldemoapi.pagination.KeysetPagination",
+    "PAGE_SIZE": 100,
+    # orjson, when it is installed; DRF's own JSON rendering and parsing
+    # otherwise. The output is the same either way.
+    "DEFAULT_RENDERER_CLASSES": [
+        "flexdentaldemoapi.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "flexdentaldemoapi.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 KANBAN = {
     "KanbanBoard_title_maxlength": 30,
     "KanbanList_title_maxlength": 20,
+    # The distance between neighbouring list/card ordinals after a rebalance.
+    # Larger gaps allow more moves into the same spot before a rebalance.
+    "ordinal_gap": 1024,
+    # The cache (see CACHES) that holds serialized board snapshots.
+    "snapshot_cache": "kanban",
+    # How long, in seconds, a board's current version may be served from
+    # the cache before it is read from the database again.
+    "snapshot_version_timeout": 30,
+    # How many changes compact_changes keeps in each board's change log.
+    "changelog_keep": 1000,
+    # How many undelivered events a board event stream holds before it
+    # drops the oldest. Newer events supersede older ones.
+    "events_queue_size": 16,
+    # How long, in seconds, a board event stream may stay silent before
+    # a heartbeat is sent.
+    "events_heartbeat": 15,
+    # How many threads the async views may use for sync-only work.
+    "sync_pool_workers": 8,
+    # How many cards a bulk import inserts per INSERT statement.
+    "import_batch_size": 1000,
+    # How many rows a bulk export reads from the database at a time.
+    "export_chunk_size": 2000,
+    # How many times a write that collides on an ordinal is attempted in
+    # all before it fails; see kanban.concurrency.
+    "collision_attempts": 3,
+    # How many operations a batch of edits to a board may hold.
+    "batch_max_operations": 1000,
+}
+
+INSTRUMENTATION = {
+    # Measure every request: see flexdentaldemoapi.instrumentation.
+    "enabled": bool(os.getenv("DJANGO_INSTRUMENTATION")),
+    # The upper bounds, in seconds, of the request latency histograms.
+    "latency_buckets": [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],
+    # How many queries a request may run before a warning is logged,
+    # and per-route overrides, by view name. None means no budget.
+    "query_budget": 20,
+    "query_budgets": {},
+}
+
+NPLUSONE = {
+    # Warn about requests that repeat a query per row: see
+    # flexdentaldemoapi.nplusone. For development; on with DEBUG.
+    "enabled": bool(DEBUG),
+    # How many times one statement shape may run in a request.
+    "threshold": 5,
 }
 
 # AUTH_USER_MODEL = "todo.DemoUser"
@@ -0,0 +1,25 @@
+from django.contrib.auth.models import Group, Permission, User
+
+import pytest
+from kanban.models import KanbanBoard as KB, KanbanList as KL
+
+
+@pytest.fixture
+def editors():
+    group = Group.objects.create(name="editors")
+    group.permissions.add(Permission.objects.get(codename="add_kanbanboard"))
+    return group
+
+
+@pytest.fixture
+def user(editors):
+    user = User.objects.create_user(username="john-doe", password="defaultuser12345")
+    user.groups.add(editors)
+    return user
+
+
+@pytest.fixture
+def board():
+    board = KB.objects.create(title="My Board")
+    KL.objects.create(title="todo", kanban_board=board)
+    return board
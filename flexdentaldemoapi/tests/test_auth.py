@@ -0,0 +1,100 @@
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+import pytest
+from ..auth import CachedModelBackend
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.login(username="john-doe", password="defaultuser12345")
+    return client
+
+
+def write(client, board):
+    """Reorder the board's lists: a POST, which needs add_kanbanboard."""
+    ids = list(board.kanbanlist_set.values_list("id", flat=True))
+    return client.post(f"/boards/{board.id}/reorder/", {"ids": ids}, format="json")
+
+
+def auth_queries(queries):
+    """The queries that read sessions, users, groups, or permissions."""
+    return [
+        query["sql"]
+        for query in queries
+        if "auth_" in query["sql"] or "django_session" in query["sql"]
+    ]
+
+
+@pytest.mark.django_db()
+class TestCachedAuthentication:
+    """
+    write__once_cached__authenticates_without_queries
+    write__after_leaving_a_group__is_forbidden
+    write__after_a_group_loses_a_permission__is_forbidden
+    write__after_a_permission_is_granted_directly__is_allowed
+    write__after_the_user_is_deactivated__is_unauthorized
+    backend__caches_users_by_id
+    """
+
+    def test_write__once_cached__authenticates_without_queries(self, client, board):
+        assert write(client, board).status_code == 200
+
+        with CaptureQueriesContext(connection) as queries:
+            response = write(client, board)
+
+        assert response.status_code == 200
+        assert auth_queries(queries) == []
+
+    def test_write__after_leaving_a_group__is_forbidden(
+        self, client, board, user, editors
+    ):
+        write(client, board)
+
+        user.groups.remove(editors)
+
+        assert write(client, board).status_code == 403
+
+    def test_write__after_a_group_loses_a_permission__is_forbidden(
+        self, client, board, editors
+    ):
+        write(client, board)
+
+        editors.permissions.clear()
+
+        assert write(client, board).status_code == 403
+
+    def test_write__after_a_permission_is_granted_directly__is_allowed(
+        self, client, board, user, editors
+    ):
+        user.groups.clear()
+        assert write(client, board).status_code == 403
+
+        user.user_permissions.add(Permission.objects.get(codename="add_kanbanboard"))
+
+        assert write(client, board).status_code == 200
+
+    def test_write__after_the_user_is_deactivated__is_unauthorized(
+        self, client, board, user
+    ):
+        write(client, board)
+
+        user.is_active = False
+        user.save()
+
+        # Anonymous now, and asked for a token: SignedTokenAuthentication
+        # comes first in DEFAULT_AUTHENTICATION_CLASSES.
+        assert write(client, board).status_code == 401
+
+    def test_backend__caches_users_by_id(self, user, django_assert_num_queries):
+        backend = CachedModelBackend()
+        backend.get_user(user.pk)
+
+        with django_assert_num_queries(0):
+            cached = backend.get_user(user.pk)
+
+        assert cached == user
+        assert backend.get_user(user.pk + 1) is None
@@ -0,0 +1,67 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from ..backends.sqlite3.base import DatabaseWrapper
+from ..transactions import atomic_write
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.skipif(connection.vendor != "sqlite", reason="SQLite only.")
+@pytest.mark.django_db(transaction=True)
+class TestSQLiteProfile:
+    """
+    connection__has_pragmas_set
+    atomic__begins_deferred_transaction
+    atomic_write__begins_immediate_transaction
+    atomic_write__nested__begins_once
+    transaction_mode__must_be_known
+    """
+
+    def test_connection__has_pragmas_set(self):
+        # NORMAL, and MEMORY, as numbers.
+        assert pragma("synchronous") == 1
+        assert pragma("temp_store") == 2
+        assert pragma("busy_timeout") == 5000
+        assert pragma("cache_size") == -20000
+
+    def test_atomic__begins_deferred_transaction(self):
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                pragma("user_version")
+
+        assert queries[0]["sql"] == "BEGIN"
+
+    def test_atomic_write__begins_immediate_transaction(self):
+        with CaptureQueriesContext(connection) as queries:
+            with atomic_write():
+                pragma("user_version")
+
+        assert queries[0]["sql"] == "BEGIN IMMEDIATE"
+        assert not connection.writing
+
+    def test_atomic_write__nested__begins_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            with atomic_write():
+                with atomic_write():
+                    pragma("user_version")
+                # Within the outer transaction, no other begins.
+                with transaction.atomic():
+                    pragma("user_version")
+
+        assert [q["sql"] for q in queries if "BEGIN" in q["sql"]] == ["BEGIN IMMEDIATE"]
+
+    def test_transaction_mode__must_be_known(self):
+        settings_dict = {
+            **connection.settings_dict,
+            "OPTIONS": {"transaction_mode": "LAZY"},
+        }
+
+        with pytest.raises(ImproperlyConfigured):
+            DatabaseWrapper(settings_dict).get_connection_params()
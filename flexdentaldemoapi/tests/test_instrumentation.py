@@ -0,0 +1,101 @@
+import logging
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+
+import pytest
+from kanban.models import KanbanBoard, KanbanList
+from ..instrumentation import registry
+
+
+@pytest.fixture
+def instrumented(settings):
+    settings.INSTRUMENTATION = {**settings.INSTRUMENTATION, "enabled": True}
+    registry.reset()
+    yield settings.INSTRUMENTATION
+    registry.reset()
+
+
+def timings(response):
+    """Parse a Server-Timing header into {name: {param: value}}."""
+    metrics = {}
+    for metric in response["Server-Timing"].split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+@pytest.mark.django_db()
+class TestInstrumentationMiddleware:
+    """
+    disabled__no_server_timing_and_no_metrics
+    server_timing__reports_queries_and_rendering
+    metrics__latency_histogram_and_totals_per_route
+    query_budget__exceeded__logs_a_warning
+    query_budget__per_route_override
+    """
+
+    def test_disabled__no_server_timing_and_no_metrics(self):
+        assert "Server-Timing" not in APIClient().get("/users/")
+        assert APIClient().get("/metrics/").status_code == 404
+
+    def test_server_timing__reports_queries_and_rendering(self, instrumented):
+        User.objects.create_user(username="john-doe")
+
+        metrics = timings(APIClient().get("/users/"))
+
+        assert metrics["db"]["desc"] == '"1 queries"'
+        assert float(metrics["render"]["dur"]) >= 0
+        assert float(metrics["total"]["dur"]) >= float(metrics["db"]["dur"])
+
+    def test_metrics__latency_histogram_and_totals_per_route(self, instrumented):
+        APIClient().get("/users/")
+        APIClient().get("/users/")
+
+        text = APIClient().get("/metrics/").content.decode()
+
+        labels = 'route="user-list",method="GET"'
+        assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+        assert f"http_request_duration_seconds_count{{{labels}}} 2" in text
+        assert f"http_request_queries_total{{{labels}}} 2" in text
+        assert "# TYPE http_request_response_bytes_total counter" in text
+
+    def test_query_budget__exceeded__logs_a_warning(self, instrumented, caplog):
+        instrumented["query_budget"] = 0
+
+        with caplog.at_level(logging.WARNING, "flexdentaldemoapi.instrumentation"):
+            APIClient().get("/users/")
+
+        assert "GET /users/ (user-list) ran 1 queries" in caplog.text
+
+    def test_query_budget__per_route_override(self, instrumented, caplog):
+        instrumented["query_budget"] = 0
+        instrumented["query_budgets"] = {"user-list": 1}
+
+        with caplog.at_level(logging.WARNING, "flexdentaldemoapi.instrumentation"):
+            APIClient().get("/users/")
+
+        assert caplog.text == ""
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncInstrumentation:
+    """
+    async_view__counts_queries_run_in_threads
+    """
+
+    def test_async_view__counts_queries_run_in_threads(self, instrumented):
+        board = KanbanBoard.objects.create(title="My Board")
+        KanbanList.objects.create(title="My List", kanban_board=board)
+
+        async def read():
+            return await AsyncClient().get(f"/boards/{board.id}/")
+
+        response = async_to_sync(read)()
+
+        # The board's version, then the board, its lists and their cards
+        # after a BEGIN.
+        assert response.status_code == 200
+        assert timings(response)["db"]["desc"] == '"5 queries"'
@@ -0,0 +1,85 @@
+import logging
+
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+import pytest
+from kanban.bulk import import_rows
+from kanban.models import KanbanBoard, KanbanList, KanbanCard
+from ..instrumentation import wrapping_queries
+from ..nplusone import RepeatedQueries, fingerprint
+
+
+class TestFingerprint:
+    """
+    fingerprint__values_and_placeholders_look_alike
+    fingerprint__lists_of_values_collapse
+    fingerprint__comments_and_whitespace_dropped
+    """
+
+    def test_fingerprint__values_and_placeholders_look_alike(self):
+        assert fingerprint(
+            'SELECT "a"."id" FROM "a" WHERE "a"."x" = %s LIMIT 21'
+        ) == fingerprint('SELECT "a"."id" FROM "a" WHERE "a"."x" = \'y\' LIMIT 1')
+
+    def test_fingerprint__lists_of_values_collapse(self):
+        assert fingerprint("SELECT 1 FROM t WHERE id IN (%s, %s, %s)") == fingerprint(
+            "SELECT 1 FROM t WHERE id IN (%s)"
+        )
+        assert fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)") == (
+            fingerprint("INSERT INTO t (a, b) VALUES (%s, %s)")
+        )
+
+    def test_fingerprint__comments_and_whitespace_dropped(self):
+        assert fingerprint("select  *\n FROM t -- why") == "SELECT * FROM t"
+
+
+@pytest.mark.django_db()
+class TestRepeatedQueries:
+    """
+    per_call__loop_in_test__not_reported
+    per_call__repeats_within_one_call__reported_with_location
+    """
+
+    @pytest.fixture
+    def board(self):
+        return KanbanBoard.objects.create(title="My Board")
+
+    def test_per_call__loop_in_test__not_reported(self, board):
+        klist = KanbanList.objects.create(title="My List", kanban_board=board)
+        repeated = RepeatedQueries(threshold=2, per_call=True)
+
+        with wrapping_queries(repeated):
+            for i in range(5):
+                KanbanCard.objects.create(content=str(i), kanban_list=klist)
+
+        assert repeated.report() == []
+
+    @pytest.mark.nplusone(threshold=None)
+    def test_per_call__repeats_within_one_call__reported_with_location(self, board):
+        repeated = RepeatedQueries(threshold=2, per_call=True)
+
+        with wrapping_queries(repeated):
+            import_rows(board, [("To do", str(i)) for i in range(5)], batch_size=1)
+
+        (repeat,) = repeated.report()
+        assert repeat.count == 5
+        assert repeat.shape.startswith('INSERT INTO "kanban_kanbancard"')
+        assert "kanban/bulk.py:" in repeat.location
+
+
+@pytest.mark.django_db()
+class TestNPlusOneMiddleware:
+    """
+    request__over_threshold__logs_a_warning
+    """
+
+    def test_request__over_threshold__logs_a_warning(self, settings, caplog):
+        settings.NPLUSONE = {"enabled": True, "threshold": 0}
+        User.objects.create_user(username="john-doe")
+
+        with caplog.at_level(logging.WARNING, "flexdentaldemoapi.nplusone"):
+            APIClient().get("/users/")
+
+        assert "GET /users/ repeated a query: 1 x SELECT" in caplog.text
+        assert "flexdentaldemoapi/pagination.py:" in caplog.text
@@ -0,0 +1,115 @@
+import base64
+import json
+
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+import pytest
+
+
+def follow(url, **params):
+    """GET a page of users, and return its body."""
+    response = APIClient().get(url, params)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.fixture
+def users():
+    return [
+        User.objects.create_user(username=f"user-{i:02}", password="defaultuser12345")
+        for i in range(7)
+    ]
+
+
+@pytest.mark.django_db()
+class TestKeysetPagination:
+    """
+    first_page__has_next_and_no_previous
+    next_links__visit_every_row_once
+    previous_link__returns_the_page_before
+    page__is_one_query_at_any_depth
+    page__does_not_shift_when_earlier_rows_are_deleted
+    page_size__is_capped
+    invalid_cursor__not_found
+    cursor_key_not_of_integers__not_found
+    """
+
+    def names(self, page):
+        return [user["username"] for user in page["results"]]
+
+    def test_first_page__has_next_and_no_previous(self, users):
+        page = follow("/users/", page_size=3)
+
+        assert self.names(page) == [user.username for user in users[:3]]
+        assert page["next"] is not None
+        assert page["previous"] is None
+
+    def test_next_links__visit_every_row_once(self, users):
+        seen = []
+        page = follow("/users/", page_size=3)
+        while True:
+            seen += self.names(page)
+            if page["next"] is None:
+                break
+            page = follow(page["next"])
+
+        assert seen == [user.username for user in users]
+
+    def test_previous_link__returns_the_page_before(self, users):
+        first = follow("/users/", page_size=3)
+        second = follow(first["next"])
+        third = follow(second["next"])
+
+        assert self.names(follow(third["previous"])) == self.names(second)
+        assert self.names(follow(second["previous"])) == self.names(first)
+        assert follow(second["previous"])["previous"] is None
+
+    def test_page__is_one_query_at_any_depth(self, users, django_assert_num_queries):
+        page = follow("/users/", page_size=2)
+        while page["next"] is not None:
+            # The users' version comes from the cache, for the ETag.
+            with django_assert_num_queries(1):
+                page = follow(page["next"])
+
+    def test_page__does_not_shift_when_earlier_rows_are_deleted(self, users):
+        first = follow("/users/", page_size=3)
+
+        users[0].delete()
+        users[1].delete()
+
+        assert self.names(follow(first["next"])) == [
+            user.username for user in users[3:6]
+        ]
+
+    def test_page_size__is_capped(self, users):
+        page = follow("/users/", page_size=100000)
+
+        assert len(page["results"]) == len(users)
+
+    @pytest.mark.parametrize(
+        "cursor", ["garbage", "e30=", "eyJrZXkiOlsxLDJdLCJyZXZlcnNlIjpmYWxzZX0="]
+    )
+    def test_invalid_cursor__not_found(self, users, cursor):
+        response = APIClient().get("/users/", {"cursor": cursor})
+
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize(
+        "url, key",
+        [
+            ("/users/", ["abc"]),
+            ("/users/", [None]),
+            ("/boards/", [{"a": 1}]),
+            ("/boards/", [True]),
+            ("/cards/", ["x", 1]),
+            ("/cards/", [1, 1.5]),
+        ],
+    )
+    def test_cursor_key_not_of_integers__not_found(self, users, url, key):
+        cursor = json.dumps({"key": key, "reverse": False})
+        encoded = base64.urlsafe_b64encode(cursor.encode()).decode()
+
+        response = APIClient().get(url, {"cursor": encoded})
+
+        assert response.status_code == 404
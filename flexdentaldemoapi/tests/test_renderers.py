@@ -0,0 +1,116 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+import pytest
+from .. import parsers, renderers
+from ..parsers import FastJSONParser
+from ..renderers import FastJSONRenderer
+
+DATA = ReturnDict(
+    {
+        "id": 1,
+        "title": "Caf\u00e9 \u2028\u2029 \U0001f600",
+        "ratio": 0.1,
+        "price": Decimal("12.50"),
+        "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "aware": datetime.datetime(
+            2023, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc
+        ),
+        "naive": datetime.datetime(2023, 1, 2, 3, 4, 5),
+        "date": datetime.date(2023, 1, 2),
+        "time": datetime.time(3, 4, 5, 678901),
+        "lazy": gettext_lazy("Not found."),
+        "tuple": (1, "two", None, True),
+        "keys": {1: "int key"},
+        "lists": [{"id": i, "cards": [{"id": i * 10}]} for i in range(25)],
+    },
+    serializer=None,
+)
+
+
+@pytest.fixture(params=["orjson", "fallback"])
+def backend(request, monkeypatch):
+    if request.param == "fallback":
+        monkeypatch.setattr(renderers, "orjson", None)
+        monkeypatch.setattr(parsers, "orjson", None)
+    return request.param
+
+
+class TestFastJSONRenderer:
+    """
+    render__same_bytes_as_drf
+    render__indented__same_bytes_as_drf
+    render__none__empty
+    render__int_wider_than_64_bits__same_bytes_as_drf
+    render__floats_in_exponent_notation__same_bytes_as_drf
+    """
+
+    def test_render__same_bytes_as_drf(self, backend):
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+    def test_render__indented__same_bytes_as_drf(self, backend):
+        media_type = "application/json; indent=4"
+
+        assert FastJSONRenderer().render(DATA, media_type) == JSONRenderer().render(
+            DATA, media_type
+        )
+
+    def test_render__none__empty(self, backend):
+        assert FastJSONRenderer().render(None) == b""
+
+    def test_render__int_wider_than_64_bits__same_bytes_as_drf(self, backend):
+        data = {"big": 2**70}
+
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"score": 1.5e-6, "x": 1e16},
+            [0.00001, -2e-7, 1.5e300, 1.2345678901234568e17],
+            {"ratio": 0.0001, "big": 1e15},
+            1e16,
+        ],
+    )
+    def test_render__floats_in_exponent_notation__same_bytes_as_drf(
+        self, backend, data
+    ):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+class TestFastJSONParser:
+    """
+    parse__same_data_as_drf
+    parse__invalid__same_error_as_drf
+    """
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            b'{"ids": [3, 1, 2], "title": "Caf\\u00e9", "ratio": 0.1}',
+            b'{"big": 1180591620717411303424}',
+            b'["\\ud800"]',
+        ],
+    )
+    def test_parse__same_data_as_drf(self, backend, body):
+        assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+            io.BytesIO(body)
+        )
+
+    @pytest.mark.parametrize("body", [b"{", b"[NaN]", b"\xff"])
+    def test_parse__invalid__same_error_as_drf(self, backend, body):
+        with pytest.raises(ParseError) as expected:
+            JSONParser().parse(io.BytesIO(body))
+
+        with pytest.raises(ParseError) as error:
+            FastJSONParser().parse(io.BytesIO(body))
+
+        assert str(error.value) == str(expected.value)
@@ -0,0 +1,62 @@
+from django.contrib.auth.models import User
+from django.test import RequestFactory
+from rest_framework import serializers
+
+import pytest
+from ..rows import RowSerializer
+from ..serializers import UserRowSerializer, UserSerializer
+
+
+@pytest.fixture
+def users():
+    return [
+        User.objects.create_user(username=f"user-{i}", email=f"user-{i}@example.com")
+        for i in range(3)
+    ]
+
+
+class UserDateRowSerializer(RowSerializer):
+    fields = ["name", "last_login"]
+    sources = {"name": "username"}
+    conversions = {"last_login": serializers.DateTimeField()}
+
+
+@pytest.mark.django_db()
+class TestRowSerializer:
+    """
+    serialize__same_output_as_model_serializer
+    serialize__url_keeps_format_suffix
+    serialize__reads_sources_and_converts_values
+    """
+
+    def rows(self, serializer):
+        return User.objects.order_by("id").values_list(*serializer.columns)
+
+    def test_serialize__same_output_as_model_serializer(self, users):
+        request = RequestFactory().get("/users/")
+
+        serializer = UserRowSerializer(request)
+
+        assert (
+            serializer.serialize(self.rows(serializer))
+            == UserSerializer(users, many=True, context={"request": request}).data
+        )
+
+    def test_serialize__url_keeps_format_suffix(self, users):
+        request = RequestFactory().get("/users.json")
+
+        serializer = UserRowSerializer(request, "json")
+
+        assert serializer.serialize(self.rows(serializer))[0]["url"] == (
+            f"http://testserver/users/{users[0].id}.json"
+        )
+
+    def test_serialize__reads_sources_and_converts_values(self, users):
+        User.objects.filter(pk=users[0].pk).update(last_login="2023-01-02T03:04:05Z")
+
+        serializer = UserDateRowSerializer()
+
+        assert serializer.serialize(self.rows(serializer))[:2] == [
+            {"name": "user-0", "last_login": "2023-01-02T03:04:05Z"},
+            {"name": "user-1", "last_login": None},
+        ]
@@ -0,0 +1,139 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+import pytest
+from ..tokens import revoked_tokens
+
+
+def obtain(username="john-doe", password="defaultuser12345"):
+    return APIClient().post(
+        "/api-token/", {"username": username, "password": password}, format="json"
+    )
+
+
+def bearer(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def write(client, board):
+    """Reorder the board's lists: a POST, which needs add_kanbanboard."""
+    ids = list(board.kanbanlist_set.values_list("id", flat=True))
+    return client.post(f"/boards/{board.id}/reorder/", {"ids": ids}, format="json")
+
+
+@pytest.mark.django_db()
+class TestSignedTokens:
+    """
+    obtain__with_credentials__issues_a_token
+    obtain__with_bad_credentials__fails
+    write__with_a_token__authenticates_without_queries
+    write__with_a_tampered_token__is_unauthorized
+    write__with_an_expired_token__is_unauthorized
+    write__with_a_revoked_token__is_unauthorized
+    write__with_a_token_revoked_elsewhere__is_unauthorized_once_reloaded
+    write__after_the_cache_is_cleared__still_authenticates
+    write__after_a_password_change__is_unauthorized
+    write__after_a_login__still_authenticates
+    write__after_leaving_a_group__is_forbidden
+    """
+
+    def token(self):
+        response = obtain()
+        assert response.status_code == 200, response.data
+        return response.data["token"]
+
+    def test_obtain__with_credentials__issues_a_token(self, user, board):
+        response = obtain()
+
+        assert response.status_code == 200
+        assert response.data["expires"] > 0
+        assert write(bearer(response.data["token"]), board).status_code == 200
+
+    def test_obtain__with_bad_credentials__fails(self, user):
+        assert obtain(password="wrong").status_code == 400
+
+    def test_write__with_a_token__authenticates_without_queries(self, user, board):
+        client = bearer(self.token())
+        write(client, board)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = write(client, board)
+
+        assert response.status_code == 200
+        assert [
+            query["sql"]
+            for query in queries
+            if "auth_" in query["sql"]
+            or "django_session" in query["sql"]
+            or "revokedtoken" in query["sql"]
+        ] == []
+        assert "sessionid" not in response.cookies
+
+    def test_write__with_a_tampered_token__is_unauthorized(self, user, board):
+        token = self.token()
+        tampered = token[:-1] + ("A" if token[-1] != "A" else "B")
+
+        response = write(bearer(tampered), board)
+
+        assert response.status_code == 401
+        assert response["WWW-Authenticate"] == "Bearer"
+
+    def test_write__with_an_expired_token__is_unauthorized(self, user, board, settings):
+        settings.AUTH_TOKENS = {**settings.AUTH_TOKENS, "lifetime": 0}
+
+        response = write(bearer(self.token()), board)
+
+        assert response.status_code == 401
+        assert response.data["detail"] == "Token has expired."
+
+    def test_write__with_a_revoked_token__is_unauthorized(self, user, board):
+        client = bearer(self.token())
+
+        assert client.post("/api-token/revoke/").status_code == 204
+
+        assert write(client, board).status_code == 401
+        assert write(bearer(self.token()), board).status_code == 200
+
+    def test_write__with_a_token_revoked_elsewhere__is_unauthorized_once_reloaded(
+        self, user, board
+    ):
+        client = bearer(self.token())
+        client.post("/api-token/revoke/")
+        # Another process, which has yet to load the revocation.
+        revoked_tokens.reset()
+
+        assert write(client, board).status_code == 401
+
+    def test_write__after_the_cache_is_cleared__still_authenticates(self, user, board):
+        client = bearer(self.token())
+
+        cache.clear()
+
+        assert write(client, board).status_code == 200
+
+    def test_write__after_a_password_change__is_unauthorized(self, user, board):
+        client = bearer(self.token())
+
+        user.set_password("newpassword12345")
+        user.save()
+
+        assert write(client, board).status_code == 401
+
+    def test_write__after_a_login__still_authenticates(self, user, board):
+        client = bearer(self.token())
+
+        APIClient().login(username="john-doe", password="defaultuser12345")
+
+        assert write(client, board).status_code == 200
+
+    def test_write__after_leaving_a_group__is_forbidden(self, user, board, editors):
+        client = bearer(self.token())
+        write(client, board)
+
+        user.groups.remove(editors)
+
+        assert write(client, board).status_code == 403
@@ -0,0 +1,42 @@
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+import pytest
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username="john-doe", password="defaultuser12345")
+
+
+@pytest.mark.django_db()
+class TestUserConditionalGet:
+    """
+    list__if_none_match__not_modified
+    list__if_none_match__after_user_change__sends_new_list
+    list__etag_depends_on_format
+    """
+
+    def test_list__if_none_match__not_modified(self, user, django_assert_num_queries):
+        etag = APIClient().get("/users/", format="json")["ETag"]
+
+        with django_assert_num_queries(0):
+            response = APIClient().get("/users/", HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+
+    def test_list__if_none_match__after_user_change__sends_new_list(self, user):
+        etag = APIClient().get("/users/")["ETag"]
+
+        user.email = "john@example.com"
+        user.save()
+        response = APIClient().get("/users/", HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.data["results"][0]["email"] == "john@example.com"
+
+    def test_list__etag_depends_on_format(self, user):
+        json_etag = APIClient().get("/users/", HTTP_ACCEPT="application/json")["ETag"]
+        html_etag = APIClient().get("/users/", HTTP_ACCEPT="text/html")["ETag"]
+
+        assert json_etag != html_etag
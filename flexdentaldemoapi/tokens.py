@@ -0,0 +1,159 @@
+"""
+Signed-token authentication, for API clients.
+
+A token is the user's id, the user's version, its expiry and its own
+id, signed (HMAC-SHA256) with SECRET_KEY. Verifying one touches no
+table: the signature and expiry need nothing but the token, the user
+comes from the cache (see flexdentaldemoapi.auth), and revoked tokens
+are looked up in a set held in memory. Nor is a session read or
+written, as it is for every request authenticated by login.
+
+The user's version is derived from their password hash, as Django's
+session auth hash is. It lives in the database with the user; the cache
+only holds a copy, so a token outlives the cache being cleared.
+
+A token stops working when:
+
+- it expires (AUTH_TOKENS["lifetime"] after it was issued);
+- it is revoked, on its own (see RevokedTokens);
+- the user's version changes, with their password;
+- the user is deactivated or deleted.
+
+The user's permissions are not carried by the token. They are checked,
+as they change, against the user's cached permission set.
+
+Clients send the token as "Authorization: Bearer <token>". They obtain
+one from api-token/, with their username and password, and revoke it at
+api-token/revoke/.
+"""
+
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_lazy as _
+from rest_framework import authentication, exceptions
+
+from .auth import CachedModelBackend
+from .models import RevokedToken
+
+SALT = "flexdentaldemoapi.tokens"
+
+
+def user_version(user):
+    return user.get_session_auth_hash()
+
+
+def issue(user):
+    """Return a new token for the user, and when it expires (a timestamp)."""
+
+    expires = int(time.time()) + settings.AUTH_TOKENS["lifetime"]
+    token = signing.Signer(salt=SALT).sign_object(
+        {
+            "id": uuid.uuid4().hex,
+            "user": user.pk,
+            "version": user_version(user),
+            "expires": expires,
+        }
+    )
+    return token, expires
+
+
+def verify(token):
+    """
+    Return the user a token was issued to, and its payload. Raise
+    AuthenticationFailed if it is not one of ours, or no longer good.
+    """
+
+    try:
+        payload = signing.Signer(salt=SALT).unsign_object(token)
+    except signing.BadSignature:
+        raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+    if payload["expires"] <= time.time():
+        raise exceptions.AuthenticationFailed(_("Token has expired."))
+    if payload["id"] in revoked_tokens:
+        raise exceptions.AuthenticationFailed(_("Token has been revoked."))
+
+    user = CachedModelBackend().get_user(payload["user"])
+    if user is None:
+        raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+    if not constant_time_compare(payload["version"], user_version(user)):
+        raise exceptions.AuthenticationFailed(_("Token has been revoked."))
+
+    return user, payload
+
+
+class RevokedTokens:
+    """
+    The ids of revoked tokens that have yet to expire, held in memory.
+
+    Revocations are kept in the database, and each process reloads them
+    at most every AUTH_TOKENS["revocations_refresh"] seconds: a token
+    revoked by one process may still be accepted by the others for that
+    long. Within the process that revoked it, it is refused at once.
+    """
+
+    def __init__(self):
+        self.ids = set()
+        self.stale_at = 0
+
+    def __contains__(self, token_id):
+        if time.monotonic() >= self.stale_at:
+            self.load()
+        return token_id in self.ids
+
+    def load(self):
+        self.ids = set(
+            RevokedToken.objects.filter(expires__gt=now()).values_list(
+                "token_id", flat=True
+            )
+        )
+        self.stale_at = time.monotonic() + settings.AUTH_TOKENS["revocations_refresh"]
+
+    def revoke(self, payload):
+        expires = datetime.fromtimestamp(payload["expires"], timezone.utc)
+        RevokedToken.objects.filter(expires__lte=now()).delete()
+        RevokedToken.objects.get_or_create(
+            token_id=payload["id"], defaults={"expires": expires}
+        )
+        self.ids.add(payload["id"])
+
+    def reset(self):
+        """Forget what was loaded, so the next check reloads (for tests)."""
+
+        self.ids = set()
+        self.stale_at = 0
+
+
+revoked_tokens = RevokedTokens()
+
+
+def now():
+    return datetime.now(timezone.utc)
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """Authenticates "Authorization: Bearer <token>" requests."""
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_("Invalid token header."))
+
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(_("Invalid token header."))
+
+        return verify(token)
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,27 @@
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+@contextmanager
+def atomic_write(using=None):
+    """
+    transaction.atomic(), for a block that writes.
+
+    On SQLite with a transaction_mode (see flexdentaldemoapi.backends.sqlite3),
+    an outermost atomic_write() block begins in that mode, e.g. IMMEDIATE:
+    it takes the write lock up front, and so waits its turn rather than
+    failing to upgrade a read lock. Plain atomic() blocks begin DEFERRED,
+    and read alongside the writer. Elsewhere, this is atomic().
+    """
+
+    connection = transaction.get_connection(using)
+    writing = getattr(connection, "writing", False)
+    connection.writing = True
+    try:
+        with transaction.atomic(using=using):
+            # Only the outermost block begins a transaction.
+            connection.writing = writing
+            yield
+    finally:
+        connection.writing = writing
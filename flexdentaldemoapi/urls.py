@@ -1,13 +1,31 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework import routers
-from .views import UserViewSet
+from kanban.views import (
+    KanbanBoardViewSet,
+    KanbanCardViewSet,
+    KanbanListViewSet,
+    board_changes,
+    board_snapshot,
+)
+from .instrumentation import metrics
+from .views import ObtainTokenView, RevokeTokenView, UserViewSet
 
 router = routers.DefaultRouter()
 router.register(r"users", UserViewSet)
+router.register(r"boards", KanbanBoardViewSet)
+router.register(r"lists", KanbanListViewSet)
+router.register(r"cards", KanbanCardViewSet)
 
 urlpatterns = [
     # path("admin/", admin.site.urls),
+    # Async JSON reads of boards; see kanban.views.
+    path("boards/<int:pk>/", board_snapshot),
+    path("boards/<int:pk>/changes/", board_changes),
     path("", include(router.urls)),
     path("api-auth/", include("rest_framework.urls", namespace="rest_framework")),
+    # Signed tokens, for API clients; see flexdentaldemoapi.tokens.
+    path("api-token/", ObtainTokenView.as_view(), name="api-token"),
+    path("api-token/revoke/", RevokeTokenView.as_view(), name="api-token-revoke"),
+    path("metrics/", metrics, name="metrics"),
 ]
@@ -1,8 +1,51 @@
 from django.contrib.auth.models import User
-from rest_framework import viewsets
-from .serializers import UserSerializer
+from django.db.models.signals import post_delete, post_save
+from rest_framework import permissions, status, viewsets
+from rest_framework.authtoken.serializers import AuthTokenSerializer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .conditional import ConditionalGetMixin, VersionToken
+from .rows import RowListModelMixin
+from .serializers import UserRowSerializer, UserSerializer
+from .tokens import SignedTokenAuthentication, issue, revoked_tokens
 
+users_version = VersionToken("users:version")
+post_save.connect(users_version.bump, sender=User)
+post_delete.connect(users_version.bump, sender=User)
 
-class UserViewSet(viewsets.ModelViewSet):
+
+class UserViewSet(ConditionalGetMixin, RowListModelMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    row_serializer_class = UserRowSerializer
+    keyset = ("id",)
+
+    def get_validators(self, request, *args, **kwargs):
+        return f"users-{users_version.get()}", None
+
+
+class ObtainTokenView(APIView):
+    """Exchange a username and password for a signed token."""
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    serializer_class = AuthTokenSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        token, expires = issue(serializer.validated_data["user"])
+        return Response({"token": token, "expires": expires})
+
+
+class RevokeTokenView(APIView):
+    """Revoke the signed token the request was authenticated with."""
+
+    authentication_classes = [SignedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        revoked_tokens.revoke(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
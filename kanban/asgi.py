@@ -0,0 +1,99 @@
+import asyncio
+import contextlib
+import json
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .events import current_board_event, hub
+
+EVENTS_PATH = re.compile(r"^/boards/(?P<board_id>\d+)/events/$")
+
+
+class BoardEventStream:
+    """
+    ASGI middleware that streams board events as Server-Sent Events at
+    GET /boards/<id>/events/, and passes every other request to `app`.
+
+    The stream opens with the board's current event, then sends one event
+    per committed change to the board:
+
+        id: <cursor>
+        event: board
+        data: {"id": <board id>, "version": <version>, "cursor": <cursor>}
+
+    The cursor is the one the board's `changes` action takes as `since`,
+    so a client can catch up from the last event id it saw. A comment
+    line is sent after `heartbeat` seconds without events, to keep
+    proxies from timing the stream out.
+    """
+
+    def __init__(self, app, hub=hub, heartbeat=None):
+        self.app = app
+        self.hub = hub
+        self.heartbeat = heartbeat or settings.KANBAN.get("events_heartbeat")
+
+    async def __call__(self, scope, receive, send):
+        match = scope["type"] == "http" and EVENTS_PATH.match(scope["path"])
+        if not match:
+            return await self.app(scope, receive, send)
+
+        if scope["method"] != "GET":
+            return await self.respond(send, 405, b"Method not allowed.")
+
+        board_id = int(match["board_id"])
+
+        # Subscribe before reading the current event, so that no change
+        # can slip in between the two unseen.
+        with self.hub.subscribe(board_id) as subscription:
+            event = await sync_to_async(current_board_event)(board_id)
+            if event is None:
+                return await self.respond(send, 404, b"Not found.")
+
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/event-stream"),
+                        (b"cache-control", b"no-cache"),
+                        (b"x-accel-buffering", b"no"),
+                    ],
+                }
+            )
+            await self.send_event(send, event)
+
+            stream = asyncio.create_task(self.stream(subscription, send))
+            try:
+                while (await receive())["type"] != "http.disconnect":
+                    pass
+            finally:
+                stream.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await stream
+
+    async def stream(self, subscription, send):
+        while True:
+            event = await subscription.get(timeout=self.heartbeat)
+            if event is None:
+                await self.send_body(send, b": heartbeat\n\n")
+            else:
+                await self.send_event(send, event)
+
+    async def send_event(self, send, event):
+        message = f"id: {event['cursor']}\nevent: board\ndata: {json.dumps(event)}\n\n"
+        await self.send_body(send, message.encode())
+
+    async def send_body(self, send, body):
+        await send({"type": "http.response.body", "body": body, "more_body": True})
+
+    async def respond(self, send, status, body):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"text/plain")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
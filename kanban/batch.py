@@ -0,0 +1,456 @@
+"""
+Batches of edits to one board's lists and cards, in one transaction.
+
+A batch is an ordered list of operations, e.g.:
+
+    {"op": "create", "model": "list", "title": "To do", "position": 0}
+    {"op": "create", "model": "card", "list": "$0", "content": "Call the lab"}
+    {"op": "update", "model": "board", "title": "Front desk"}
+    {"op": "update", "model": "card", "id": 7, "content": "Call the lab again"}
+    {"op": "move", "model": "card", "id": 7, "list": 3, "position": 0}
+    {"op": "delete", "model": "list", "id": 4}
+
+Rows are named by id, or as "$n": the row created by the batch's n-th
+operation (counted from 0). Positions are zero-indexed among the row's
+siblings, as for OrdinalManager.move; a create without one appends.
+
+The operations are applied, in order, to the board as read into memory:
+every list of the board, and the cards of each list whose order changes,
+in one query each. Ordinal work is coalesced: each list (and the board's
+list of lists) whose order changed is renumbered once, when the batch
+is written, however many operations changed it (see ordinals.renumber).
+Writing is then a handful of set-based statements per model, not a
+query per operation.
+"""
+
+from django.db import models
+from django.db.models import Case, F, When
+
+from .models import KanbanBoard, KanbanList, KanbanCard, KanbanChange
+from .ordinals import renumber
+
+
+class BatchError(ValueError):
+    """An operation that cannot be applied; then none of the batch is."""
+
+    def __init__(self, index, message):
+        super().__init__(f"operation {index}: {message}")
+        self.index = index
+        self.message = message
+
+
+class Row:
+    """A list or card as the batch leaves it."""
+
+    def __init__(self, model, pk=None, scope=None, ordinal=None, **fields):
+        self.model = model
+        self.pk = pk
+        # The scope the row is in (None for a list, whose scope is the
+        # board; a list Row for a card), and the one it was read in.
+        self.scope = self.loaded_scope = scope
+        # The row's ordinal, and the one it was read with.
+        self.ordinal = self.loaded_ordinal = ordinal
+        # Its title (a list) or content (a card), when known.
+        self.fields = fields
+        self.changed = set()
+        self.deleted = False
+
+    @property
+    def new(self):
+        return self.loaded_ordinal is None
+
+    @property
+    def moved(self):
+        return self.scope is not self.loaded_scope
+
+    @property
+    def gone(self):
+        # A card is deleted with its list.
+        return self.deleted or (self.scope is not None and self.scope.deleted)
+
+    def instance(self, board_id):
+        """Return the row as a model instance of its final fields."""
+
+        if self.model is KanbanList:
+            scope = {"kanban_board_id": board_id}
+        else:
+            scope = {"kanban_list_id": self.scope.pk}
+        return self.model(pk=self.pk, ordinal=self.ordinal, **scope, **self.fields)
+
+
+class Batch:
+    """
+    The operations of a batch on one board, applied in memory by `apply`
+    and then written in one go by `write`; `run` does both.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.title = None
+        self.lists = {}
+        self.cards = {}
+        # The rows of each scope in order: the board's lists under None,
+        # a list's cards under its Row. Only scopes whose order changes.
+        self.orders = {}
+        # The row (or board) that each operation applied to, in order.
+        self.targets = []
+
+    def run(self, operations):
+        """
+        Apply a batch's operations (validated by BatchOperationSerializer)
+        and write the result, in the caller's transaction. Returns one
+        result per operation. Raises BatchError, naming the operation,
+        for one that cannot be applied.
+        """
+
+        self.read(operations)
+        for index, operation in enumerate(operations):
+            self.targets.append(self.apply(index, operation))
+        self.write()
+        return [self.result(target) for target in self.targets]
+
+    # Reading
+
+    def read(self, operations):
+        """Read the board's lists, and the cards the operations touch."""
+
+        KanbanList.objects.lock_scope(self.board)
+
+        self.orders[None] = []
+        for pk, title, ordinal in (
+            KanbanList.objects.in_scope(self.board)
+            .order_by("ordinal")
+            .values_list("pk", "title", "ordinal")
+        ):
+            row = Row(KanbanList, pk, None, ordinal, title=title)
+            self.lists[pk] = row
+            self.orders[None].append(row)
+
+        # The cards the operations name, then the cards of every list
+        # whose order they may change, each in one query.
+        card_ids = {
+            operation["id"]
+            for operation in operations
+            if operation["model"] == "card" and isinstance(operation.get("id"), int)
+        }
+        for pk, list_id, ordinal, content in KanbanCard.objects.filter(
+            pk__in=card_ids, kanban_list__in=list(self.lists)
+        ).values_list("pk", "kanban_list_id", "ordinal", "content"):
+            self.cards[pk] = Row(
+                KanbanCard, pk, self.lists[list_id], ordinal, content=content
+            )
+
+        list_ids = {
+            operation["list"]
+            for operation in operations
+            if isinstance(operation.get("list"), int)
+            and operation["list"] in self.lists
+        }
+        list_ids.update(
+            self.cards[operation["id"]].scope.pk
+            for operation in operations
+            if operation["model"] == "card"
+            and operation["op"] in ("move", "delete")
+            and operation.get("id") in self.cards
+        )
+        for kanban_list in self.lists.values():
+            if kanban_list.pk in list_ids:
+                self.orders[kanban_list] = []
+        for pk, list_id, ordinal in (
+            KanbanCard.objects.filter(kanban_list__in=list_ids)
+            .order_by("kanban_list", "ordinal")
+            .values_list("pk", "kanban_list_id", "ordinal")
+        ):
+            row = self.cards.get(pk)
+            if row is None:
+                row = Row(KanbanCard, pk, self.lists[list_id], ordinal)
+                self.cards[pk] = row
+            self.orders[row.scope].append(row)
+
+    # Applying
+
+    def apply(self, index, operation):
+        op, model = operation["op"], operation["model"]
+
+        if model == "board":
+            self.title = operation["title"]
+            return self.board
+
+        if op == "create":
+            if model == "list":
+                row = Row(KanbanList, title=operation["title"])
+            else:
+                scope = self.resolve(index, KanbanList, operation["list"])
+                row = Row(KanbanCard, scope=scope, content=operation["content"])
+            self.place(row, operation.get("position"))
+            return row
+
+        row = self.resolve(index, self.model(model), operation["id"])
+
+        if op == "update":
+            field = "title" if model == "list" else "content"
+            row.fields[field] = operation[field]
+            row.changed.add(field)
+
+        elif op == "move":
+            self.orders[row.scope].remove(row)
+            if "list" in operation:
+                row.scope = self.resolve(index, KanbanList, operation["list"])
+            self.place(row, operation["position"])
+
+        elif op == "delete":
+            self.orders[row.scope].remove(row)
+            row.deleted = True
+
+        return row
+
+    def place(self, row, position):
+        order = self.orders.setdefault(row.scope, [])
+        order.insert(len(order) if position is None else max(position, 0), row)
+
+    def resolve(self, index, model, reference):
+        """Return the Row of a list or card of this board, by id or "$n"."""
+
+        name = model._meta.verbose_name
+        if isinstance(reference, str):
+            created = int(reference[1:])
+            if created >= index:
+                raise BatchError(index, f"{reference} is not an earlier operation")
+            row = self.targets[created]
+            if getattr(row, "model", None) is not model or not row.new:
+                raise BatchError(index, f"{reference} did not create a {name}")
+        else:
+            row = (self.lists if model is KanbanList else self.cards).get(reference)
+            if row is None:
+                raise BatchError(index, f"there is no {name} {reference} on this board")
+
+        if row.gone:
+            raise BatchError(index, f"{reference} has been deleted")
+        return row
+
+    @staticmethod
+    def model(name):
+        return KanbanList if name == "list" else KanbanCard
+
+    # Writing
+
+    def write(self):
+        KanbanBoard.objects.bump_version(self.board.pk)
+
+        rewritten = self.renumber()
+        # The cards that were in a deleted list are deleted with it.
+        deleted = [row for row in self.lists.values() if row.deleted]
+        deleted += [
+            row
+            for row in self.cards.values()
+            if row.gone and not row.new and not row.loaded_scope.deleted
+        ]
+
+        # Cards may move into lists that the batch creates, which must
+        # then exist first: those lists are inserted out of the way, past
+        # every ordinal of the board's lists, and put in place with the
+        # lists that stay.
+        hosts = self.hosts(rewritten)
+        self.create(KanbanList, hosts, parked=True)
+
+        # Deleted cards leave their ordinals free before the cards that
+        # stay are rewritten; the cards that leave a deleted list leave it
+        # before the list is deleted, and its cards with it; the lists
+        # that stay are rewritten once the deleted lists are gone.
+        self.delete(KanbanCard, deleted)
+        self.rewrite(KanbanCard, rewritten)
+        self.delete(KanbanList, deleted)
+        self.rewrite(KanbanList, rewritten + hosts)
+
+        created = hosts + self.create(KanbanList) + self.create(KanbanCard)
+        updated = self.update()
+        self.count()
+        if self.title is not None:
+            KanbanBoard.objects.filter(pk=self.board.pk).update(title=self.title)
+        self.record(deleted, rewritten, created, updated)
+
+    def scopes(self):
+        """The orders of the scopes that the batch changed and did not delete."""
+
+        return [
+            (scope, order)
+            for scope, order in self.orders.items()
+            if scope is None or not scope.deleted
+        ]
+
+    def renumber(self):
+        """
+        Give the rows of every scope whose order changed their new
+        ordinals. Returns the existing rows whose ordinal (or list) changed.
+        """
+
+        rewritten = []
+        for scope, order in self.scopes():
+            held = [
+                None if row.new or row.moved else row.loaded_ordinal for row in order
+            ]
+            for row, ordinal in zip(order, renumber(held)):
+                row.ordinal = ordinal
+                if not row.new and (row.moved or ordinal != row.loaded_ordinal):
+                    rewritten.append(row)
+        return rewritten
+
+    def delete(self, model, deleted):
+        ids = [row.pk for row in deleted if row.model is model]
+        if ids:
+            model.objects.filter(pk__in=ids).delete()
+
+    def rewrite(self, model, rewritten):
+        rows = [row for row in rewritten if row.model is model]
+        if not rows:
+            return
+
+        # Park the rows on unique negative ordinals first, so that no row
+        # lands on an ordinal that another has yet to leave.
+        if not model.objects.deferred_uniqueness():
+            model.objects.filter(pk__in=[row.pk for row in rows]).update(
+                ordinal=-F("ordinal") - 1
+            )
+
+        fields = ["ordinal"] if model is KanbanList else ["kanban_list", "ordinal"]
+        model.objects.bulk_update([row.instance(self.board.pk) for row in rows], fields)
+
+    def hosts(self, rewritten):
+        """The new lists that existing cards move into, in order."""
+
+        scopes = {row.scope for row in rewritten if row.model is KanbanCard}
+        return [row for row in self.orders[None] if row.new and row in scopes]
+
+    def create(self, model, rows=None, parked=False):
+        """
+        Insert the new rows of a model that are not yet inserted, or the
+        given ones; parked, past every ordinal of their scope, rather than
+        at their own ordinals. Returns them.
+        """
+
+        if rows is None:
+            rows = [
+                row
+                for scope, order in self.scopes()
+                for row in order
+                if row.new and row.pk is None and row.model is model
+            ]
+        instances = [row.instance(self.board.pk) for row in rows]
+        if parked and rows:
+            top = max(
+                [row.ordinal for row in self.orders[None]]
+                + [row.loaded_ordinal for row in self.lists.values() if not row.new]
+            )
+            for offset, instance in enumerate(instances, 1):
+                instance.ordinal = top + offset
+        model.objects.bulk_create(instances)
+        for row, instance in zip(rows, instances):
+            row.pk = instance.pk
+            (self.lists if model is KanbanList else self.cards)[row.pk] = row
+        return rows
+
+    def update(self):
+        """Write the titles and content the batch changed. Returns those rows."""
+
+        updated = []
+        for model, field in [(KanbanList, "title"), (KanbanCard, "content")]:
+            rows = [
+                row
+                for row in self.rows(model)
+                if field in row.changed and not row.new and not row.gone
+            ]
+            if rows:
+                model.objects.bulk_update(
+                    [model(pk=row.pk, **{field: row.fields[field]}) for row in rows],
+                    [field],
+                )
+            updated += rows
+        return updated
+
+    def rows(self, model):
+        return (self.lists if model is KanbanList else self.cards).values()
+
+    def count(self):
+        """Set the kept counts of the board and lists whose rows were counted."""
+
+        KanbanBoard.objects.filter(pk=self.board.pk).update(
+            list_count=len(self.orders[None])
+        )
+
+        counts = {
+            scope.pk: len(order) for scope, order in self.scopes() if scope is not None
+        }
+        if counts:
+            KanbanList.objects.filter(pk__in=counts).update(
+                card_count=Case(
+                    *(When(pk=pk, then=count) for pk, count in counts.items()),
+                    output_field=models.IntegerField(),
+                )
+            )
+
+    def record(self, deleted, rewritten, created, updated):
+        """
+        Record the batch in the board's change log, in one INSERT: what it
+        deleted, then the new ordinals of the rows that stayed in their
+        scope, then the rows it moved to another list or edited, then the
+        rows it created. Replayed in that order, the changes reproduce the
+        board as the batch left it.
+        """
+
+        board_id = self.board.pk
+
+        def change(kind, model, object_id=None, **data):
+            return KanbanChange(
+                kanban_board_id=board_id,
+                kind=kind,
+                model=model._meta.model_name,
+                object_id=object_id,
+                data=data,
+            )
+
+        changes = [change("delete", row.model, row.pk) for row in deleted]
+
+        reordered = {}
+        for row in rewritten:
+            if not row.moved:
+                reordered.setdefault(row.scope, {})[row.pk] = row.ordinal
+        for scope, ordinals in reordered.items():
+            model = KanbanList if scope is None else KanbanCard
+            scope_id = board_id if scope is None else scope.pk
+            changes.append(
+                change("reorder", model, scope_id=scope_id, ordinals=ordinals)
+            )
+
+        edited = [row for row in rewritten if row.moved]
+        edited += [row for row in updated if row not in edited]
+        for kind, rows in [("update", edited), ("create", created)]:
+            for row in rows:
+                data = row.instance(board_id).change_data()
+                changes.append(change(kind, row.model, row.pk, **data))
+
+        if self.title is not None:
+            changes.append(change("update", KanbanBoard, board_id, title=self.title))
+
+        KanbanChange.objects.bulk_create(changes)
+
+    # Results
+
+    def result(self, target):
+        if target is self.board:
+            return {"id": self.board.pk, "title": self.title}
+
+        if target.gone:
+            return {"id": target.pk, "deleted": True}
+
+        if target.model is KanbanList:
+            return {
+                "id": target.pk,
+                "ordinal": target.ordinal,
+                "title": target.fields["title"],
+            }
+        return {
+            "id": target.pk,
+            "list": target.scope.pk,
+            "ordinal": target.ordinal,
+            "content": target.fields["content"],
+        }
@@ -0,0 +1,13 @@
+"""
+Benchmarks of the kanban app.
+
+- A suite of the ordinal operations on kanban lists and cards, on boards
+  of growing size: `python manage.py benchmark_ordinals`. `suite` seeds
+  the boards and defines the operations; `runner` times them, counts the
+  queries and rows they write, and writes and compares the
+  machine-readable results.
+- A load test of the WSGI and ASGI applications: `python manage.py
+  loadtest`. `scenarios` defines the mixes of client requests it
+  replays, `transports` how they reach an application, and `load` runs
+  the virtual users and reports latency, throughput and errors.
+"""
@@ -0,0 +1,211 @@
+import asyncio
+import math
+import random
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import Client
+from django.utils.crypto import get_random_string
+
+from .scenarios import MIXES, VirtualUser
+from .transports import (
+    ASGITransport,
+    HTTPTransport,
+    WSGITransport,
+    serving_asgi,
+    serving_wsgi,
+)
+
+APPS = ["wsgi", "asgi"]
+TRANSPORTS = ["inprocess", "socket"]
+
+
+def authenticate():
+    """
+    Log a new superuser in, and return the headers that authenticate its
+    requests: its session cookie, and a CSRF token for its writes.
+    """
+
+    user = User.objects.create_superuser(username="loadtest", password=None)
+    client = Client()
+    client.force_login(user)
+    session = client.cookies[settings.SESSION_COOKIE_NAME].value
+
+    token = get_random_string(32)
+    return {
+        "cookie": (
+            f"{settings.SESSION_COOKIE_NAME}={session}; "
+            f"{settings.CSRF_COOKIE_NAME}={token}"
+        ),
+        # e.g. HTTP_X_CSRFTOKEN, as a header name.
+        settings.CSRF_HEADER_NAME[5:].replace("_", "-").lower(): token,
+    }
+
+
+def load_application(app):
+    if app == "wsgi":
+        from flexdentaldemoapi.wsgi import application
+    else:
+        from flexdentaldemoapi.asgi import application
+    return application
+
+
+@asynccontextmanager
+async def connecting(app, transport, concurrency, wsgi_threads):
+    """Yield a transport to the application, serving it on a socket if need be."""
+
+    application = load_application(app)
+    async with AsyncExitStack() as stack:
+        if transport == "inprocess" and app == "wsgi":
+            client = WSGITransport(application, wsgi_threads)
+        elif transport == "inprocess":
+            client = ASGITransport(application)
+        else:
+            if app == "wsgi":
+                address = stack.enter_context(serving_wsgi(application))
+            else:
+                address = await stack.enter_async_context(serving_asgi(application))
+            client = HTTPTransport(*address, connections=concurrency)
+
+        try:
+            yield client
+        finally:
+            client.close()
+
+
+class Recorder:
+    """The latency and outcome of every request, by kind."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = {}
+        self.errors = {}
+
+    def record(self, kind, seconds, status):
+        self.latencies.setdefault(kind, []).append(seconds)
+        statuses = self.statuses.setdefault(kind, {})
+        statuses[status] = statuses.get(status, 0) + 1
+        # No response at all, or a client or server error. (A poll's 304
+        # Not Modified is a success, and an edit's 409 Conflict, counted
+        # apart, is the optimistic concurrency it asked for.)
+        if status is None or (status >= 400 and status != 409):
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def summary(self, seconds):
+        """Summarize the requests of each kind, and of all kinds, over `seconds`."""
+
+        kinds = {
+            kind: summarize(
+                latencies, self.errors.get(kind, 0), self.statuses[kind], seconds
+            )
+            for kind, latencies in sorted(self.latencies.items())
+        }
+
+        statuses = {}
+        for counts in self.statuses.values():
+            for status, count in counts.items():
+                statuses[status] = statuses.get(status, 0) + count
+        total = summarize(
+            [latency for latencies in self.latencies.values() for latency in latencies],
+            sum(self.errors.values()),
+            statuses,
+            seconds,
+        )
+        return {"total": total, "kinds": kinds}
+
+
+def percentile(ordered, fraction):
+    """The nearest-rank percentile of a sorted list: the value `fraction` of them are at or below."""
+
+    if not ordered:
+        return None
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def summarize(latencies, errors, statuses, seconds):
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "rps": len(ordered) / seconds if seconds else None,
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1] if ordered else None,
+        "errors": errors,
+        "error_rate": errors / len(ordered) if ordered else 0.0,
+        "conflicts": statuses.get(409, 0),
+        # Status codes as strings, as JSON keys are; None for no response.
+        "statuses": {str(status): count for status, count in sorted_statuses(statuses)},
+    }
+
+
+def sorted_statuses(statuses):
+    return sorted(statuses.items(), key=lambda item: (item[0] is None, item[0] or 0))
+
+
+async def simulate(transport, user, actions, weights, headers, deadline, recorder):
+    """Have one virtual user make requests until the deadline."""
+
+    loop = asyncio.get_running_loop()
+    while loop.time() < deadline:
+        (action,) = user.random.choices(actions, weights)
+        steps = action(user)
+        response = None
+        while True:
+            try:
+                request = steps.send(response)
+            except StopIteration:
+                break
+
+            start = time.perf_counter()
+            try:
+                response = await transport.send(request, headers)
+            except Exception:
+                # The rest of this action depends on what failed.
+                recorder.record(request.kind, time.perf_counter() - start, None)
+                break
+            recorder.record(request.kind, time.perf_counter() - start, response.status)
+
+
+async def run_load(
+    app,
+    transport,
+    mix,
+    board,
+    headers,
+    concurrency,
+    duration,
+    wsgi_threads=8,
+    import_rows=100,
+    seed=0,
+):
+    """
+    Replay a mix (see scenarios.MIXES) against an application, with
+    `concurrency` virtual users, for `duration` seconds, their requests
+    authenticated by `headers` (see `authenticate`). Return the summary
+    of their requests.
+    """
+
+    actions = [action for weight, action in MIXES[mix]]
+    weights = [weight for weight, action in MIXES[mix]]
+    # Every user's choices are seeded, so a run can be replayed.
+    users = [
+        VirtualUser(board, random.Random(f"{seed}-{i}"), import_rows)
+        for i in range(concurrency)
+    ]
+
+    recorder = Recorder()
+    async with connecting(app, transport, concurrency, wsgi_threads) as client:
+        start = time.perf_counter()
+        deadline = asyncio.get_running_loop().time() + duration
+        await asyncio.gather(
+            *[
+                simulate(client, user, actions, weights, headers, deadline, recorder)
+                for user in users
+            ]
+        )
+        elapsed = time.perf_counter() - start
+
+    return recorder.summary(elapsed)
@@ -0,0 +1,189 @@
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.db import connection
+
+from flexdentaldemoapi.instrumentation import wrapping_queries
+
+from .suite import CASES, seed
+
+# Bump when the layout of the results changes.
+RESULTS_FORMAT = 1
+
+WRITES = ("INSERT", "UPDATE", "DELETE")
+
+
+class WriteCounter:
+    """
+    An execute wrapper (see `connection.execute_wrapper`) that counts
+    queries, and the rows that the INSERT, UPDATE and DELETE statements
+    among them wrote.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.rowcounts = 0
+        # SQLite connections, and how many rows each had changed before.
+        self.changes = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        connection = context["connection"]
+        if connection.vendor == "sqlite":
+            # The rows of an INSERT ... RETURNING are only counted once
+            # they are read, after this returns: count them all at the end.
+            self.changes.setdefault(
+                connection.connection, connection.connection.total_changes
+            )
+            return execute(sql, params, many, context)
+
+        result = execute(sql, params, many, context)
+        if sql.lstrip().upper().startswith(WRITES):
+            # -1 when the database cannot tell.
+            self.rowcounts += max(context["cursor"].rowcount, 0)
+        return result
+
+    @property
+    def rows_written(self):
+        return self.rowcounts + sum(
+            database.total_changes - before for database, before in self.changes.items()
+        )
+
+
+def measure(operation, seeded, model, repeat):
+    """Run an operation `repeat` times, and return what each run cost."""
+
+    runs = []
+    for _ in range(repeat):
+        run = operation(seeded, model)
+        counter = WriteCounter()
+        with wrapping_queries(counter):
+            start = time.perf_counter()
+            run()
+            seconds = time.perf_counter() - start
+        runs.append(
+            {
+                "seconds": seconds,
+                "queries": counter.queries,
+                "rows_written": counter.rows_written,
+            }
+        )
+    return runs
+
+
+def summarize(name, model, size, runs):
+    seconds = [run["seconds"] for run in runs]
+    return {
+        "operation": name,
+        "model": model.__name__,
+        "size": size,
+        "seconds": {
+            "min": min(seconds),
+            "median": statistics.median(seconds),
+            "max": max(seconds),
+        },
+        "queries": statistics.median_low([run["queries"] for run in runs]),
+        "rows_written": statistics.median_low([run["rows_written"] for run in runs]),
+        "runs": runs,
+    }
+
+
+def run_suite(sizes, repeat, operations=None, report=None):
+    """
+    Seed a board of each size and run the suite's cases on it. Return
+    the results: one summary per case and size, each passed to `report`
+    as soon as it is measured. `operations` limits the cases to those
+    operation names.
+    """
+
+    results = []
+    for size in sizes:
+        seeded = seed(size)
+        for name, model, operation in CASES:
+            if operations and name not in operations:
+                continue
+            result = summarize(
+                name, model, size, measure(operation, seeded, model, repeat)
+            )
+            results.append(result)
+            if report is not None:
+                report(result)
+    return results
+
+
+def git(*args):
+    try:
+        return subprocess.run(
+            ["git", *args],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """Describe what the results were measured on, so runs can be told apart."""
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": None if status is None else bool(status),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "database_version": getattr(connection, "pg_version", None)
+        or getattr(connection.Database, "sqlite_version", None),
+        "ordinal_gap": settings.KANBAN["ordinal_gap"],
+    }
+
+
+def results_document(results, repeat):
+    return {
+        "format": RESULTS_FORMAT,
+        "environment": environment(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(baseline, current):
+    """
+    Pair up the results of two results documents by operation, model and
+    size, and return, for each pair: the key, both median times, how many
+    times slower the current one is, and the change in queries and rows
+    written. Results in only one of them are left out.
+    """
+
+    def keyed(document):
+        return {
+            (result["operation"], result["model"], result["size"]): result
+            for result in document["results"]
+        }
+
+    before = keyed(baseline)
+    comparisons = []
+    for key, after in keyed(current).items():
+        if key not in before:
+            continue
+        old = before[key]["seconds"]["median"]
+        new = after["seconds"]["median"]
+        comparisons.append(
+            {
+                "key": key,
+                "before": old,
+                "after": new,
+                "ratio": new / old if old else None,
+                "queries": after["queries"] - before[key]["queries"],
+                "rows_written": after["rows_written"] - before[key]["rows_written"],
+            }
+        )
+    return comparisons
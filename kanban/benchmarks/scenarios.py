@@ -0,0 +1,199 @@
+import json
+
+from ..models import KanbanBoard, KanbanList, KanbanCard
+from ..ordinals import spread
+from .transports import Request
+
+JSON = {"accept": "application/json"}
+
+
+class SeededBoard:
+    """The ids of a seeded board, and of its lists and their cards, in order."""
+
+    def __init__(self, id, version, lists, cards):
+        self.id = id
+        self.version = version
+        self.lists = lists
+        self.cards = cards
+
+
+def seed_board(lists, cards, batch_size=10000):
+    """Seed a board of `lists` lists of `cards` cards each."""
+
+    board = KanbanBoard.objects.create(title="Load test")
+    KanbanList.objects.bulk_create(
+        (
+            KanbanList(title=f"List {i}", kanban_board=board, ordinal=ordinal)
+            for i, ordinal in enumerate(spread(lists))
+        ),
+        batch_size=batch_size,
+    )
+    list_ids = list(
+        KanbanList.objects.in_scope(board)
+        .order_by("ordinal")
+        .values_list("pk", flat=True)
+    )
+    KanbanCard.objects.bulk_create(
+        (
+            KanbanCard(content=f"Card {j}", kanban_list_id=list_id, ordinal=ordinal)
+            for list_id in list_ids
+            for j, ordinal in enumerate(spread(cards))
+        ),
+        batch_size=batch_size,
+    )
+    # Bulk inserts leave the kept counts behind.
+    KanbanList.objects.recount(KanbanBoard.objects.filter(pk=board.pk))
+    KanbanCard.objects.recount(KanbanList.objects.in_scope(board))
+
+    card_ids = {list_id: [] for list_id in list_ids}
+    for list_id, card_id in (
+        KanbanCard.objects.filter(kanban_list__kanban_board=board)
+        .order_by("kanban_list", "ordinal")
+        .values_list("kanban_list_id", "pk")
+    ):
+        card_ids[list_id].append(card_id)
+
+    return SeededBoard(board.pk, board.version, list_ids, card_ids)
+
+
+class VirtualUser:
+    """One client of the load test, and what it remembers between requests."""
+
+    def __init__(self, board, random, import_rows):
+        self.board = board
+        self.random = random
+        self.import_rows = import_rows
+        # The validator of the last snapshot read, and the changes cursor.
+        self.etag = None
+        self.cursor = None
+        # The version of the board that the user's edits are made against.
+        self.version = board.version
+
+
+# Each action is a generator of the requests a user makes for one thing
+# it does, one after the other; each yield receives the Response.
+
+
+def poll_snapshot(user):
+    headers = dict(JSON)
+    if user.etag is not None:
+        headers["if-none-match"] = user.etag
+    response = yield Request(
+        "snapshot", "GET", f"/boards/{user.board.id}/", b"", headers
+    )
+    user.etag = response.headers.get("etag", user.etag)
+
+
+def poll_changes(user):
+    path = f"/boards/{user.board.id}/changes/"
+    if user.cursor is not None:
+        path += f"?since={user.cursor}"
+    response = yield Request("changes", "GET", path, b"", JSON)
+    if response.status == 200:
+        user.cursor = json.loads(response.body)["cursor"]
+
+
+def dragged(random, ids):
+    """
+    Return the ids between two random positions, with the one at one end
+    dragged to the other: the partial ordering a drag-and-drop sends.
+    """
+
+    start, end = sorted(random.sample(range(len(ids)), 2))
+    window = ids[start : end + 1]
+    if random.random() < 0.5:
+        return window[1:] + window[:1]
+    return window[-1:] + window[:-1]
+
+
+def reorder(kind, path, ids, **expected):
+    return Request(
+        kind,
+        "POST",
+        path,
+        json.dumps({"ids": ids, **expected}).encode(),
+        {**JSON, "content-type": "application/json"},
+    )
+
+
+def drag_cards(user):
+    # A burst of drags, one right after the other, within one list.
+    list_id = user.random.choice(user.board.lists)
+    for _ in range(user.random.randint(1, 5)):
+        yield reorder(
+            "move_card",
+            f"/lists/{list_id}/reorder/",
+            dragged(user.random, user.board.cards[list_id]),
+        )
+
+
+def drag_list(user):
+    yield reorder(
+        "move_list",
+        f"/boards/{user.board.id}/reorder/",
+        dragged(user.random, user.board.lists),
+    )
+
+
+def drag_contended(user):
+    # Every user drags the cards of the same list, each against the
+    # version of the board it last saw. A drag refused with 409 Conflict
+    # is made again against the version the refusal reports, as a client
+    # would once it had caught up; at most three times in all.
+    list_id = user.board.lists[0]
+    ids = dragged(user.random, user.board.cards[list_id])
+    for _ in range(3):
+        response = yield reorder(
+            "move_card_versioned",
+            f"/lists/{list_id}/reorder/",
+            ids,
+            version=user.version,
+        )
+        if response.status == 409:
+            user.version = json.loads(response.body)["version"]
+            continue
+        if response.status == 200:
+            user.version = int(response.headers["board-version"])
+        break
+
+
+def import_cards(user):
+    body = "".join(
+        json.dumps(
+            {
+                "list": f"List {user.random.randrange(len(user.board.lists))}",
+                "content": f"Imported {i}",
+            }
+        )
+        + "\n"
+        for i in range(user.import_rows)
+    )
+    yield Request(
+        "import",
+        "POST",
+        f"/boards/{user.board.id}/import/",
+        body.encode(),
+        {**JSON, "content-type": "application/jsonl"},
+    )
+
+
+# The mixes of actions a load test can replay, with their weights.
+MIXES = {
+    # Clients keeping a board up to date.
+    "polling": [(7, poll_snapshot), (3, poll_changes)],
+    # Clients rearranging a board.
+    "drag-and-drop": [(8, drag_cards), (2, drag_list)],
+    # Clients rearranging the same list at once, with optimistic
+    # concurrency: measures throughput, and conflicts, under contention.
+    "contended": [(1, drag_contended)],
+    # Clients importing cards.
+    "import": [(1, import_cards)],
+    # Mostly polling, some rearranging, the odd import.
+    "mixed": [
+        (60, poll_snapshot),
+        (25, poll_changes),
+        (10, drag_cards),
+        (4, drag_list),
+        (1, import_cards),
+    ],
+}
@@ -0,0 +1,110 @@
+from flexdentaldemoapi.renderers import FastJSONRenderer
+
+from ..models import KanbanBoard, KanbanList, KanbanCard
+from ..ordinals import spread
+from ..serializers import snapshot_rows
+
+# The sizes of the boards seeded by default. A board of size n has n
+# lists, and its first list has n cards.
+SIZES = [10, 1000, 100000]
+
+
+class Seeded:
+    """A seeded board, and the list that holds its cards."""
+
+    def __init__(self, board, klist, size):
+        self.board = board
+        self.klist = klist
+        self.size = size
+
+    def scope(self, model):
+        """Return the scope whose rows an operation on `model` works on."""
+
+        return self.board if model is KanbanList else self.klist
+
+
+def seed(size, batch_size=10000):
+    """Seed a board of `size` lists, the first of which has `size` cards."""
+
+    board = KanbanBoard.objects.create(title=f"Benchmark {size}")
+    KanbanList.objects.bulk_create(
+        (
+            KanbanList(title=f"List {i}", kanban_board=board, ordinal=ordinal)
+            for i, ordinal in enumerate(spread(size))
+        ),
+        batch_size=batch_size,
+    )
+    klist = KanbanList.objects.in_scope(board).order_by("ordinal").first()
+    KanbanCard.objects.bulk_create(
+        (
+            KanbanCard(content=f"Card {i}", kanban_list=klist, ordinal=ordinal)
+            for i, ordinal in enumerate(spread(size))
+        ),
+        batch_size=batch_size,
+    )
+    # Bulk inserts leave the kept counts behind.
+    KanbanList.objects.recount(KanbanBoard.objects.filter(pk=board.pk))
+    KanbanCard.objects.recount(KanbanList.objects.in_scope(board))
+    return Seeded(board, klist, size)
+
+
+# Each operation prepares one run on a seeded board, and returns what is
+# timed: anything it looks up beforehand is not measured.
+
+
+def append(seeded, model):
+    scope = seeded.scope(model)
+    if model is KanbanList:
+        row = KanbanList(title="Appended", kanban_board=scope)
+    else:
+        row = KanbanCard(content="Appended", kanban_list=scope)
+    return row.save
+
+
+def move_to_top(seeded, model):
+    row = model.objects.in_scope(seeded.scope(model)).order_by("ordinal").last()
+    return lambda: row.change_ordinal(0)
+
+
+def move_to_bottom(seeded, model):
+    rows = model.objects.in_scope(seeded.scope(model))
+    row = rows.order_by("ordinal").first()
+    # The last position, as a client sends it.
+    position = rows.count() - 1
+    return lambda: row.change_ordinal(position)
+
+
+def delete_and_compact(seeded, model):
+    # The middle row: the rows after it are shifted down. Not the list
+    # that holds the cards, which the card operations still need.
+    rows = model.objects.in_scope(seeded.scope(model)).exclude(pk=seeded.klist.pk)
+    row = rows.order_by("ordinal")[rows.count() // 2]
+    return lambda: model.objects.delete_and_compact(row)
+
+
+def reorder(seeded, model):
+    # Every row of the scope, reversed.
+    scope = seeded.scope(model)
+    ids = list(
+        model.objects.in_scope(scope).order_by("-ordinal").values_list("pk", flat=True)
+    )
+    return lambda: model.objects.reorder(scope, ids)
+
+
+def read_board(seeded, model):
+    # As the board view does it, minus the snapshot cache.
+    def read():
+        board = KanbanBoard.objects.get(pk=seeded.board.pk)
+        return FastJSONRenderer().render(snapshot_rows.serialize(board))
+
+    return read
+
+
+# (name, model, operation), run in this order on each seeded board: a
+# board is seeded once per size, and each operation leaves it as the next
+# one finds it.
+CASES = [
+    (operation.__name__, model, operation)
+    for operation in [append, move_to_top, move_to_bottom, delete_and_compact, reorder]
+    for model in [KanbanList, KanbanCard]
+] + [("read_board", KanbanBoard, read_board)]
@@ -0,0 +1,319 @@
+import asyncio
+import http.client
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import unquote
+
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+
+class Request:
+    def __init__(self, kind, method, path, body=b"", headers=None):
+        # What the request is for, e.g. "snapshot": results are grouped by it.
+        self.kind = kind
+        self.method = method
+        self.path = path
+        self.body = body
+        self.headers = headers or {}
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        # Header names in lower case.
+        self.headers = headers
+        self.body = body
+
+
+# Each transport sends a Request to an application, and returns its
+# Response: `await transport.send(request, headers)`, where `headers` are
+# added to the request's own (e.g. those that authenticate it).
+
+
+class WSGITransport:
+    """
+    Calls a WSGI application in-process, on a pool of `threads` worker
+    threads, as a threaded WSGI server would.
+    """
+
+    def __init__(self, application, threads):
+        self.application = application
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+
+    async def send(self, request, headers):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.pool, self.call, request, headers
+        )
+
+    def call(self, request, headers):
+        path, _, query = request.path.partition("?")
+        environ = {
+            "REQUEST_METHOD": request.method,
+            "PATH_INFO": unquote(path),
+            "QUERY_STRING": query,
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "CONTENT_LENGTH": str(len(request.body)),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(request.body),
+            "wsgi.errors": io.StringIO(),
+        }
+        for name, value in {**request.headers, **headers}.items():
+            key = name.upper().replace("-", "_")
+            if key != "CONTENT_TYPE":
+                key = f"HTTP_{key}"
+            environ[key] = value
+
+        started = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            started["status"] = int(status.split()[0])
+            started["headers"] = {
+                name.lower(): value for name, value in response_headers
+            }
+
+        result = self.application(environ, start_response)
+        try:
+            body = b"".join(result)
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        return Response(started["status"], started["headers"], body)
+
+    def close(self):
+        self.pool.shutdown()
+
+
+class ASGITransport:
+    """Calls an ASGI application in-process, on the running event loop."""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def send(self, request, headers):
+        path, _, query = request.path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "scheme": "http",
+            "path": unquote(path),
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "server": ("testserver", 80),
+            "headers": [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in {
+                    "host": "testserver",
+                    "content-length": str(len(request.body)),
+                    **request.headers,
+                    **headers,
+                }.items()
+            ],
+        }
+
+        received = False
+
+        async def receive():
+            nonlocal received
+            if received:
+                # Nothing more will come: wait, as for a client that stays.
+                await asyncio.Event().wait()
+            received = True
+            return {"type": "http.request", "body": request.body}
+
+        started = {}
+        body = []
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                started["status"] = message["status"]
+                started["headers"] = {
+                    name.decode("latin-1").lower(): value.decode("latin-1")
+                    for name, value in message.get("headers", [])
+                }
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+
+        await self.application(scope, receive, send)
+        return Response(started["status"], started["headers"], b"".join(body))
+
+    def close(self):
+        pass
+
+
+class HTTPTransport:
+    """
+    Sends requests over HTTP/1.1 to a server on a local socket, on a pool
+    of `connections` client threads, each keeping its connection open.
+    """
+
+    def __init__(self, host, port, connections):
+        self.host = host
+        self.port = port
+        self.pool = ThreadPoolExecutor(max_workers=connections)
+        self.local = threading.local()
+        self.connections = []
+
+    async def send(self, request, headers):
+        return await asyncio.get_running_loop().run_in_executor(
+            self.pool, self.call, request, headers
+        )
+
+    def call(self, request, headers):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(
+                self.host, self.port
+            )
+            self.connections.append(connection)
+        connection.request(
+            request.method,
+            request.path,
+            body=request.body,
+            # The host that the test environment allows.
+            headers={"host": "testserver", **request.headers, **headers},
+        )
+        response = connection.getresponse()
+        return Response(
+            response.status,
+            {name.lower(): value for name, value in response.getheaders()},
+            response.read(),
+        )
+
+    def close(self):
+        self.pool.shutdown()
+        # So that the server, which waits for its connections, can stop.
+        for connection in self.connections:
+            connection.close()
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def serving_wsgi(application):
+    """
+    Serve a WSGI application on a free local port, with the threaded
+    server of `manage.py runserver`, for as long as the context lasts.
+    Yields the server's (host, port).
+    """
+
+    server = ThreadedWSGIServer(("127.0.0.1", 0), QuietWSGIRequestHandler)
+    server.set_app(application)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@asynccontextmanager
+async def serving_asgi(application):
+    """
+    Serve an ASGI application on a free local port, on the running event
+    loop, for as long as the context lasts. Yields the server's (host, port).
+
+    A minimal HTTP/1.1 server, so that the load test needs nothing but the
+    standard library: requests with a Content-Length body, on connections
+    kept alive unless the response has no Content-Length.
+    """
+
+    handlers = set()
+
+    async def serve(reader, writer):
+        handlers.add(asyncio.current_task())
+        try:
+            while await serve_one(reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            handlers.discard(asyncio.current_task())
+
+    async def serve_one(reader, writer):
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return False
+        method, target, _ = request_line.decode("latin-1").split()
+
+        headers = []
+        while True:
+            line = await reader.readline()
+            if not line.strip():
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers.append(
+                (
+                    name.strip().lower().encode("latin-1"),
+                    value.strip().encode("latin-1"),
+                )
+            )
+        length = int(dict(headers).get(b"content-length", 0))
+        body = await reader.readexactly(length) if length else b""
+
+        path, _, query = target.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": unquote(path),
+            "raw_path": path.encode("latin-1"),
+            "query_string": query.encode("latin-1"),
+            "headers": headers,
+            "server": writer.get_extra_info("sockname")[:2],
+            "client": writer.get_extra_info("peername")[:2],
+        }
+
+        received = False
+
+        async def receive():
+            nonlocal received
+            if received:
+                await asyncio.Event().wait()
+            received = True
+            return {"type": "http.request", "body": body}
+
+        keep_alive = True
+
+        async def send(message):
+            nonlocal keep_alive
+            if message["type"] == "http.response.start":
+                response_headers = list(message.get("headers", []))
+                names = {name.lower() for name, value in response_headers}
+                # Without a length, the end of the body is the end of the connection.
+                if b"content-length" not in names:
+                    keep_alive = False
+                    response_headers.append((b"connection", b"close"))
+                head = [f"HTTP/1.1 {message['status']} \r\n".encode("latin-1")]
+                head += [
+                    name + b": " + value + b"\r\n" for name, value in response_headers
+                ]
+                writer.write(b"".join(head) + b"\r\n")
+            elif message["type"] == "http.response.body":
+                writer.write(message.get("body", b""))
+                await writer.drain()
+
+        await application(scope, receive, send)
+        return keep_alive
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    try:
+        yield server.sockets[0].getsockname()[:2]
+    finally:
+        server.close()
+        await server.wait_closed()
+        # Let the requests in flight finish, once their clients have left.
+        if handlers:
+            await asyncio.wait(handlers, timeout=5)
@@ -0,0 +1,216 @@
+"""
+Bulk import and export of a board's lists and cards.
+
+Both directions use the same rows, one per card, in board order:
+
+    {"list": "To do", "content": "Write the spec"}    (JSON Lines)
+    list,content                                        (CSV, with a header)
+    To do,Write the spec
+
+A list without cards is one row without content. Rows are parsed,
+written and rendered as streams, so memory stays flat however large
+the board is.
+"""
+
+import csv
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Case, F, Max, When
+from flexdentaldemoapi.transactions import atomic_write
+
+from .models import KanbanBoard, KanbanList, KanbanCard, KanbanChange
+from .models import KANBANLIST_TITLE_MAXLENGTH
+from .ordinals import ordinal_between
+
+FORMATS = ["jsonl", "csv"]
+
+CONTENT_TYPES = {
+    "jsonl": "application/jsonl",
+    "csv": "text/csv",
+}
+
+
+def parse_rows(lines, format):
+    """
+    Parse lines of text in the given format into (list title, content)
+    pairs. Content is None for a list without cards.
+    Raises ValueError, naming the line, for a malformed row.
+    """
+
+    if format == "jsonl":
+        rows = parse_jsonl(lines)
+    elif format == "csv":
+        rows = parse_csv(lines)
+    else:
+        raise ValueError(f"unknown format: {format}")
+
+    for line_number, title, content in rows:
+        if not isinstance(title, str) or not title:
+            raise ValueError(f"line {line_number}: list must be a title")
+        if len(title) > KANBANLIST_TITLE_MAXLENGTH:
+            raise ValueError(
+                f"line {line_number}: list title is longer than "
+                f"{KANBANLIST_TITLE_MAXLENGTH} characters"
+            )
+        if content is not None and not isinstance(content, str):
+            raise ValueError(f"line {line_number}: content must be a string")
+
+        yield title, content
+
+
+def parse_jsonl(lines):
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise ValueError(f"line {line_number}: not valid JSON")
+        if not isinstance(row, dict):
+            raise ValueError(f"line {line_number}: not a JSON object")
+
+        yield line_number, row.get("list"), row.get("content")
+
+
+def parse_csv(lines):
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None or "list" not in reader.fieldnames:
+        raise ValueError("line 1: the header must name a list column")
+
+    for row in reader:
+        # A list without cards has no content cell (None, the restval); an
+        # empty cell is a card with empty content.
+        yield reader.line_num, row["list"], row.get("content")
+
+
+def import_rows(board, rows, batch_size=None):
+    """
+    Append rows of (list title, content) to a board, in one transaction.
+
+    Cards go to the board's list with the given title, which is created
+    after the board's other lists if there is none. Cards are appended
+    after the list's existing cards, in the order of the rows.
+
+    Ordinals are assigned in memory from one read of the board's lists:
+    there is no query per row, and cards are inserted with `bulk_create`,
+    `batch_size` at a time. The board's and lists' counts of their lists
+    and cards go up in two UPDATEs. The board's change log gets one
+    entry, past which the board's compaction point is moved: delta syncs
+    from before the import get a snapshot.
+
+    Returns the number of lists created and cards imported.
+    """
+
+    batch_size = batch_size or settings.KANBAN.get("import_batch_size")
+    created_lists = imported_cards = 0
+
+    with atomic_write():
+        KanbanBoard.objects.bump_version(board.pk)
+
+        lists = list(
+            board.kanbanlist_set.annotate(last_card=Max("kanbancard__ordinal"))
+        )
+        last_list = max((l.ordinal for l in lists), default=None)
+        # The id and last card ordinal of each of the board's lists, by title.
+        by_title = {l.title: [l.pk, l.last_card] for l in lists}
+
+        cards = []
+        # The number of cards imported into each list, by id.
+        imported = Counter()
+        for title, content in rows:
+            if title not in by_title:
+                last_list = KanbanList.objects.ordinal_after(board, last_list)
+                (klist,) = KanbanList.objects.bulk_create(
+                    [KanbanList(kanban_board=board, title=title, ordinal=last_list)]
+                )
+                by_title[title] = [klist.pk, None]
+                created_lists += 1
+
+            if content is None:
+                continue
+
+            entry = by_title[title]
+            if ordinal_between(before=entry[1]) is None:
+                # The list is about to be re-spread (see ordinal_after):
+                # the cards bound for it must be in it first.
+                KanbanCard.objects.bulk_create(cards)
+                imported_cards += len(cards)
+                cards = []
+            entry[1] = KanbanCard.objects.ordinal_after(entry[0], entry[1])
+            imported[entry[0]] += 1
+            cards.append(
+                KanbanCard(kanban_list_id=entry[0], content=content, ordinal=entry[1])
+            )
+
+            if len(cards) == batch_size:
+                KanbanCard.objects.bulk_create(cards)
+                imported_cards += len(cards)
+                cards = []
+
+        KanbanCard.objects.bulk_create(cards)
+        imported_cards += len(cards)
+
+        if created_lists:
+            KanbanList.objects.count_rows(board, created_lists)
+        if imported:
+            KanbanList.objects.filter(pk__in=imported).update(
+                card_count=F("card_count")
+                + Case(
+                    *(When(pk=pk, then=count) for pk, count in imported.items()),
+                    output_field=models.IntegerField(),
+                )
+            )
+
+        change = KanbanChange.objects.record(
+            board.pk, "update", KanbanBoard, board.pk, title=board.title
+        )
+        KanbanBoard.objects.filter(pk=board.pk).update(compacted_through=change.pk)
+
+    return created_lists, imported_cards
+
+
+def export_rows(board, chunk_size=None):
+    """
+    Yield the (list title, content) rows of a board, in board order.
+    One query, streamed from the database `chunk_size` rows at a time.
+    """
+
+    chunk_size = chunk_size or settings.KANBAN.get("export_chunk_size")
+
+    # The outer join yields a row with no content for a list without cards.
+    return (
+        KanbanList.objects.filter(kanban_board=board)
+        .order_by("ordinal", "kanbancard__ordinal")
+        .values_list("title", "kanbancard__content")
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+class Echo:
+    """A file-like object that hands back what is written to it."""
+
+    def write(self, value):
+        return value
+
+
+def render_rows(rows, format):
+    """Yield rows of (list title, content) as lines of text in the given format."""
+
+    if format == "jsonl":
+        for title, content in rows:
+            row = {"list": title}
+            if content is not None:
+                row["content"] = content
+            yield json.dumps(row) + "\n"
+
+    elif format == "csv":
+        writer = csv.writer(Echo())
+        yield writer.writerow(["list", "content"])
+        for title, content in rows:
+            yield writer.writerow([title] if content is None else [title, content])
+
+    else:
+        raise ValueError(f"unknown format: {format}")
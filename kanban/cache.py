@@ -0,0 +1,169 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.dispatch import receiver
+from flexdentaldemoapi.instrumentation import registry
+
+from .signals import board_changed
+from .threads import run_sync
+
+
+class BoardSnapshotCache:
+    """
+    Serialized board snapshots, kept in one of Django's caches.
+
+    A snapshot is stored under its board's id and version, so a change to
+    the board can never be served from an older snapshot. Next to the
+    snapshots, the cache keeps a pointer to each board's current version;
+    a hot board is served from the cache alone, without a single query.
+    Pointers are dropped as soon as a change to their board commits.
+
+    Eviction is left to the cache backend: the default locmem backend
+    evicts least recently used entries past MAX_ENTRIES, and every
+    backend expires entries after TIMEOUT.
+    """
+
+    def __init__(self, alias=None, version_timeout=None):
+        self.alias = alias or settings.KANBAN.get("snapshot_cache")
+
+        # A reader that loses a race with a writer can re-store a pointer
+        # to the version the writer just replaced. Keeping pointers short-
+        # lived bounds how long such a stale pointer can be served.
+        self.version_timeout = version_timeout or settings.KANBAN.get(
+            "snapshot_version_timeout"
+        )
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def version_key(self, board_id):
+        return f"kanban:board:{board_id}:version"
+
+    def snapshot_key(self, board_id, version):
+        return f"kanban:board:{board_id}:v{version}"
+
+    def version(self, board_id):
+        """
+        Return a board's current (version, updated_at) pair, or None if
+        there is no such board. Served from the cache when possible.
+        """
+
+        current = self.cache.get(self.version_key(board_id))
+        if current is None:
+            from .models import KanbanBoard
+
+            current = (
+                KanbanBoard.objects.filter(pk=board_id)
+                .values_list("version", "updated_at")
+                .first()
+            )
+            if current is not None:
+                self._set_version(board_id, *current)
+
+        return current
+
+    def get(self, board_id, build):
+        """
+        Return the snapshot of a board.
+
+        On a miss, `build()` is called to serialize the board; it must
+        return the board and its snapshot, read in one go.
+        """
+
+        current = self.cache.get(self.version_key(board_id))
+        if current is not None:
+            snapshot = self.cache.get(self.snapshot_key(board_id, current[0]))
+            if snapshot is not None:
+                self._count(hit=True)
+                return snapshot
+
+        self._count(hit=False)
+        board, snapshot = build()
+        self._store(board, snapshot)
+        return snapshot
+
+    async def aversion(self, board_id):
+        """The async twin of `version()`."""
+
+        current = await run_sync(self.cache.get)(self.version_key(board_id))
+        if current is None:
+            from .models import KanbanBoard
+
+            current = await (
+                KanbanBoard.objects.filter(pk=board_id)
+                .values_list("version", "updated_at")
+                .afirst()
+            )
+            if current is not None:
+                await run_sync(self._set_version)(board_id, *current)
+
+        return current
+
+    async def aget(self, board_id, build):
+        """The async twin of `get()`: `build` is a coroutine function."""
+
+        current = await run_sync(self.cache.get)(self.version_key(board_id))
+        if current is not None:
+            snapshot = await run_sync(self.cache.get)(
+                self.snapshot_key(board_id, current[0])
+            )
+            if snapshot is not None:
+                self._count(hit=True)
+                return snapshot
+
+        self._count(hit=False)
+        board, snapshot = await build()
+        await run_sync(self._store)(board, snapshot)
+        return snapshot
+
+    def invalidate(self, *board_ids):
+        self.cache.delete_many([self.version_key(board_id) for board_id in board_ids])
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def _store(self, board, snapshot):
+        self.cache.set(self.snapshot_key(board.pk, board.version), snapshot)
+        self._set_version(board.pk, board.version, board.updated_at)
+
+    def _set_version(self, board_id, version, updated_at):
+        self.cache.set(
+            self.version_key(board_id), (version, updated_at), self.version_timeout
+        )
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+snapshots = BoardSnapshotCache()
+
+registry.counter(
+    "kanban_snapshot_cache_hits_total",
+    "Board snapshots served from the cache.",
+    lambda: snapshots.stats()["hits"],
+)
+registry.counter(
+    "kanban_snapshot_cache_misses_total",
+    "Board snapshots serialized on a cache miss.",
+    lambda: snapshots.stats()["misses"],
+)
+
+
+@receiver(board_changed)
+def invalidate_board_snapshots(sender, board_ids, **kwargs):
+    snapshots.invalidate(*board_ids)
@@ -0,0 +1,76 @@
+"""
+Concurrent edits of a board.
+
+Optimistic concurrency: a mutation may say which version of its board
+it was made against (see `expect_version`). If the board has moved on
+since, the mutation is refused as a whole, and the client catches up
+and tries again, rather than silently reordering a board it has not seen.
+
+Ordinal collisions: two transactions that read the same siblings can
+both pick the same free ordinal, and one of them then fails on the
+scope-ordinal unique constraint. Such failures are transient: a second
+attempt reads the winner's row and picks another ordinal. `retrying`
+makes that second attempt.
+"""
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from flexdentaldemoapi.transactions import atomic_write
+
+
+class VersionConflict(Exception):
+    """A mutation expected a board at a version that it is no longer at."""
+
+    def __init__(self, board_id, version):
+        super().__init__(f"Board {board_id} is no longer at version {version}.")
+        self.board_id = board_id
+        self.version = version
+
+
+def expect_version(board_id, version):
+    """
+    Within a transaction: check that a board is at `version`, and keep it
+    there until the transaction ends, or raise VersionConflict. A version
+    of None expects nothing.
+    """
+
+    from .models import KanbanBoard
+
+    if version is not None and not KanbanBoard.objects.claim_version(board_id, version):
+        raise VersionConflict(board_id, version)
+
+
+def is_ordinal_collision(error):
+    """Whether an IntegrityError is a violation of a scope-ordinal unique constraint."""
+
+    # SQLite names the constraint's columns ("UNIQUE constraint failed:
+    # kanban_kanbancard.kanban_list_id, kanban_kanbancard.ordinal"),
+    # PostgreSQL the constraint ("UNIQUE__KanbanCard__kanbanlist_ordinal").
+    message = str(error).lower()
+    return "unique" in message and "ordinal" in message
+
+
+def retrying(func, attempts=None, using=None):
+    """
+    Call `func()` in a transaction and return its result. If it fails on
+    an ordinal collision, call it again in a new transaction, up to
+    `attempts` times in all (by default, the "collision_attempts" setting).
+
+    Inside a transaction already, `func()` is called once, as is: only
+    the outermost transaction can be retried (on PostgreSQL, the
+    constraints are only checked as it commits).
+    """
+
+    if attempts is None:
+        attempts = settings.KANBAN.get("collision_attempts")
+
+    if transaction.get_connection(using).in_atomic_block:
+        return func()
+
+    for attempt in range(1, attempts + 1):
+        try:
+            with atomic_write(using=using):
+                return func()
+        except IntegrityError as error:
+            if attempt == attempts or not is_ordinal_collision(error):
+                raise
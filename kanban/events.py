@@ -0,0 +1,158 @@
+import asyncio
+import collections
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max
+from django.db.models.functions import Coalesce
+from django.dispatch import receiver
+
+from .signals import board_changed
+
+
+class Subscription:
+    """
+    One subscriber's queue of events for one board.
+
+    A subscription belongs to the event loop it was made in. Events are
+    handed to that loop thread-safely, whichever thread publishes them.
+
+    The queue is bounded. Every event carries a board's latest version
+    and cursor, so a newer event supersedes all older ones: a consumer
+    that falls behind loses its oldest events, never the newest, and
+    never holds up the publisher or the other subscribers.
+    """
+
+    def __init__(self, hub, board_id, queue_size):
+        self.hub = hub
+        self.board_id = board_id
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+
+        self._events = collections.deque(maxlen=queue_size)
+        self._ready = asyncio.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def get(self, timeout=None):
+        """Wait for the next event. Return None if none comes within `timeout`."""
+
+        if not self._events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        return self._events.popleft()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def _push(self, event):
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+        self._ready.set()
+
+
+class BoardEventHub:
+    """
+    An in-process pub/sub hub that fans board events out to every
+    subscriber of the board, across threads and event loops.
+
+    Each process has its own hub, fed by the `board_changed` signals of
+    the writes made in that process. Run a single process (or put a
+    shared broker behind `publish`) for every write to reach every
+    subscriber.
+    """
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or settings.KANBAN.get("events_queue_size")
+
+        self._lock = threading.Lock()
+        self._subscriptions = collections.defaultdict(set)
+
+    def subscribe(self, board_id):
+        """Subscribe to the events of one board. Must be called in an event loop."""
+
+        subscription = Subscription(self, board_id, self.queue_size)
+        with self._lock:
+            self._subscriptions[board_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.board_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.board_id, None)
+
+    def watched(self, board_ids):
+        """Return the ids, out of `board_ids`, of the boards with subscribers."""
+
+        with self._lock:
+            return [
+                board_id for board_id in board_ids if board_id in self._subscriptions
+            ]
+
+    def subscriber_count(self, board_id):
+        with self._lock:
+            return len(self._subscriptions.get(board_id, ()))
+
+    def publish(self, board_id, event):
+        """Hand an event to every subscriber of one board. Never blocks."""
+
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(board_id, ()))
+
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._push, event)
+            except RuntimeError:
+                # The subscriber's event loop is gone.
+                self.unsubscribe(subscription)
+
+
+def board_events(board_ids):
+    """
+    Return the current event of each of the given boards: its id,
+    version and delta-sync cursor (see the board's `changes` action).
+    """
+
+    from .models import KanbanBoard
+
+    return list(
+        KanbanBoard.objects.filter(pk__in=board_ids)
+        .annotate(cursor=Coalesce(Max("kanbanchange__id"), "compacted_through"))
+        .values("id", "version", "cursor")
+    )
+
+
+def current_board_event(board_id):
+    """Return the current event of one board, or None if there is no such board."""
+
+    try:
+        events = board_events([board_id])
+    finally:
+        # Called outside of Django's request cycle, from a stream.
+        close_old_connections()
+
+    return events[0] if events else None
+
+
+hub = BoardEventHub()
+
+
+@receiver(board_changed)
+def publish_board_events(sender, board_ids, **kwargs):
+    # Boards that nobody is watching cost nothing, not even a query.
+    watched = hub.watched(board_ids)
+    if watched:
+        for event in board_events(watched):
+            hub.publish(event["id"], event)
@@ -0,0 +1,92 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from kanban.benchmarks import runner
+from kanban.benchmarks.suite import CASES, SIZES
+
+
+class Command(BaseCommand):
+    help = (
+        "Time appends, moves, deletes with compaction and reorders of lists and "
+        "cards, and full board reads, on boards of growing size, with the queries "
+        "and rows written by each. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=SIZES,
+            help="Lists per board, and cards in its first list.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs of each operation; the median is reported.",
+        )
+        parser.add_argument(
+            "--operation",
+            dest="operations",
+            action="append",
+            choices=sorted({name for name, model, operation in CASES}),
+            help="Run only this operation. May be given more than once.",
+        )
+        parser.add_argument(
+            "--output", help="Write the results, as JSON, to this file."
+        )
+        parser.add_argument(
+            "--compare",
+            metavar="BASELINE",
+            help="Compare the results with those of an earlier --output file.",
+        )
+
+    def handle(self, *args, sizes, repeat, operations, output, compare, **options):
+        baseline = None
+        if compare:
+            with open(compare) as file:
+                baseline = json.load(file)
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+        try:
+            results = runner.run_suite(sizes, repeat, operations, report=self.report)
+            document = runner.results_document(results, repeat)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if output:
+            with open(output, "w") as file:
+                json.dump(document, file, indent=2)
+                file.write("\n")
+
+        if baseline is not None:
+            self.stdout.write(
+                f"\nCompared with {baseline['environment']['commit'] or 'baseline'}:"
+            )
+            for comparison in runner.compare(baseline, document):
+                self.report_comparison(comparison)
+
+    def report(self, result):
+        self.stdout.write(
+            f"{result['operation']} {result['model']}, size {result['size']}: "
+            f"{result['seconds']['median'] * 1000:.2f}ms "
+            f"(min {result['seconds']['min'] * 1000:.2f}ms), "
+            f"{result['queries']} queries, {result['rows_written']} rows written"
+        )
+
+    def report_comparison(self, comparison):
+        operation, model, size = comparison["key"]
+        ratio = comparison["ratio"]
+        self.stdout.write(
+            f"{operation} {model}, size {size}: "
+            f"{comparison['before'] * 1000:.2f}ms -> {comparison['after'] * 1000:.2f}ms "
+            f"({'-' if ratio is None else f'{ratio:.2f}x'}), "
+            f"{comparison['queries']:+d} queries, "
+            f"{comparison['rows_written']:+d} rows written"
+        )
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from kanban.models import KanbanBoard, KanbanList, KanbanCard
+from kanban.ordinals import spread
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of board reads by many concurrent slow clients "
+        "through the ASGI application against a thread-pooled WSGI server. "
+        "Runs in-process, against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=200)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.05,
+            help="Seconds each client takes to receive a response.",
+        )
+        parser.add_argument(
+            "--wsgi-threads",
+            type=int,
+            default=8,
+            help="Worker threads of the simulated WSGI server.",
+        )
+        parser.add_argument("--lists", type=int, default=5)
+        parser.add_argument("--cards", type=int, default=20)
+
+    def handle(self, *args, clients, latency, wsgi_threads, lists, cards, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+        try:
+            board = self.fill(lists, cards)
+            path = f"/boards/{board.pk}/"
+
+            for name, run in (
+                ("WSGI", lambda: self.run_wsgi(path, clients, latency, wsgi_threads)),
+                ("ASGI", lambda: asyncio.run(self.run_asgi(path, clients, latency))),
+            ):
+                elapsed, statuses = run()
+                if statuses != {200}:
+                    raise CommandError(f"{name}: unexpected statuses {statuses}")
+                self.stdout.write(
+                    f"{name}: {clients} reads in {elapsed:.2f}s "
+                    f"({clients / elapsed:.0f} reads/s)"
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    @staticmethod
+    def fill(lists, cards):
+        board = KanbanBoard.objects.create(title="Benchmark")
+        for i in range(lists):
+            klist = KanbanList.objects.create(title=f"List {i}", kanban_board=board)
+            KanbanCard.objects.bulk_create(
+                KanbanCard(content=f"Card {j}", kanban_list=klist, ordinal=ordinal)
+                for j, ordinal in enumerate(spread(cards))
+            )
+        # Bulk inserts leave the kept counts behind.
+        KanbanCard.objects.recount(board.kanbanlist_set.all())
+        return board
+
+    @staticmethod
+    def run_wsgi(path, clients, latency, threads):
+        from flexdentaldemoapi.wsgi import application
+
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "HTTP_ACCEPT": "application/json",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": None,
+        }
+
+        statuses = set()
+
+        def start_response(status, headers):
+            statuses.add(int(status.split()[0]))
+
+        def read():
+            result = application(dict(environ), start_response)
+            for chunk in result:
+                # A slow client blocks the worker thread while it reads.
+                time.sleep(latency)
+            result.close()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as server:
+            for future in [server.submit(read) for _ in range(clients)]:
+                future.result()
+        return time.perf_counter() - start, statuses
+
+    @staticmethod
+    async def run_asgi(path, clients, latency):
+        from flexdentaldemoapi.asgi import application
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": path,
+            "query_string": b"",
+            "server": ("testserver", 80),
+            "headers": [(b"host", b"testserver"), (b"accept", b"application/json")],
+        }
+
+        statuses = set()
+
+        async def read():
+            async def receive():
+                return {"type": "http.request"}
+
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    statuses.add(message["status"])
+                elif message["type"] == "http.response.body":
+                    # A slow client only delays its own coroutine.
+                    await asyncio.sleep(latency)
+
+            await application(dict(scope), receive, send)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[read() for _ in range(clients)])
+        return time.perf_counter() - start, statuses
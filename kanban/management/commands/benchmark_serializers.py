@@ -0,0 +1,96 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from flexdentaldemoapi.serializers import UserRowSerializer, UserSerializer
+from kanban.models import KanbanBoard, KanbanList, KanbanCard
+from kanban.ordinals import spread
+from kanban.serializers import KanbanBoardSnapshotSerializer, snapshot_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare serializing many rows through DRF's model serializers against "
+        "the row serializers of the hot read endpoints, queries included. "
+        "Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Runs of each serializer; the fastest is reported.",
+        )
+
+    def handle(self, *args, rows, repeat, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+        try:
+            User.objects.bulk_create(
+                User(username=f"user-{i}", email=f"user-{i}@example.com")
+                for i in range(rows)
+            )
+            board = self.fill(rows)
+            request = RequestFactory().get("/users/")
+
+            for name, slow, fast in (
+                (
+                    "users",
+                    lambda: UserSerializer(
+                        User.objects.all(), many=True, context={"request": request}
+                    ).data,
+                    lambda: self.serialize_users(request),
+                ),
+                (
+                    "board snapshot",
+                    lambda: KanbanBoardSnapshotSerializer(
+                        KanbanBoard.objects.with_lists_and_cards().get(pk=board.pk)
+                    ).data,
+                    lambda: snapshot_rows.serialize(
+                        KanbanBoard.objects.get(pk=board.pk)
+                    ),
+                ),
+            ):
+                slow_time = self.time(slow, repeat)
+                fast_time = self.time(fast, repeat)
+                self.stdout.write(
+                    f"{name}, {rows} rows: model serializer {slow_time:.3f}s, "
+                    f"row serializer {fast_time:.3f}s "
+                    f"({slow_time / fast_time:.1f}x faster)"
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    @staticmethod
+    def fill(cards, lists=10):
+        board = KanbanBoard.objects.create(title="Benchmark")
+        for i in range(lists):
+            klist = KanbanList.objects.create(title=f"List {i}", kanban_board=board)
+            KanbanCard.objects.bulk_create(
+                KanbanCard(content=f"Card {j}", kanban_list=klist, ordinal=ordinal)
+                for j, ordinal in enumerate(spread(cards // lists))
+            )
+        # Bulk inserts leave the kept counts behind.
+        KanbanCard.objects.recount(board.kanbanlist_set.all())
+        return board
+
+    @staticmethod
+    def serialize_users(request):
+        serializer = UserRowSerializer(request)
+        return serializer.serialize(User.objects.values_list(*serializer.columns))
+
+    @staticmethod
+    def time(serialize, repeat):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            serialize()
+            best = min(best, time.perf_counter() - start)
+        return best
@@ -0,0 +1,103 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from flexdentaldemoapi.backends.sqlite3.base import set_pragmas
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent SQLite write throughput and 'database is locked' "
+        "errors with SQLite's defaults against the tuned profile in "
+        "DATABASES['default']['OPTIONS']. Runs on throwaway database files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--transactions",
+            type=int,
+            default=200,
+            help="Write transactions per thread.",
+        )
+
+    def handle(self, *args, threads, transactions, **options):
+        tuned = settings.DATABASES["default"].get("OPTIONS", {})
+
+        for name, pragmas, mode in (
+            ("defaults", {}, "DEFERRED"),
+            ("tuned", tuned.get("pragmas", {}), tuned.get("transaction_mode")),
+        ):
+            with tempfile.TemporaryDirectory() as directory:
+                path = Path(directory) / "benchmark.sqlite3"
+                committed, locked, elapsed = self.run(
+                    path, pragmas, mode or "DEFERRED", threads, transactions
+                )
+
+            self.stdout.write(
+                f"{name}: {committed} commits in {elapsed:.2f}s "
+                f"({committed / elapsed:.0f} commits/s), "
+                f"{locked} 'database is locked' error(s)"
+            )
+
+    def run(self, path, pragmas, mode, threads, transactions):
+        setup = self.connect(path, pragmas)
+        setup.execute(
+            "CREATE TABLE card "
+            "(id INTEGER PRIMARY KEY, list INTEGER, ordinal INTEGER, content TEXT)"
+        )
+        setup.execute("CREATE UNIQUE INDEX card_list_ordinal ON card (list, ordinal)")
+        setup.close()
+
+        counts = {"committed": 0, "locked": 0}
+        lock = threading.Lock()
+
+        def write(thread):
+            connection = self.connect(path, pragmas)
+            for i in range(transactions):
+                # Append a card to a shared list: read, then write, as
+                # OrderedModel.save() does.
+                try:
+                    connection.execute(f"BEGIN {mode}")
+                    (last,) = connection.execute(
+                        "SELECT MAX(ordinal) FROM card WHERE list = 1"
+                    ).fetchone()
+                    connection.execute(
+                        "INSERT INTO card (list, ordinal, content) VALUES (1, ?, ?)",
+                        [(last or 0) + 1, f"{thread}-{i}"],
+                    )
+                    connection.execute("COMMIT")
+                    outcome = "committed"
+                except sqlite3.OperationalError as error:
+                    if "locked" not in str(error):
+                        raise
+                    # Unless it was the BEGIN that failed.
+                    if connection.in_transaction:
+                        connection.execute("ROLLBACK")
+                    outcome = "locked"
+                with lock:
+                    counts[outcome] += 1
+            connection.close()
+
+        workers = [threading.Thread(target=write, args=(i,)) for i in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        return counts["committed"], counts["locked"], elapsed
+
+    @staticmethod
+    def connect(path, pragmas):
+        # Autocommit, so that transactions begin as the benchmark says;
+        # the default timeout is Django's (and Python's): 5 seconds.
+        connection = sqlite3.connect(path, isolation_level=None)
+        set_pragmas(connection.cursor(), pragmas)
+        return connection
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Greatest
+from flexdentaldemoapi.transactions import atomic_write
+
+from kanban.models import KanbanBoard
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete all but the latest changes in every board's change log. "
+        "Clients that sync from a compacted cursor get a snapshot instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=settings.KANBAN.get("changelog_keep"),
+            help="The number of changes to keep per board.",
+        )
+
+    def handle(self, *args, keep, **options):
+        compacted = 0
+
+        for board in KanbanBoard.objects.iterator():
+            changes = board.kanbanchange_set.order_by("-id")
+            cutoff = changes.values_list("id", flat=True)[keep : keep + 1].first()
+            if cutoff is None:
+                continue
+
+            with atomic_write():
+                # A bulk import may already have compacted past the cutoff.
+                KanbanBoard.objects.filter(pk=board.pk).update(
+                    compacted_through=Greatest("compacted_through", cutoff)
+                )
+                compacted += changes.filter(id__lte=cutoff).delete()[0]
+
+        self.stdout.write(f"Compacted {compacted} change(s).")
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from kanban import bulk
+from kanban.models import KanbanBoard
+
+
+class Command(BaseCommand):
+    help = "Stream a board's lists and cards to a JSON Lines or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("board", type=int, help="The id of the board.")
+        parser.add_argument(
+            "path", nargs="?", default="-", help="The file to write, or - for stdout."
+        )
+        parser.add_argument(
+            "--format",
+            choices=bulk.FORMATS,
+            help="The file format. Defaults to the file extension, else jsonl.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="How many rows to read from the database at a time.",
+        )
+
+    def handle(self, *args, board, path, format, chunk_size, **options):
+        try:
+            board = KanbanBoard.objects.get(pk=board)
+        except KanbanBoard.DoesNotExist:
+            raise CommandError(f"There is no board {board}.")
+
+        if format is None:
+            format = "csv" if path.lower().endswith(".csv") else "jsonl"
+
+        rows = bulk.render_rows(bulk.export_rows(board, chunk_size), format)
+
+        if path == "-":
+            for row in rows:
+                self.stdout.write(row, ending="")
+        else:
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                file.writelines(rows)
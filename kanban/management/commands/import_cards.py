@@ -0,0 +1,51 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kanban import bulk
+from kanban.models import KanbanBoard
+
+
+class Command(BaseCommand):
+    help = (
+        "Append lists and cards to a board from a JSON Lines or CSV file, "
+        "streamed and inserted in batches in one transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("board", type=int, help="The id of the board.")
+        parser.add_argument("path", help="The file to import, or - for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=bulk.FORMATS,
+            help="The file format. Defaults to the file extension, else jsonl.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="How many cards to insert per INSERT statement.",
+        )
+
+    def handle(self, *args, board, path, format, batch_size, **options):
+        try:
+            board = KanbanBoard.objects.get(pk=board)
+        except KanbanBoard.DoesNotExist:
+            raise CommandError(f"There is no board {board}.")
+
+        if format is None:
+            format = "csv" if path.lower().endswith(".csv") else "jsonl"
+
+        file = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        try:
+            created_lists, imported_cards = bulk.import_rows(
+                board, bulk.parse_rows(file, format), batch_size=batch_size
+            )
+        except ValueError as error:
+            raise CommandError(f"Nothing was imported: {error}")
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+        self.stdout.write(
+            f"Imported {imported_cards} card(s), creating {created_lists} list(s)."
+        )
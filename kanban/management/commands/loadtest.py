@@ -0,0 +1,134 @@
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from kanban.benchmarks import load, runner
+from kanban.benchmarks.scenarios import MIXES, seed_board
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the WSGI or ASGI application, in-process or over a local "
+        "socket, by replaying a mix of client requests with many concurrent "
+        "virtual users. Reports latency percentiles, throughput and error "
+        "rates. Runs offline, against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--app", choices=load.APPS, default="wsgi")
+        parser.add_argument(
+            "--transport",
+            choices=load.TRANSPORTS,
+            default="inprocess",
+            help="Call the application directly, or serve it on a local socket.",
+        )
+        parser.add_argument("--mix", choices=sorted(MIXES), default="mixed")
+        parser.add_argument(
+            "--concurrency", type=int, default=16, help="Virtual users."
+        )
+        parser.add_argument(
+            "--duration", type=float, default=10, help="Seconds to run for."
+        )
+        parser.add_argument(
+            "--wsgi-threads",
+            type=int,
+            default=8,
+            help="Worker threads of the in-process WSGI server.",
+        )
+        parser.add_argument("--lists", type=int, default=10)
+        parser.add_argument("--cards", type=int, default=50, help="Cards per list.")
+        parser.add_argument(
+            "--import-rows", type=int, default=100, help="Cards per import."
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seeds the virtual users' choices."
+        )
+        parser.add_argument(
+            "--output", help="Write the summary, as JSON, to this file."
+        )
+
+    def handle(self, *args, lists, cards, output, **options):
+        if lists < 2 or cards < 2:
+            raise CommandError("--lists and --cards must be at least 2.")
+
+        # Every thread of the load test must see the same database, so
+        # an SQLite test database is a file, not in memory; this is also
+        # how it behaves in production.
+        directory = None
+        if connection.vendor == "sqlite":
+            directory = tempfile.TemporaryDirectory()
+            connection.settings_dict["TEST"]["NAME"] = str(
+                Path(directory.name) / "loadtest.sqlite3"
+            )
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+        try:
+            board = seed_board(lists, cards)
+            headers = load.authenticate()
+            summary = asyncio.run(
+                load.run_load(
+                    options["app"],
+                    options["transport"],
+                    options["mix"],
+                    board,
+                    headers,
+                    options["concurrency"],
+                    options["duration"],
+                    wsgi_threads=options["wsgi_threads"],
+                    import_rows=options["import_rows"],
+                    seed=options["seed"],
+                )
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            if directory is not None:
+                directory.cleanup()
+
+        for kind, result in summary["kinds"].items():
+            self.report(kind, result)
+        self.report("total", summary["total"])
+
+        if output:
+            document = {
+                "environment": runner.environment(),
+                "options": {
+                    "lists": lists,
+                    "cards": cards,
+                    **{
+                        name: options[name]
+                        for name in (
+                            "app",
+                            "transport",
+                            "mix",
+                            "concurrency",
+                            "duration",
+                            "wsgi_threads",
+                            "import_rows",
+                            "seed",
+                        )
+                    },
+                },
+                "summary": summary,
+            }
+            with open(output, "w") as file:
+                json.dump(document, file, indent=2)
+                file.write("\n")
+
+    def report(self, kind, result):
+        def ms(seconds):
+            return "-" if seconds is None else f"{seconds * 1000:.1f}ms"
+
+        self.stdout.write(
+            f"{kind}: {result['requests']} requests, {result['rps']:.0f} req/s, "
+            f"p50 {ms(result['p50'])}, p95 {ms(result['p95'])}, "
+            f"p99 {ms(result['p99'])}, "
+            f"{result['errors']} errors ({result['error_rate']:.1%}), "
+            f"{result['conflicts']} conflicts"
+        )
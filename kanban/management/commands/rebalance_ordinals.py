@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+
+from kanban.models import KanbanList, KanbanCard
+from kanban.ordinals import ORDINAL_GAP
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-spread list and card ordinals in every board/list whose "
+        "ordinal gaps have narrowed below a threshold."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-gap",
+            type=int,
+            default=max(ORDINAL_GAP // 32, 2),
+            help="Rebalance a board/list if any two neighbours are closer than this.",
+        )
+
+    def handle(self, *args, min_gap, **options):
+        rebalanced = 0
+
+        for model in (KanbanList, KanbanCard):
+            for scope in self.narrow_scopes(model, min_gap):
+                model.rebalance_scope(scope)
+                rebalanced += 1
+
+        self.stdout.write(f"Rebalanced {rebalanced} board(s)/list(s).")
+
+    @staticmethod
+    def narrow_scopes(model, min_gap):
+        """
+        Return the ids of the boards/lists in which two neighbouring
+        ordinals are closer than min_gap: in one pass over every row's
+        ordinal, in scope-ordinal (unique index) order, not a query per scope.
+        """
+
+        scope_column = model._meta.get_field(model.ordinal_scope).attname
+        rows = (
+            model.objects.order_by(scope_column, "ordinal")
+            .values_list(scope_column, "ordinal")
+            .iterator()
+        )
+
+        narrow = []
+        previous_scope = previous = None
+        for scope, ordinal in rows:
+            if (
+                scope == previous_scope
+                and ordinal - previous < min_gap
+                and (not narrow or narrow[-1] != scope)
+            ):
+                narrow.append(scope)
+            previous_scope, previous = scope, ordinal
+
+        return narrow
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from kanban import search
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the full-text search index of cards and boards from their "
+        "tables, e.g. to index rows written while its triggers were missing."
+    )
+
+    def handle(self, *args, **options):
+        if not search.indexed():
+            raise CommandError(
+                "This database has no search index: searches scan the tables."
+            )
+
+        cards, boards = search.rebuild()
+
+        self.stdout.write(
+            f"Rebuilt the search index of {cards} card(s) and {boards} board(s)."
+        )
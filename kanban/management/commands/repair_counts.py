@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from kanban.models import KanbanList, KanbanCard
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount every board's lists and every list's cards, and fix the "
+        "kept counts (list_count, card_count) that are wrong."
+    )
+
+    def handle(self, *args, **options):
+        boards = KanbanList.objects.recount()
+        lists = KanbanCard.objects.recount()
+
+        self.stdout.write(
+            f"Repaired the list count of {boards} board(s) "
+            f"and the card count of {lists} list(s)."
+        )
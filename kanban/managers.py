@@ -0,0 +1,421 @@
+from django.db import connections, models, transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from flexdentaldemoapi.transactions import atomic_write
+
+from .ordinals import ORDINAL_GAP, ORDINAL_MIN, ordinal_between
+from .signals import board_changed
+
+
+class KanbanBoardQuerySet(models.QuerySet):
+    def bump_version(self, *board_ids):
+        """
+        Bump the version of the given boards. Once the surrounding
+        transaction commits, announce the change with `board_changed`.
+        """
+
+        self.filter(pk__in=board_ids).update(
+            version=F("version") + 1, updated_at=timezone.now()
+        )
+        transaction.on_commit(
+            lambda: board_changed.send(sender=self.model, board_ids=board_ids),
+            using=self.db,
+        )
+
+    def claim_version(self, board_id, version):
+        """
+        Within a transaction: check that a board is at `version`, and
+        keep it there until the transaction ends. Returns whether it was.
+
+        The check is a write of the version onto itself, so it holds the
+        board as a write would. On PostgreSQL, a concurrent claim waits
+        for this transaction, then checks against the version it left;
+        on SQLite, write transactions are serialized already.
+        """
+
+        return (
+            self.filter(pk=board_id, version=version).update(version=F("version")) == 1
+        )
+
+    def with_lists_and_cards(self):
+        """
+        Prefetch every board's lists and every list's cards, in order.
+        Three queries, however many lists and cards there are.
+        """
+
+        from .models import KanbanList, KanbanCard
+
+        return self.prefetch_related(
+            Prefetch(
+                "kanbanlist_set",
+                queryset=KanbanList.objects.order_by(*KanbanList._meta.ordering),
+            ),
+            Prefetch(
+                "kanbanlist_set__kanbancard_set",
+                queryset=KanbanCard.objects.order_by(*KanbanCard._meta.ordering),
+            ),
+        )
+
+
+class KanbanChangeManager(models.Manager):
+    def record(self, board_id, kind, model, object_id=None, **data):
+        """Append one change to a board's change log."""
+
+        return self.create(
+            kanban_board_id=board_id,
+            kind=kind,
+            model=model._meta.model_name,
+            object_id=object_id,
+            data=data,
+        )
+
+    def cursor(self, board):
+        """Return the id of the latest change of a board: a delta-sync cursor."""
+
+        latest = self.filter(kanban_board=board).aggregate(latest=Max("id"))["latest"]
+        return latest or board.compacted_through
+
+
+class OrdinalManager(models.Manager):
+    """
+    A manager for ordered models.
+
+    Every ordinal rewrite is a set-based UPDATE: no sibling row is ever
+    loaded into Python. Rewrites that could collide on the scope-ordinal
+    unique constraint are done in two phases inside one transaction:
+    the affected rows are first parked on unique negative ordinals, then
+    rebased onto their final (always positive) ordinals. On PostgreSQL,
+    where the constraint is only checked at commit (see migration 0012),
+    they are done in one phase.
+
+    Every public method bumps the version of the board it changes before
+    it writes anything, and records what it did in the board's change log.
+    """
+
+    def in_scope(self, scope):
+        """Return a queryset of every row in one scope (a board or a list)."""
+
+        return self.filter(**{self.model.ordinal_scope: scope})
+
+    def deferred_uniqueness(self):
+        """
+        Whether the scope-ordinal unique constraints are checked at
+        commit rather than per statement, so that ordinals may collide
+        midway through a transaction.
+        """
+
+        return connections[self.db].features.supports_deferrable_unique_constraints
+
+    def lock_scope(self, scope):
+        """
+        Lock the board that one scope belongs to until the end of the
+        transaction, serializing rewrites that read ordinals before they
+        write. The board is locked even for a list's cards, so that every
+        transaction takes its locks in the same order: board, then rows.
+
+        A no-op on databases without SELECT ... FOR UPDATE (SQLite),
+        whose write transactions are serialized already.
+        """
+
+        from .models import KanbanBoard
+
+        if connections[self.db].features.has_select_for_update:
+            board_id = self.model.scope_board_id(scope)
+            list(
+                KanbanBoard.objects.using(self.db)
+                .select_for_update()
+                .filter(pk=board_id)
+                .values_list("pk", flat=True)
+            )
+
+    def bump_version(self, scope):
+        """Bump the version of the board that one scope belongs to."""
+
+        from .models import KanbanBoard
+
+        KanbanBoard.objects.bump_version(self.model.scope_board_id(scope))
+
+    def record(self, scope, kind, object_id=None, **data):
+        """Record a change to one scope in its board's change log."""
+
+        from .models import KanbanChange
+
+        KanbanChange.objects.record(
+            self.model.scope_board_id(scope), kind, self.model, object_id, **data
+        )
+
+    def scope_model(self):
+        return self.model._meta.get_field(self.model.ordinal_scope).related_model
+
+    def count_rows(self, scope, by):
+        """
+        Add `by` to the count that one scope keeps of its rows (see
+        `OrderedModel.scope_counter`), in one set-based UPDATE.
+        """
+
+        counter = self.model.scope_counter
+        self.scope_model().objects.filter(pk=getattr(scope, "pk", scope)).update(
+            **{counter: F(counter) + by}
+        )
+
+    def recount(self, scopes=None):
+        """
+        Set the count that each of the given scopes (a queryset; by
+        default, every scope) keeps of its rows to their actual number,
+        in one UPDATE. Returns how many scopes had a wrong count.
+        """
+
+        if scopes is None:
+            scopes = self.scope_model().objects.all()
+
+        counter = self.model.scope_counter
+        actual = Coalesce(
+            Subquery(
+                self.filter(**{self.model.ordinal_scope: OuterRef("pk")})
+                .order_by()
+                .values(self.model.ordinal_scope)
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+        wrong = scopes.annotate(actual=actual).exclude(**{counter: F("actual")})
+        return scopes.model.objects.filter(pk__in=wrong.values("pk")).update(
+            **{counter: actual}
+        )
+
+    def shift(self, scope, start, end=None, by=ORDINAL_GAP):
+        """
+        Shift every ordinal in [start, end] of one scope by `by`.
+
+        The caller must make sure the shifted range lands on free ordinals.
+        Two statements (one on PostgreSQL), however many rows are shifted.
+        """
+
+        with atomic_write(using=self.db):
+            self.bump_version(scope)
+            self._shift(scope, start, end, by)
+
+    def _shift(self, scope, start, end=None, by=ORDINAL_GAP):
+        rows = self.in_scope(scope).filter(ordinal__gte=start)
+        if end is not None:
+            rows = rows.filter(ordinal__lte=end)
+
+        with atomic_write(using=self.db):
+            if self.deferred_uniqueness():
+                rows.update(ordinal=F("ordinal") + by)
+            else:
+                rows.update(ordinal=-F("ordinal") - 1)
+                self.in_scope(scope).filter(ordinal__lt=ORDINAL_MIN).update(
+                    ordinal=-F("ordinal") - 1 + by
+                )
+            self.record(
+                scope,
+                "shift",
+                scope_id=getattr(scope, "pk", scope),
+                start=start,
+                end=end,
+                by=by,
+            )
+
+    def move(self, instance, position):
+        """
+        Move a row to a zero-indexed position among its siblings.
+
+        A position at or below 0 moves the row to the start; a position
+        at or past the sibling count moves the row to the end.
+        Usually this writes the moved row alone. If the gap between its
+        new neighbours has run out, the siblings after it are shifted up
+        to open one.
+        """
+
+        position = max(position, 0)
+        scope = getattr(instance, instance.ordinal_scope)
+
+        with atomic_write(using=self.db):
+            self.lock_scope(scope)
+
+            # Another move may have changed this row's ordinal since it was loaded.
+            instance.refresh_from_db(fields=["ordinal"])
+
+            others = self.in_scope(scope).exclude(pk=instance.pk)
+            ordinals = others.order_by("ordinal").values_list("ordinal", flat=True)
+
+            if position == 0:
+                before, after = None, ordinals.first()
+            else:
+                neighbours = list(ordinals[position - 1 : position + 1])
+                if not neighbours:
+                    neighbours = [others.aggregate(last=Max("ordinal"))["last"]]
+                before, after = (neighbours + [None])[:2]
+
+            # Already in place: nothing to write.
+            if (before is None or before < instance.ordinal) and (
+                after is None or instance.ordinal < after
+            ):
+                return
+
+            self.bump_version(scope)
+
+            if after is None:
+                ordinal = self.ordinal_after(scope, before)
+            else:
+                ordinal = ordinal_between(before, after)
+                if ordinal is None:
+                    self._shift(scope, start=after)
+                    ordinal = ordinal_between(before, after + ORDINAL_GAP)
+
+            self.filter(pk=instance.pk).update(ordinal=ordinal)
+            instance.ordinal = ordinal
+            self.record(scope, "move", instance.pk, ordinal=ordinal)
+
+    def ordinal_after(self, scope, last):
+        """
+        Return the ordinal that appends a row to one scope, whose last
+        ordinal is `last`. If that would pass ORDINAL_LIMIT, the scope is
+        re-spread first (see `normalize`), and the row goes after its
+        re-spread rows.
+        """
+
+        ordinal = ordinal_between(before=last)
+        if ordinal is None:
+            self.normalize(scope)
+            last = self.in_scope(scope).aggregate(last=Max("ordinal"))["last"]
+            ordinal = last + ORDINAL_GAP
+        return ordinal
+
+    def make_room(self, instance, ordinal):
+        """
+        Return a free ordinal for `instance` just before the sibling
+        that currently holds `ordinal`, shifting siblings up if needed.
+        Saving `instance` bumps the board version, so this does not.
+        """
+
+        scope = getattr(instance, instance.ordinal_scope)
+        others = self.in_scope(scope).exclude(pk=instance.pk)
+
+        before = others.filter(ordinal__lt=ordinal).aggregate(before=Max("ordinal"))
+        free = ordinal_between(before["before"], ordinal)
+        if free is None:
+            self._shift(scope, start=ordinal)
+            free = ordinal_between(before["before"], ordinal + ORDINAL_GAP)
+
+        return free
+
+    def delete_and_compact(self, instance):
+        """
+        Delete a row and close the hole it leaves, so that its neighbours
+        end up ORDINAL_GAP apart. The siblings after it are shifted down
+        in one set-based rewrite.
+        """
+
+        scope = getattr(instance, instance.ordinal_scope)
+        ordinal = instance.ordinal
+
+        with atomic_write(using=self.db):
+            instance.delete()
+
+            siblings = self.in_scope(scope)
+            bounds = siblings.aggregate(
+                before=Max("ordinal", filter=models.Q(ordinal__lt=ordinal)),
+                after=Min("ordinal", filter=models.Q(ordinal__gt=ordinal)),
+            )
+            if bounds["after"] is None:
+                return
+
+            before = ORDINAL_MIN if bounds["before"] is None else bounds["before"]
+            excess = bounds["after"] - before - ORDINAL_GAP
+            if excess > 0:
+                self._shift(scope, start=bounds["after"], by=-excess)
+
+    def reorder(self, scope, ids):
+        """
+        Put the rows of one scope with the given ids in the given order.
+
+        The listed rows are permuted among the ordinals they already hold,
+        so a partial ordering leaves every unlisted row where it is and
+        the scope-ordinal unique constraint cannot be violated.
+        Returns a dict of each listed id to its new ordinal.
+        """
+
+        if len(set(ids)) != len(ids):
+            raise ValueError("ids must not contain duplicates")
+
+        with atomic_write(using=self.db):
+            self.lock_scope(scope)
+
+            current = dict(
+                self.in_scope(scope).filter(pk__in=ids).values_list("pk", "ordinal")
+            )
+
+            missing = [pk for pk in ids if pk not in current]
+            if missing:
+                raise ValueError(f"ids not found in this scope: {missing}")
+
+            ordinals = dict(zip(ids, sorted(current.values())))
+            moved = [pk for pk in ids if ordinals[pk] != current[pk]]
+
+            if moved:
+                self.bump_version(scope)
+                if not self.deferred_uniqueness():
+                    self.filter(pk__in=moved).update(ordinal=-F("ordinal") - 1)
+                self.bulk_update(
+                    [self.model(pk=pk, ordinal=ordinals[pk]) for pk in moved],
+                    ["ordinal"],
+                )
+                self.record(
+                    scope,
+                    "reorder",
+                    scope_id=getattr(scope, "pk", scope),
+                    ordinals={pk: ordinals[pk] for pk in moved},
+                )
+
+        return ordinals
+
+    def normalize(self, scope):
+        """
+        Re-spread the rows of one scope ORDINAL_GAP apart, keeping their order.
+        Two statements (one on PostgreSQL), however many rows are re-spread.
+        """
+
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        meta = self.model._meta
+
+        table = quote(meta.db_table)
+        pk = quote(meta.pk.column)
+        ordinal = quote(meta.get_field("ordinal").column)
+        scope_field = meta.get_field(self.model.ordinal_scope)
+        scope_column = quote(scope_field.column)
+        scope_value = scope_field.get_db_prep_value(
+            getattr(scope, "pk", scope), connection
+        )
+
+        # Parking reverses the order of the rows, hence DESC after it.
+        parked = not self.deferred_uniqueness()
+        order = "DESC" if parked else "ASC"
+
+        with atomic_write(using=self.db):
+            self.bump_version(scope)
+
+            if parked:
+                self.in_scope(scope).update(ordinal=-F("ordinal") - 1)
+
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} SET {ordinal} = %s + ranked.position * %s "
+                    f"FROM (SELECT {pk} AS id, ROW_NUMBER() OVER "
+                    f"(ORDER BY {ordinal} {order}) AS position FROM {table} "
+                    f"WHERE {scope_column} = %s) AS ranked "
+                    f"WHERE {table}.{pk} = ranked.id",
+                    [ORDINAL_MIN, ORDINAL_GAP, scope_value],
+                )
+
+            self.record(
+                scope,
+                "normalize",
+                scope_id=getattr(scope, "pk", scope),
+                min=ORDINAL_MIN,
+                gap=ORDINAL_GAP,
+            )
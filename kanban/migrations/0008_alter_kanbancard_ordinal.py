@@ -0,0 +1,18 @@
+# Generated by Django 4.1.5 on 2026-10-17 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kanban", "0007_kanbanlist_check__kanbanlist_title__length_gt_0"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="kanbancard",
+            name="ordinal",
+            field=models.IntegerField(default=None, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.5 on 2026-10-17 00:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kanban", "0008_alter_kanbancard_ordinal"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="kanbanboard",
+            name="version",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.5 on 2026-10-17 00:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kanban", "0009_kanbanboard_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="kanbanboard",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.1.5 on 2026-10-17 00:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kanban", "0010_kanbanboard_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="kanbanboard",
+            name="compacted_through",
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name="KanbanChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("create", "Create"),
+                            ("update", "Update"),
+                            ("delete", "Delete"),
+                            ("move", "Move"),
+                            ("shift", "Shift"),
+                            ("reorder", "Reorder"),
+                            ("normalize", "Normalize"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("model", models.CharField(max_length=20)),
+                ("object_id", models.BigIntegerField(null=True)),
+                ("data", models.JSONField(default=dict)),
+                (
+                    "kanban_board",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="kanban.kanbanboard",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["kanban_board", "id"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="kanbanchange",
+            index=models.Index(
+                fields=["kanban_board", "id"], name="INDEX__KanbanChange__board_id"
+            ),
+        ),
+    ]
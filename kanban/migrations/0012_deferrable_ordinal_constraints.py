@@ -0,0 +1,50 @@
+from django.db import migrations
+
+# On PostgreSQL, the scope-ordinal unique constraints are made DEFERRABLE
+# INITIALLY DEFERRED, so that they are checked at commit and a range of
+# ordinals can be shifted in one UPDATE (see OrdinalManager).
+#
+# This is not declared on the models' UniqueConstraints: on databases
+# without deferrable constraints (SQLite), Django would then create no
+# constraint at all. The models keep declaring an immediate constraint,
+# and only the PostgreSQL schema differs.
+
+CONSTRAINTS = [
+    ("KanbanList", "UNIQUE__KanbanList__kanbanboard_ordinal", "kanban_board"),
+    ("KanbanCard", "UNIQUE__KanbanCard__kanbanlist_ordinal", "kanban_list"),
+]
+
+
+def recreate_constraints(deferred):
+    def recreate(apps, schema_editor):
+        if not schema_editor.connection.features.supports_deferrable_unique_constraints:
+            return
+
+        quote = schema_editor.quote_name
+        for model_name, name, scope in CONSTRAINTS:
+            meta = apps.get_model("kanban", model_name)._meta
+            table = quote(meta.db_table)
+            columns = ", ".join(
+                quote(meta.get_field(field).column) for field in [scope, "ordinal"]
+            )
+
+            schema_editor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {quote(name)}")
+            schema_editor.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {quote(name)} UNIQUE ({columns})"
+                + (" DEFERRABLE INITIALLY DEFERRED" if deferred else "")
+            )
+
+    return recreate
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kanban", "0011_kanbanchange"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            recreate_constraints(deferred=True), recreate_constraints(deferred=False)
+        ),
+    ]
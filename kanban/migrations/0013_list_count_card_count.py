@@ -0,0 +1,49 @@
+# Generated by Django 4.1.5 on 2026-10-17 01:19
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_existing_rows(apps, schema_editor):
+    # As OrdinalManager.recount() does, with the historical models.
+    for parent, child, scope, counter in [
+        ("KanbanBoard", "KanbanList", "kanban_board", "list_count"),
+        ("KanbanList", "KanbanCard", "kanban_list", "card_count"),
+    ]:
+        children = apps.get_model("kanban", child).objects
+        apps.get_model("kanban", parent).objects.update(
+            **{
+                counter: Coalesce(
+                    Subquery(
+                        children.filter(**{scope: OuterRef("pk")})
+                        .order_by()
+                        .values(scope)
+                        .annotate(count=Count("pk"))
+                        .values("count")
+                    ),
+                    0,
+                )
+            }
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kanban", "0012_deferrable_ordinal_constraints"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="kanbanboard",
+            name="list_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="kanbanlist",
+            name="card_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_existing_rows, migrations.RunPython.noop),
+    ]
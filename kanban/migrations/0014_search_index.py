@@ -0,0 +1,74 @@
+from django.db import migrations
+
+# On SQLite, cards' content and boards' titles are indexed for full-text
+# search in FTS5 tables (see kanban.search). Each is an external content
+# table: it indexes the rows of the model's own table, which it reads
+# back from by rowid, rather than holding a second copy of their text.
+#
+# Triggers keep the indexes in step with the tables, whatever writes
+# them: saves, bulk_create, queryset updates and cascading deletes alike.
+# Only changes to the indexed column touch an index, so ordinal shifts
+# and moves cost nothing here.
+#
+# A later migration that remakes either table (as SQLite's schema editor
+# does to alter most columns) drops its triggers with it: it must create
+# them again, and rebuild the index (see the rebuild_search_index command).
+#
+# Other databases have no FTS5; searches there fall back to a scan.
+
+INDEXES = [
+    ("kanban_cardsearch", "kanban_kanbancard", "content"),
+    ("kanban_boardsearch", "kanban_kanbanboard", "title"),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for index, table, column in INDEXES:
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {index} USING fts5("
+            f"{column}, content='{table}', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+
+        insert = f"INSERT INTO {index}(rowid, {column}) VALUES (new.id, new.{column});"
+        delete = (
+            f"INSERT INTO {index}({index}, rowid, {column}) "
+            f"VALUES ('delete', old.id, old.{column});"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {index}_insert AFTER INSERT ON {table} BEGIN {insert} END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {index}_delete AFTER DELETE ON {table} BEGIN {delete} END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {index}_update AFTER UPDATE OF {column} ON {table} "
+            f"BEGIN {delete} {insert} END"
+        )
+
+        # Index the rows that already exist.
+        schema_editor.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for index, table, column in INDEXES:
+        for trigger in ["insert", "delete", "update"]:
+            schema_editor.execute(f"DROP TRIGGER {index}_{trigger}")
+        schema_editor.execute(f"DROP TABLE {index}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kanban", "0013_list_count_card_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
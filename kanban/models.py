@@ -1,6 +1,11 @@
 from django.conf import settings
 from django.db import models
+from django.db.models import Max
 from django.db.models.functions import Length
+from flexdentaldemoapi.transactions import atomic_write
+
+from .concurrency import retrying
+from .managers import KanbanBoardQuerySet, KanbanChangeManager, OrdinalManager
 
 models.CharField.register_lookup(Length, "length")
 
@@ -8,11 +13,65 @@ KANBANBOARD_TITLE_MAXLENGTH = settings.KANBAN.get("KanbanBoard_title_maxlength")
 KANBANLIST_TITLE_MAXLENGTH = settings.KANBAN.get("KanbanList_title_maxlength")
 
 
+def saved_fields(instance, update_fields):
+    """
+    Return the fields that saving an existing instance writes: all but
+    its `maintained_fields`, unless `update_fields` names them. Those are
+    only written with set-based UPDATEs (e.g. F() expressions), which the
+    instance's values, read earlier, must not overwrite.
+    """
+
+    if update_fields is not None or instance._state.adding:
+        return update_fields
+
+    return [
+        field.name
+        for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in instance.maintained_fields
+    ]
+
+
 class KanbanBoard(models.Model):
     """A board holds lists."""
 
     title = models.CharField(max_length=KANBANBOARD_TITLE_MAXLENGTH)
 
+    # A board's version goes up whenever the board, or any of its lists
+    # or cards, changes. Readers use it to tell whether what they hold
+    # is still current without reading the lists and cards.
+    version = models.PositiveBigIntegerField(editable=False, default=0)
+
+    # When the board, or any of its lists or cards, last changed.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # The changes in the board's change log up to (and including) this id
+    # have been compacted away. Delta syncs from before it get a snapshot.
+    compacted_through = models.BigIntegerField(editable=False, default=0)
+
+    # How many lists the board has. Kept as lists are created, moved and
+    # deleted (see OrderedModel), so that they are never counted; the
+    # repair_counts command recounts them.
+    list_count = models.IntegerField(editable=False, default=0)
+
+    maintained_fields = ["version", "compacted_through", "list_count"]
+
+    objects = KanbanBoardQuerySet.as_manager()
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if self._state.adding:
+            return super().save(*args, update_fields=update_fields, **kwargs)
+
+        with atomic_write():
+            # The new version is not read back: use refresh_from_db()
+            # if this instance's version is needed after a save.
+            KanbanBoard.objects.bump_version(self.pk)
+            super().save(
+                *args, update_fields=saved_fields(self, update_fields), **kwargs
+            )
+            KanbanChange.objects.record(
+                self.pk, "update", KanbanBoard, self.pk, title=self.title
+            )
+
     class Meta:
         constraints = [
             models.CheckConstraint(
@@ -26,47 +85,213 @@ class KanbanBoard(models.Model):
         ]
 
 
-class KanbanList(models.Model):
+class OrderedModel(models.Model):
+    """
+    An ordered model holds a unique position among its siblings.
+
+    Siblings are the rows that share the foreign key named by `ordinal_scope`.
+    Positions are stored as sparse ordinals (see `kanban.ordinals`), so a
+    move usually rewrites the moved row and nothing else.
+    """
+
+    # The name of the foreign key that groups siblings together.
+    ordinal_scope = None
+
+    # The name of the field of the scope that counts its rows.
+    scope_counter = None
+
+    # The name of the scope's foreign key to its board, or None if the
+    # scope is a board itself.
+    scope_board = None
+
+    # See `saved_fields`.
+    maintained_fields = []
+
+    # A value of None means an undefined ordinal: the row is appended
+    # to the end of its siblings when it is saved.
+    ordinal = models.IntegerField(editable=False, default=None)
+
+    objects = OrdinalManager()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+
+        # Remember the scope this row was loaded in, so that a save that
+        # moves it to another scope also updates the board it came from.
+        instance._loaded_scope_id = instance.__dict__.get(
+            cls._meta.get_field(cls.ordinal_scope).attname
+        )
+        return instance
+
+    @classmethod
+    def scope_board_id(cls, scope):
+        """
+        Return the id of the board that a scope (a board or list, or its
+        id) belongs to.
+        """
+
+        if cls.scope_board is None:
+            return getattr(scope, "pk", scope)
+
+        scope_model = cls._meta.get_field(cls.ordinal_scope).related_model
+        attname = scope_model._meta.get_field(cls.scope_board).attname
+        if isinstance(scope, scope_model):
+            return getattr(scope, attname)
+        return scope_model.objects.values_list(attname, flat=True).get(pk=scope)
+
+    def siblings(self):
+        """Return a queryset of every row that shares this row's scope."""
+
+        return type(self).objects.filter(
+            **{self.ordinal_scope: getattr(self, self.ordinal_scope)}
+        )
+
+    def change_data(self):
+        """Return this row's fields, as recorded in the change log."""
+
+        # Maintained fields change without a change to the row itself.
+        return {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.name not in self.maintained_fields
+        }
+
+    def save(self, *args, update_fields=None, **kwargs):
+        scope = getattr(self, self.ordinal_scope)
+        board_id = self.scope_board_id(scope)
+
+        # A row that moved to another board leaves its old board.
+        loaded_scope_id = getattr(self, "_loaded_scope_id", None)
+        moved = loaded_scope_id not in (None, scope.pk)
+        left_board_id = None
+        if moved:
+            left_board_id = self.scope_board_id(loaded_scope_id)
+            if left_board_id == board_id:
+                left_board_id = None
+
+        ordinal, pk, adding = self.ordinal, self.pk, self._state.adding
+
+        def save_and_record():
+            # A concurrent write may have taken the ordinal this row was
+            # given (on PostgreSQL, only found out as the save commits).
+            # Another attempt starts over from the row as it came in.
+            self.ordinal, self.pk, self._state.adding = ordinal, pk, adding
+            KanbanBoard.objects.bump_version(*filter(None, [board_id, left_board_id]))
+
+            kind = "create" if self._state.adding else "update"
+            self._save(*args, update_fields=update_fields, **kwargs)
+
+            objects = type(self).objects
+            if kind == "create" or moved:
+                objects.count_rows(scope, 1)
+            if moved:
+                objects.count_rows(loaded_scope_id, -1)
+
+            if left_board_id is not None:
+                KanbanChange.objects.record(
+                    left_board_id, "delete", type(self), self.pk
+                )
+            KanbanChange.objects.record(
+                board_id, kind, type(self), self.pk, **self.change_data()
+            )
+            if left_board_id is not None:
+                self.record_contents(board_id)
+
+        retrying(save_and_record)
+        self._loaded_scope_id = scope.pk
+
+    def record_contents(self, board_id):
+        """
+        Record, in a board's change log, the creation of the rows this row
+        holds. Called once this row has moved to that board: its clients
+        have never seen them.
+        """
+
+    def delete(self, *args, **kwargs):
+        scope = getattr(self, self.ordinal_scope)
+        board_id = self.scope_board_id(scope)
+
+        with atomic_write():
+            KanbanBoard.objects.bump_version(board_id)
+            KanbanChange.objects.record(board_id, "delete", type(self), self.pk)
+            type(self).objects.count_rows(scope, -1)
+            return super().delete(*args, **kwargs)
+
+    def _save(self, *args, update_fields=None, **kwargs):
+        siblings = self.siblings()
+
+        # Put a row with an undefined ordinal at the end of its siblings.
+        # The unique index on scope-ordinal makes this an O(log n) lookup,
+        # unlike counting the siblings.
+        if self.ordinal is None:
+            last = siblings.aggregate(last=Max("ordinal"))["last"]
+            self.ordinal = type(self).objects.ordinal_after(
+                getattr(self, self.ordinal_scope), last
+            )
+
+        # A row that lands on an occupied ordinal (e.g. because it changed
+        # scope) takes the free ordinal just before the current occupant.
+        elif siblings.filter(ordinal=self.ordinal).exclude(pk=self.pk).exists():
+            self.ordinal = type(self).objects.make_room(self, self.ordinal)
+
+        super().save(*args, update_fields=saved_fields(self, update_fields), **kwargs)
+
+    def change_ordinal(self, position):
+        """
+        Move this row to a zero-indexed position among its siblings.
+
+        A position at or below 0 moves the row to the start; a position
+        at or past the sibling count moves the row to the end.
+        """
+
+        type(self).objects.move(self, position)
+
+    def rebalance_ordinals(self):
+        """Re-spread this row's siblings ORDINAL_GAP apart, keeping their order."""
+
+        type(self).rebalance_scope(getattr(self, self.ordinal_scope))
+
+    @classmethod
+    def rebalance_scope(cls, scope):
+        """Re-spread the rows of one scope ORDINAL_GAP apart, keeping their order."""
+
+        cls.objects.normalize(scope)
+
+
+class KanbanList(OrderedModel):
     """A list holds cards."""
 
+    ordinal_scope = "kanban_board"
+    scope_counter = "list_count"
+
     # A list belongs to exactly one board.
     # When a board is destroyed, destroy its lists.
     kanban_board = models.ForeignKey(
         to=KanbanBoard, on_delete=models.CASCADE, null=False
     )
 
-    # A list holds a unique, zero-indexed position in its board.
-    ordinal = models.IntegerField(editable=False, default=None)
-
     title = models.CharField(max_length=KANBANLIST_TITLE_MAXLENGTH)
 
-    def save(self, *args, update_fields=None, **kwargs):
-
-        # A value of None means an undefined ordinal.
-        # Set this list's ordinal to the board's list count to put
-        # it at the end of the board.
-        if self.ordinal is None:
-            self.ordinal = KanbanList.objects.filter(
-                kanban_board=self.kanban_board
-            ).count()
-        else:
-            lists_with_this_ordinal = KanbanList.objects.filter(
-                kanban_board=self.kanban_board,
-                ordinal=self.ordinal,
-            )
-            if len(lists_with_this_ordinal) > 1:
-                KanbanList.normalize_ordinals()
-                KanbanList.shift_ordinal_range_up(start=self.ordinal)
-            elif (
-                len(lists_with_this_ordinal) == 1
-                and lists_with_this_ordinal.get().id != self.id
-            ):
-                KanbanList.shift_ordinal_range_up(start=self.ordinal)
+    # How many cards the list has; kept as KanbanBoard.list_count is.
+    card_count = models.IntegerField(editable=False, default=0)
 
-        super().save(*args, update_fields=update_fields, **kwargs)
+    maintained_fields = ["card_count"]
 
-    def normalize_ordinals():
-        pass
+    def record_contents(self, board_id):
+        KanbanChange.objects.bulk_create(
+            KanbanChange(
+                kanban_board_id=board_id,
+                kind="create",
+                model=KanbanCard._meta.model_name,
+                object_id=card.pk,
+                data=card.change_data(),
+            )
+            for card in self.kanbancard_set.order_by("ordinal")
+        )
 
     class Meta:
         # A list should be presented in the order in which it
@@ -77,6 +302,7 @@ class KanbanList(models.Model):
         # - It creates a covering index for O(1) list lookups by board.
         # - It creates an index for O(1) reordering of lists within a board.
         # - It guarantees that there can be no collisions of list positions in a board.
+        # On PostgreSQL, it is checked at commit (see migration 0012).
         constraints = [
             models.UniqueConstraint(
                 fields=["kanban_board", "ordinal"],
@@ -93,17 +319,17 @@ class KanbanList(models.Model):
         ]
 
 
-class KanbanCard(models.Model):
+class KanbanCard(OrderedModel):
     """A card holds data."""
 
+    ordinal_scope = "kanban_list"
+    scope_counter = "card_count"
+    scope_board = "kanban_board"
+
     # A card belongs to exactly one list.
     # When a list is destroyed, destroy its cards.
     kanban_list = models.ForeignKey(to=KanbanList, on_delete=models.CASCADE)
 
-    # This is a card's unique, zero-indexed position in its list.
-    # It is automatically generated and maintained by the database.
-    ordinal = models.IntegerField(editable=False, default=-1)
-
     content = models.TextField()
 
     class Meta:
@@ -115,9 +341,63 @@ class KanbanCard(models.Model):
         # - It creates a covering index for O(1) card lookups by list.
         # - It creates an index for O(1) reordering of cards within a list.
         # - It guarantees that there can be no collisions of card positions in a list.
+        # On PostgreSQL, it is checked at commit (see migration 0012).
         constraints = [
             models.UniqueConstraint(
                 fields=["kanban_list", "ordinal"],
                 name="UNIQUE__KanbanCard__kanbanlist_ordinal",
             )
         ]
+
+
+class KanbanChange(models.Model):
+    """
+    A change holds one entry in a board's append-only change log.
+
+    Replaying a board's changes, in id order, over a snapshot of the board
+    reproduces the board exactly, ordinals included:
+    - create/update: upsert the row with the fields in `data`.
+    - delete: remove the row (and, for a list, its cards).
+    - move: set the row's ordinal to `data["ordinal"]`.
+    - shift: add `data["by"]` to the ordinals in [start, end] of the
+      board/list `data["scope_id"]` (an end of None means no upper bound).
+    - reorder: set the ordinals of the rows in `data["ordinals"]`.
+    - normalize: re-spread the ordinals of the board/list `data["scope_id"]`
+      to min + gap, min + 2 * gap, ... keeping their order.
+    """
+
+    class Kind(models.TextChoices):
+        CREATE = "create"
+        UPDATE = "update"
+        DELETE = "delete"
+        MOVE = "move"
+        SHIFT = "shift"
+        REORDER = "reorder"
+        NORMALIZE = "normalize"
+
+    # A change belongs to exactly one board.
+    # When a board is destroyed, destroy its change log.
+    kanban_board = models.ForeignKey(to=KanbanBoard, on_delete=models.CASCADE)
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+
+    # The model name (kanbanboard, kanbanlist or kanbancard) of the changed row(s).
+    model = models.CharField(max_length=20)
+
+    # The id of the changed row, for changes to a single row.
+    object_id = models.BigIntegerField(null=True)
+
+    data = models.JSONField(default=dict)
+
+    objects = KanbanChangeManager()
+
+    class Meta:
+        ordering = ["kanban_board", "id"]
+
+        # Delta syncs read the changes of one board after a cursor.
+        indexes = [
+            models.Index(
+                fields=["kanban_board", "id"],
+                name="INDEX__KanbanChange__board_id",
+            )
+        ]
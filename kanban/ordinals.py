@@ -0,0 +1,144 @@
+from bisect import bisect_left
+
+from django.conf import settings
+
+# Ordinals are sparse sort keys, not dense positions.
+# Siblings are spread ORDINAL_GAP apart so that a move can almost always
+# be expressed as a write to the moved row alone: it takes a key from the
+# gap between its new neighbours. Only when a gap is exhausted do the
+# siblings need to be re-spread.
+ORDINAL_GAP = settings.KANBAN.get("ordinal_gap")
+
+# Ordinals are always positive. This keeps the negative half of the key
+# space free as scratch space for set-based rewrites of a sibling range,
+# and the first sibling always has room in front of it.
+ORDINAL_MIN = 0
+
+# Ordinals are stored in 32-bit integer columns, and each row appended
+# past the last of its siblings takes ORDINAL_GAP more. A scope that
+# runs past ORDINAL_LIMIT is re-spread before anything else is appended
+# to it: far below the column's maximum, so that the shifts of a
+# rewrite always have room above it.
+ORDINAL_MAX = 2**31 - 1
+ORDINAL_LIMIT = ORDINAL_MAX // 2
+
+
+def ordinal_between(before=None, after=None):
+    """
+    Return a free ordinal strictly between two neighbouring ordinals,
+    or None if there is no room left between them.
+
+    A value of None for `before` means "the start of the siblings";
+    a value of None for `after` means "the end of the siblings", where
+    there is no room left past ORDINAL_LIMIT.
+    """
+
+    if after is None:
+        ordinal = (ORDINAL_MIN if before is None else before) + ORDINAL_GAP
+        return ordinal if ordinal <= ORDINAL_LIMIT else None
+
+    lower = ORDINAL_MIN if before is None else before
+
+    if after - lower < 2:
+        return None
+
+    # Bisect the gap so that repeated inserts at the same spot
+    # exhaust it as slowly as possible.
+    return lower + (after - lower) // 2
+
+
+def ordinals_between(before, after, count):
+    """
+    Return `count` increasing ordinals strictly between two neighbouring
+    ordinals (None meaning the start or the end, as for ordinal_between),
+    evenly spaced; or None if there is no room for them all.
+    """
+
+    lower = ORDINAL_MIN if before is None else before
+    if after is None:
+        if lower + count * ORDINAL_GAP > ORDINAL_LIMIT:
+            return None
+        return [lower + i * ORDINAL_GAP for i in range(1, count + 1)]
+
+    step = (after - lower) // (count + 1)
+    if step < 1:
+        return None
+    return [lower + i * step for i in range(1, count + 1)]
+
+
+def renumber(held):
+    """
+    Return the ordinals of the rows of one scope in a new order, given the
+    ordinal each row holds now, in that order (None for a row that holds
+    none yet in this scope, e.g. a new row).
+
+    As many rows as possible keep the ordinals they hold: the longest run
+    of them still in increasing order. The other rows are fitted into the
+    gaps around them. If a gap is too narrow, the scope is re-spread
+    instead. Either way, the scope's new ordinals are known at once, to
+    be written in one go.
+    """
+
+    ordinals = [None] * len(held)
+    for i in increasing_run(held):
+        ordinals[i] = held[i]
+
+    start = 0
+    while start < len(ordinals):
+        if ordinals[start] is not None:
+            start += 1
+            continue
+
+        end = start
+        while end < len(ordinals) and ordinals[end] is None:
+            end += 1
+
+        before = ordinals[start - 1] if start else None
+        after = ordinals[end] if end < len(ordinals) else None
+        fitted = ordinals_between(before, after, end - start)
+        if fitted is None:
+            return list(spread(len(held)))
+
+        ordinals[start:end] = fitted
+        start = end
+
+    return ordinals
+
+
+def increasing_run(values):
+    """
+    Return the indexes of a longest strictly increasing subsequence of
+    `values`, skipping Nones. O(n log n).
+    """
+
+    # tails[k]: the index of the smallest value that ends a run of k + 1,
+    # and tail_values[k] that value.
+    tails = []
+    tail_values = []
+    previous = {}
+    for i, value in enumerate(values):
+        if value is None:
+            continue
+        k = bisect_left(tail_values, value)
+        previous[i] = tails[k - 1] if k else None
+        if k == len(tails):
+            tails.append(i)
+            tail_values.append(value)
+        else:
+            tails[k] = i
+            tail_values[k] = value
+
+    run = []
+    i = tails[-1] if tails else None
+    while i is not None:
+        run.append(i)
+        i = previous[i]
+    return run[::-1]
+
+
+def spread(count):
+    """Return `count` ordinals spread ORDINAL_GAP apart."""
+
+    return range(
+        ORDINAL_MIN + ORDINAL_GAP, ORDINAL_MIN + (count + 1) * ORDINAL_GAP, ORDINAL_GAP
+    )
@@ -0,0 +1,28 @@
+import csv
+import io
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+# The bulk export streams its own body (see kanban.bulk); these renderers
+# exist for content negotiation, and to render any error response.
+
+
+class JSONLinesRenderer(BaseRenderer):
+    media_type = "application/jsonl"
+    format = "jsonl"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data) + "\n"
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(data.items())
+        return buffer.getvalue()
@@ -0,0 +1,141 @@
+"""
+Full-text search of cards' content and boards' titles.
+
+On SQLite, each is indexed in an FTS5 table that triggers keep in step
+with the model's table (see migration 0014). A search is then one query
+of the index, ranked by bm25, and joined to the rows it matched: its
+cost follows the number of hits, not the number of rows searched.
+
+Other databases have no FTS5. Searches there fall back to a scan of
+the rows with one case-insensitive `LIKE` per word, unranked.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import F, FloatField, Value
+from flexdentaldemoapi.transactions import atomic_write
+
+from .models import KanbanBoard, KanbanList, KanbanCard
+
+CARD_INDEX = "kanban_cardsearch"
+BOARD_INDEX = "kanban_boardsearch"
+
+# Close to FTS5's unicode61 tokenizer, which splits text on everything
+# but letters and digits.
+WORD = re.compile(r"\w+")
+
+
+def words(text):
+    """Return the words of a search, as the index splits them."""
+
+    return WORD.findall(text)
+
+
+def match_expression(words):
+    """
+    Return the FTS5 query that matches rows with all of `words`.
+
+    Each word is quoted, so that FTS5 query syntax in a search (AND, NEAR,
+    column filters, stray quotes) is searched for rather than obeyed. The
+    last word matches as a prefix, so that hits follow a search as it is
+    typed.
+    """
+
+    quoted = [f'"{word}"' for word in words]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def indexed():
+    """Whether the database has the search index."""
+
+    return connection.vendor == "sqlite"
+
+
+class RankedSearch:
+    """
+    The hits of a search, best first, as dicts of `columns`.
+
+    Hits are read a slice at a time (e.g. by a paginator), each slice in
+    one query with its own LIMIT and OFFSET; there is never a count.
+    """
+
+    def __init__(self, sql, params, columns):
+        self.sql = sql
+        self.params = params
+        self.columns = columns
+
+    def __getitem__(self, window):
+        start = window.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"{self.sql} LIMIT %s OFFSET %s",
+                [*self.params, window.stop - start, start],
+            )
+            return [dict(zip(self.columns, row)) for row in cursor.fetchall()]
+
+
+def search_cards(board_id, words):
+    """Search the cards of one board for every one of `words`."""
+
+    if not indexed():
+        cards = KanbanCard.objects.filter(kanban_list__kanban_board_id=board_id)
+        for word in words:
+            cards = cards.filter(content__icontains=word)
+        return cards.order_by("kanban_list__ordinal", "ordinal").values(
+            "id",
+            "ordinal",
+            "content",
+            list=F("kanban_list_id"),
+            score=Value(None, output_field=FloatField()),
+        )
+
+    # bm25() is lower for better hits; the score is its negation.
+    return RankedSearch(
+        f"SELECT card.id, card.kanban_list_id, card.ordinal, card.content, "
+        f"-bm25({CARD_INDEX}) AS score "
+        f"FROM {CARD_INDEX} "
+        f"JOIN {KanbanCard._meta.db_table} card ON card.id = {CARD_INDEX}.rowid "
+        f"JOIN {KanbanList._meta.db_table} list ON list.id = card.kanban_list_id "
+        f"WHERE {CARD_INDEX} MATCH %s AND list.kanban_board_id = %s "
+        "ORDER BY score DESC, card.id",
+        [match_expression(words), board_id],
+        ["id", "list", "ordinal", "content", "score"],
+    )
+
+
+def search_boards(words):
+    """Search the titles of every board for every one of `words`."""
+
+    if not indexed():
+        boards = KanbanBoard.objects.all()
+        for word in words:
+            boards = boards.filter(title__icontains=word)
+        return boards.order_by("id").values(
+            "id", "title", score=Value(None, output_field=FloatField())
+        )
+
+    return RankedSearch(
+        f"SELECT board.id, board.title, -bm25({BOARD_INDEX}) AS score "
+        f"FROM {BOARD_INDEX} "
+        f"JOIN {KanbanBoard._meta.db_table} board ON board.id = {BOARD_INDEX}.rowid "
+        f"WHERE {BOARD_INDEX} MATCH %s "
+        "ORDER BY score DESC, board.id",
+        [match_expression(words)],
+        ["id", "title", "score"],
+    )
+
+
+def rebuild():
+    """
+    Rebuild the search index from the cards and boards tables, e.g. after
+    they were written with the triggers missing. Return the number of
+    cards and boards indexed.
+    """
+
+    with atomic_write(), connection.cursor() as cursor:
+        for index in [CARD_INDEX, BOARD_INDEX]:
+            cursor.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+
+        return KanbanCard.objects.count(), KanbanBoard.objects.count()
@@ -0,0 +1,263 @@
+import re
+from collections import defaultdict
+
+from django.conf import settings
+from flexdentaldemoapi.rows import RowSerializer
+from rest_framework import serializers
+
+from . import search
+from .models import KanbanBoard, KanbanList, KanbanCard, KanbanChange
+from .models import KANBANBOARD_TITLE_MAXLENGTH, KANBANLIST_TITLE_MAXLENGTH
+
+
+class KanbanCardSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = KanbanCard
+        fields = ["id", "ordinal", "content"]
+
+
+class KanbanListSerializer(serializers.ModelSerializer):
+    cards = KanbanCardSerializer(source="kanbancard_set", many=True, read_only=True)
+
+    class Meta:
+        model = KanbanList
+        fields = ["id", "ordinal", "title", "cards"]
+
+
+class KanbanBoardSnapshotSerializer(serializers.ModelSerializer):
+    """A whole board: its lists, and their cards, in order."""
+
+    lists = KanbanListSerializer(source="kanbanlist_set", many=True, read_only=True)
+
+    class Meta:
+        model = KanbanBoard
+        fields = ["id", "title", "lists"]
+
+
+class KanbanBoardSerializer(serializers.ModelSerializer):
+    """A board alone, as listed: without its lists and cards."""
+
+    class Meta:
+        model = KanbanBoard
+        fields = ["id", "title", "version", "updated_at", "list_count"]
+
+
+class KanbanCardListingSerializer(serializers.ModelSerializer):
+    """A card outside of its list's snapshot, so it says which list it is in."""
+
+    list = serializers.IntegerField(source="kanban_list_id", read_only=True)
+
+    class Meta:
+        model = KanbanCard
+        fields = ["id", "list", "ordinal", "content"]
+
+
+class KanbanBoardRowSerializer(RowSerializer):
+    """The fast twin of KanbanBoardSerializer."""
+
+    fields = KanbanBoardSerializer.Meta.fields
+    conversions = {"updated_at": serializers.DateTimeField()}
+
+
+class KanbanListRowSerializer(RowSerializer):
+    """A list of a snapshot, without its cards."""
+
+    fields = ["id", "ordinal", "title"]
+
+
+class KanbanCardRowSerializer(RowSerializer):
+    """The fast twin of KanbanCardSerializer."""
+
+    fields = KanbanCardSerializer.Meta.fields
+
+
+class KanbanCardListingRowSerializer(RowSerializer):
+    """The fast twin of KanbanCardListingSerializer."""
+
+    fields = KanbanCardListingSerializer.Meta.fields
+    sources = {"list": "kanban_list_id"}
+
+
+class KanbanBoardSnapshotRows:
+    """
+    The fast twin of KanbanBoardSnapshotSerializer: a board's snapshot,
+    built from `.values_list()` rows of its lists and cards, in two queries.
+    """
+
+    def __init__(self):
+        self.lists = KanbanListRowSerializer()
+        self.cards = KanbanCardRowSerializer()
+
+    def lists_queryset(self, board):
+        return (
+            KanbanList.objects.filter(kanban_board_id=board.pk)
+            .order_by("ordinal")
+            .values_list(*self.lists.columns)
+        )
+
+    def cards_queryset(self, lists):
+        # By the ids of the lists already read, as prefetch_related does,
+        # rather than by a join on the board. Ordered on the column, not
+        # the relation, which would order on the lists' ordering instead.
+        ids = [row[self.lists.columns.index("id")] for row in lists]
+        return (
+            KanbanCard.objects.filter(kanban_list_id__in=ids)
+            .order_by("kanban_list_id", "ordinal")
+            .values_list("kanban_list_id", *self.cards.columns)
+        )
+
+    def serialize(self, board):
+        lists = list(self.lists_queryset(board))
+        return self.build(board, lists, self.cards_queryset(lists))
+
+    def build(self, board, lists, cards):
+        cards_by_list = defaultdict(list)
+        for kanban_list_id, *card in cards:
+            cards_by_list[kanban_list_id].append(card)
+
+        return {
+            "id": board.pk,
+            "title": board.title,
+            "lists": [
+                {
+                    **kanban_list,
+                    "cards": self.cards.serialize(cards_by_list[kanban_list["id"]]),
+                }
+                for kanban_list in self.lists.serialize(lists)
+            ],
+        }
+
+
+snapshot_rows = KanbanBoardSnapshotRows()
+
+
+class ExpectedVersionSerializer(serializers.Serializer):
+    """
+    The version of its board that a mutation was made against, if any
+    (see kanban.concurrency), and the client's changes cursor: if the
+    board has moved on, the client is sent the changes after it.
+    """
+
+    version = serializers.IntegerField(min_value=0, required=False)
+    since = serializers.IntegerField(min_value=0, required=False)
+
+
+class ReorderSerializer(ExpectedVersionSerializer):
+    """A full or partial ordering of the lists in a board or the cards in a list."""
+
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
+
+    def validate_ids(self, ids):
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError("ids must not contain duplicates.")
+        return ids
+
+
+class KanbanChangeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = KanbanChange
+        fields = ["id", "kind", "model", "object_id", "data"]
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    """The cursor a delta sync starts after. Without one, sync from a snapshot."""
+
+    since = serializers.IntegerField(min_value=0, required=False)
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    """The text of a search, `?q=`, as the words the index splits it into."""
+
+    q = serializers.CharField(max_length=200)
+
+    def validate_q(self, q):
+        words = search.words(q)
+        if not words:
+            raise serializers.ValidationError("Enter at least one word.")
+        return words
+
+
+class RowReferenceField(serializers.Field):
+    """A row named in a batch: by id, or as "$n", the row its n-th operation created."""
+
+    default_error_messages = {
+        "invalid": 'Must be an id, or "$n" for the row created by operation n.'
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, int) and not isinstance(data, bool) and data > 0:
+            return data
+        if isinstance(data, str) and re.fullmatch(r"\$\d+", data):
+            return data
+        self.fail("invalid")
+
+    def to_representation(self, value):
+        return value
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    """One operation of a batch; see kanban.batch."""
+
+    # The fields each operation on each model requires, and those it may have.
+    shapes = {
+        ("create", "list"): (["title"], ["position"]),
+        ("create", "card"): (["list", "content"], ["position"]),
+        ("update", "board"): (["title"], []),
+        ("update", "list"): (["id", "title"], []),
+        ("update", "card"): (["id", "content"], []),
+        ("move", "list"): (["id", "position"], []),
+        ("move", "card"): (["id", "position"], ["list"]),
+        ("delete", "list"): (["id"], []),
+        ("delete", "card"): (["id"], []),
+    }
+
+    titles = {
+        "board": KANBANBOARD_TITLE_MAXLENGTH,
+        "list": KANBANLIST_TITLE_MAXLENGTH,
+    }
+
+    op = serializers.ChoiceField(["create", "update", "move", "delete"])
+    model = serializers.ChoiceField(["board", "list", "card"])
+    id = RowReferenceField(required=False)
+    list = RowReferenceField(required=False)
+    position = serializers.IntegerField(required=False)
+    title = serializers.CharField(required=False)
+    content = serializers.CharField(required=False)
+
+    def validate(self, data):
+        shape = self.shapes.get((data["op"], data["model"]))
+        if shape is None:
+            raise serializers.ValidationError(
+                f"A {data['model']} cannot be given a {data['op']} operation."
+            )
+
+        required, optional = shape
+        errors = {
+            field: ["This field is required."]
+            for field in required
+            if field not in data
+        }
+        errors.update(
+            (field, [f"Not a field of a {data['op']} of a {data['model']}."])
+            for field in data
+            if field not in ["op", "model", *required, *optional]
+        )
+        if "title" in data and len(data["title"]) > self.titles[data["model"]]:
+            errors["title"] = [
+                f"Ensure this field has no more than "
+                f"{self.titles[data['model']]} characters."
+            ]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        return data
+
+
+class BatchSerializer(ExpectedVersionSerializer):
+    """The operations of a batch, in order."""
+
+    operations = serializers.ListField(
+        child=BatchOperationSerializer(),
+        allow_empty=False,
+        max_length=settings.KANBAN.get("batch_max_operations"),
+    )
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent once a transaction that changed one or more boards has committed.
+# Receivers get `board_ids`, a tuple of the ids of every changed board.
+board_changed = Signal()
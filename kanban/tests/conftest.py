@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+import pytest
+
+
+@pytest.fixture
+def client():
+    """An API client authenticated as a superuser."""
+    client = APIClient()
+    client.force_authenticate(
+        User.objects.create_superuser(username="admin", password="admin12345")
+    )
+    return client
+
+
+def ordered(queryset):
+    """Return the rows of a queryset in ordinal order."""
+    return list(queryset.order_by("ordinal"))
@@ -0,0 +1,371 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from ..models import KanbanBoard as KB, KanbanList as KL, KanbanCard as KC
+from ..ordinals import ORDINAL_GAP, renumber, spread
+
+
+@pytest.fixture
+def board():
+    board = KB.objects.create(title="My Board")
+    for title in ["todo", "done"]:
+        kanban_list = KL.objects.create(title=title, kanban_board=board)
+        for i in range(3):
+            KC.objects.create(content=f"{title} {i}", kanban_list=kanban_list)
+    return board
+
+
+def lists(board):
+    """Return a board's lists, as title: [card content], in order."""
+    return {
+        kanban_list.title: [
+            card.content for card in kanban_list.kanbancard_set.order_by("ordinal")
+        ]
+        for kanban_list in board.kanbanlist_set.order_by("ordinal")
+    }
+
+
+class TestRenumber:
+    """
+    renumber__keeps_the_rows_still_in_order
+    renumber__fits_new_rows_into_the_gaps
+    renumber__respreads_when_a_gap_is_too_narrow
+    """
+
+    def test_renumber__keeps_the_rows_still_in_order(self):
+        # The row at 3072 was dragged to the front.
+        assert renumber([3072, 1024, 2048]) == [512, 1024, 2048]
+
+    def test_renumber__fits_new_rows_into_the_gaps(self):
+        assert renumber([None, 1024, None, None, 4096, None]) == [
+            512,
+            1024,
+            2048,
+            3072,
+            4096,
+            4096 + ORDINAL_GAP,
+        ]
+
+    def test_renumber__respreads_when_a_gap_is_too_narrow(self):
+        assert renumber([1, None, 2]) == list(spread(3))
+
+
+@pytest.mark.django_db()
+class TestBatch:
+    """
+    batch__applies_every_operation_in_order
+    batch__refers_to_rows_created_earlier
+    batch__moves_cards_between_lists
+    batch__moves_cards_into_a_list_it_creates
+    batch__writes_each_list_once
+    batch__keeps_counts_and_change_log
+    batch__deletes_a_list_with_its_cards
+    batch__keeps_a_card_moved_out_of_a_deleted_list
+    batch__fails_as_a_whole
+    batch__rejects_malformed_operations
+    batch__rejects_rows_of_other_boards
+    batch__at_another_version__conflicts
+    """
+
+    def post(self, client, board, operations, status=200, **expected):
+        response = client.post(
+            f"/boards/{board.id}/batch/",
+            {"operations": operations, **expected},
+            format="json",
+        )
+        assert response.status_code == status, response.data
+        return response
+
+    def test_batch__applies_every_operation_in_order(self, client, board):
+        todo = board.kanbanlist_set.get(title="todo")
+        first, second, third = todo.kanbancard_set.order_by("ordinal")
+
+        response = self.post(
+            client,
+            board,
+            [
+                {"op": "update", "model": "board", "title": "Renamed"},
+                {"op": "create", "model": "card", "list": todo.id, "content": "new"},
+                {"op": "move", "model": "card", "id": third.id, "position": 0},
+                {"op": "update", "model": "card", "id": first.id, "content": "edited"},
+                {"op": "delete", "model": "card", "id": second.id},
+                {"op": "update", "model": "list", "id": todo.id, "title": "doing"},
+            ],
+        )
+
+        assert lists(board) == {
+            "doing": ["todo 2", "edited", "new"],
+            "done": ["done 0", "done 1", "done 2"],
+        }
+        board.refresh_from_db()
+        assert board.title == "Renamed"
+
+        created, moved = response.data["results"][1:3]
+        new = KC.objects.get(content="new")
+        assert created == {
+            "id": new.id,
+            "list": todo.id,
+            "ordinal": new.ordinal,
+            "content": "new",
+        }
+        assert moved["ordinal"] < first.ordinal
+        assert response.data["results"][4] == {"id": second.id, "deleted": True}
+        assert response.data["results"][5]["title"] == "doing"
+
+    def test_batch__refers_to_rows_created_earlier(self, client, board):
+        response = self.post(
+            client,
+            board,
+            [
+                {"op": "create", "model": "list", "title": "first", "position": 0},
+                {"op": "create", "model": "card", "list": "$0", "content": "a"},
+                {"op": "create", "model": "card", "list": "$0", "content": "b"},
+                {"op": "move", "model": "card", "id": "$2", "position": 0},
+                {"op": "update", "model": "card", "id": "$1", "content": "a!"},
+            ],
+        )
+
+        assert lists(board)["first"] == ["b", "a!"]
+        assert list(lists(board)) == ["first", "todo", "done"]
+        first = board.kanbanlist_set.get(title="first")
+        assert response.data["results"][0]["id"] == first.id
+        assert first.card_count == 2
+
+    def test_batch__moves_cards_between_lists(self, client, board):
+        todo, done = board.kanbanlist_set.order_by("ordinal")
+        cards = list(todo.kanbancard_set.order_by("ordinal"))
+
+        self.post(
+            client,
+            board,
+            [
+                {
+                    "op": "move",
+                    "model": "card",
+                    "id": cards[0].id,
+                    "list": done.id,
+                    "position": 1,
+                },
+                {
+                    "op": "move",
+                    "model": "card",
+                    "id": cards[2].id,
+                    "list": done.id,
+                    "position": 0,
+                },
+                {"op": "move", "model": "list", "id": done.id, "position": 0},
+            ],
+        )
+
+        assert lists(board) == {
+            "done": ["todo 2", "done 0", "todo 0", "done 1", "done 2"],
+            "todo": ["todo 1"],
+        }
+        todo.refresh_from_db()
+        done.refresh_from_db()
+        assert (todo.card_count, done.card_count) == (1, 5)
+
+    def test_batch__moves_cards_into_a_list_it_creates(self, client, board):
+        todo, done = board.kanbanlist_set.order_by("ordinal")
+        first, second = todo.kanbancard_set.order_by("ordinal")[:2]
+
+        response = self.post(
+            client,
+            board,
+            [
+                {"op": "create", "model": "list", "title": "doing", "position": 1},
+                {
+                    "op": "move",
+                    "model": "card",
+                    "id": second.id,
+                    "list": "$0",
+                    "position": 0,
+                },
+                {
+                    "op": "move",
+                    "model": "card",
+                    "id": first.id,
+                    "list": "$0",
+                    "position": 0,
+                },
+                {"op": "move", "model": "list", "id": done.id, "position": 0},
+            ],
+        )
+
+        assert lists(board) == {
+            "done": ["done 0", "done 1", "done 2"],
+            "doing": ["todo 0", "todo 1"],
+            "todo": ["todo 2"],
+        }
+        doing = board.kanbanlist_set.get(title="doing")
+        assert response.data["results"][0]["id"] == doing.id
+        assert response.data["results"][1]["list"] == doing.id
+        assert doing.card_count == 2
+        assert KL.objects.recount() == KC.objects.recount() == 0
+
+    def test_batch__writes_each_list_once(self, client, board):
+        todo = board.kanbanlist_set.get(title="todo")
+        cards = list(todo.kanbancard_set.order_by("ordinal"))
+        operations = [
+            {
+                "op": "create",
+                "model": "card",
+                "list": todo.id,
+                "content": f"new {i}",
+                "position": 0,
+            }
+            for i in range(20)
+        ] + [
+            {"op": "move", "model": "card", "id": card.id, "position": 100}
+            for card in cards
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.post(client, board, operations)
+
+        assert lists(board)["todo"] == [
+            *(f"new {i}" for i in reversed(range(20))),
+            *(card.content for card in cards),
+        ]
+        # However many operations: reading the board, then writing it.
+        assert len(queries) < 20
+        inserts = [
+            q for q in queries if q["sql"].startswith('INSERT INTO "kanban_kanbancard"')
+        ]
+        assert len(inserts) == 1
+
+    def test_batch__keeps_counts_and_change_log(self, client, board):
+        todo = board.kanbanlist_set.get(title="todo")
+        board.refresh_from_db()
+        version = board.version
+        changes = board.kanbanchange_set.count()
+
+        self.post(
+            client,
+            board,
+            [
+                {"op": "create", "model": "list", "title": "new"},
+                {"op": "create", "model": "card", "list": todo.id, "content": "x"},
+                {"op": "delete", "model": "card", "id": todo.kanbancard_set.first().id},
+            ],
+        )
+
+        board.refresh_from_db()
+        todo.refresh_from_db()
+        assert board.version == version + 1
+        assert board.list_count == 3
+        assert todo.card_count == 3
+        assert KL.objects.recount() == KC.objects.recount() == 0
+        assert [change.kind for change in board.kanbanchange_set.all()[changes:]] == [
+            "delete",
+            "create",
+            "create",
+        ]
+
+    def test_batch__deletes_a_list_with_its_cards(self, client, board):
+        todo = board.kanbanlist_set.get(title="todo")
+
+        response = self.post(
+            client,
+            board,
+            [
+                {"op": "create", "model": "card", "list": todo.id, "content": "x"},
+                {"op": "delete", "model": "list", "id": todo.id},
+            ],
+        )
+
+        assert list(lists(board)) == ["done"]
+        assert not KC.objects.filter(kanban_list=todo.id).exists()
+        assert response.data["results"][0] == {"id": None, "deleted": True}
+
+    def test_batch__keeps_a_card_moved_out_of_a_deleted_list(self, client, board):
+        todo, done = board.kanbanlist_set.order_by("ordinal")
+        card = todo.kanbancard_set.first()
+
+        self.post(
+            client,
+            board,
+            [
+                {
+                    "op": "move",
+                    "model": "card",
+                    "id": card.id,
+                    "list": done.id,
+                    "position": 0,
+                },
+                {"op": "delete", "model": "list", "id": todo.id},
+            ],
+        )
+
+        assert lists(board) == {"done": ["todo 0", "done 0", "done 1", "done 2"]}
+
+    def test_batch__fails_as_a_whole(self, client, board):
+        todo = board.kanbanlist_set.get(title="todo")
+        card = todo.kanbancard_set.first()
+
+        response = self.post(
+            client,
+            board,
+            [
+                {"op": "update", "model": "board", "title": "Renamed"},
+                {"op": "delete", "model": "card", "id": card.id},
+                {"op": "update", "model": "card", "id": card.id, "content": "x"},
+            ],
+            status=400,
+        )
+
+        assert response.data == {"operations": {2: [f"{card.id} has been deleted"]}}
+        board.refresh_from_db()
+        assert board.title == "My Board"
+        assert KC.objects.filter(pk=card.id).exists()
+
+    @pytest.mark.parametrize(
+        "operation",
+        [
+            {"op": "create", "model": "board", "title": "x"},
+            {"op": "create", "model": "card", "content": "x"},
+            {"op": "update", "model": "list", "id": 1, "title": "x" * 21},
+            {"op": "move", "model": "list", "id": "one", "position": 0},
+            {"op": "delete", "model": "card", "id": 1, "content": "x"},
+        ],
+    )
+    def test_batch__rejects_malformed_operations(self, client, board, operation):
+        response = self.post(client, board, [operation], status=400)
+
+        assert 0 in response.data["operations"]
+
+    def test_batch__rejects_rows_of_other_boards(self, client, board):
+        other = KB.objects.create(title="Other")
+        elsewhere = KL.objects.create(title="elsewhere", kanban_board=other)
+        card = KC.objects.create(content="x", kanban_list=elsewhere)
+
+        for operation in [
+            {"op": "delete", "model": "list", "id": elsewhere.id},
+            {"op": "delete", "model": "card", "id": card.id},
+            {"op": "create", "model": "card", "list": elsewhere.id, "content": "x"},
+            {"op": "create", "model": "card", "list": "$0", "content": "x"},
+        ]:
+            self.post(client, board, [operation], status=400)
+
+        assert KC.objects.filter(pk=card.pk).exists()
+
+    def test_batch__at_another_version__conflicts(self, client, board):
+        board.refresh_from_db()
+
+        response = self.post(
+            client,
+            board,
+            [{"op": "update", "model": "board", "title": "Renamed"}],
+            status=409,
+            version=board.version - 1,
+        )
+
+        assert response.data["version"] == board.version
+        current = self.post(
+            client,
+            board,
+            [{"op": "update", "model": "board", "title": "Renamed"}],
+            version=board.version,
+        )
+        assert current["Board-Version"] == str(board.version + 1)
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from ..benchmarks import runner
+from ..benchmarks.suite import CASES
+from ..models import KanbanBoard as KB, KanbanList as KL, KanbanCard as KC
+
+
+# The suite runs each operation over and over, by design.
+@pytest.mark.nplusone(threshold=None)
+@pytest.mark.django_db()
+class TestBenchmarks:
+    """
+    run_suite__measures_every_case_at_every_size
+    run_suite__counts_queries_and_rows_written
+    run_suite__only_the_given_operations
+    results_document__is_json
+    compare__pairs_results_by_case
+    """
+
+    def test_run_suite__measures_every_case_at_every_size(self):
+        results = runner.run_suite([3, 5], repeat=2)
+
+        assert [(r["operation"], r["model"], r["size"]) for r in results] == [
+            (name, model.__name__, size) for size in [3, 5] for name, model, _ in CASES
+        ]
+        assert all(len(result["runs"]) == 2 for result in results)
+        assert KB.objects.count() == 2
+
+    def test_run_suite__counts_queries_and_rows_written(self):
+        results = {
+            (r["operation"], r["model"]): r for r in runner.run_suite([5], repeat=1)
+        }
+
+        # The row, the board's version, the change log and the list's count,
+        # and however many rows SQLite's search index writes for the card.
+        assert results["append", "KanbanCard"]["rows_written"] > 4
+        # Moves leave the search index alone.
+        assert results["move_to_top", "KanbanCard"]["rows_written"] == 3
+        # The row, the board's version and the change log.
+        assert results["move_to_top", "KanbanList"]["rows_written"] == 3
+        # The deleted row is compacted away by the rows after it.
+        assert (
+            results["delete_and_compact", "KanbanCard"]["rows_written"]
+            > results["move_to_top", "KanbanCard"]["rows_written"]
+        )
+        assert results["read_board", "KanbanBoard"]["rows_written"] == 0
+        assert all(result["queries"] > 0 for result in results.values())
+
+    def test_run_suite__only_the_given_operations(self):
+        results = runner.run_suite([4], repeat=1, operations=["append"])
+
+        assert {(r["operation"], r["model"]) for r in results} == {
+            ("append", "KanbanList"),
+            ("append", "KanbanCard"),
+        }
+        # The seeded lists and cards, and one more of each.
+        assert KL.objects.count() == KC.objects.count() == 5
+
+    def test_results_document__is_json(self):
+        document = runner.results_document(runner.run_suite([3], repeat=1), 1)
+
+        assert json.loads(json.dumps(document)) == document
+        assert document["format"] == runner.RESULTS_FORMAT
+        assert document["environment"]["database"] == "sqlite"
+
+    def test_compare__pairs_results_by_case(self):
+        def document(*results):
+            return {
+                "results": [
+                    {
+                        "operation": operation,
+                        "model": "KanbanList",
+                        "size": 10,
+                        "seconds": {"median": seconds},
+                        "queries": queries,
+                        "rows_written": 3,
+                    }
+                    for operation, seconds, queries in results
+                ]
+            }
+
+        comparisons = runner.compare(
+            document(("append", 0.002, 5), ("reorder", 0.01, 6)),
+            document(("append", 0.001, 4), ("read_board", 0.01, 3)),
+        )
+
+        assert comparisons == [
+            {
+                "key": ("append", "KanbanList", 10),
+                "before": 0.002,
+                "after": 0.001,
+                "ratio": 0.5,
+                "queries": -1,
+                "rows_written": 0,
+            }
+        ]
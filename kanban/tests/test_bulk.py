@@ -0,0 +1,248 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+import pytest
+from ..models import KanbanBoard as KB, KanbanList as KL, KanbanCard as KC
+from ..ordinals import ORDINAL_GAP, ORDINAL_LIMIT
+
+
+@pytest.fixture
+def board():
+    return KB.objects.create(title="My Board")
+
+
+def jsonl(*rows):
+    return "".join(json.dumps(row) + "\n" for row in rows)
+
+
+def post_import(client, board, body, content_type="application/jsonl"):
+    return client.post(f"/boards/{board.id}/import/", body, content_type=content_type)
+
+
+def export(board, format):
+    response = APIClient().get(f"/boards/{board.id}/export/", {"format": format})
+    assert response.status_code == 200
+    assert response.streaming
+    return b"".join(response.streaming_content).decode()
+
+
+def contents(klist):
+    return list(
+        klist.kanbancard_set.order_by("ordinal").values_list("content", flat=True)
+    )
+
+
+@pytest.mark.django_db()
+class TestImport:
+    """
+    import__jsonl__creates_lists_and_cards_in_order
+    import__csv__creates_lists_and_cards_in_order
+    import__csv__empty_content_cell__creates_an_empty_card
+    import__appends_to_existing_lists
+    import__query_count_does_not_grow_with_rows
+    import__past_the_ordinal_limit__respreads_the_list
+    import__malformed_row__imports_nothing
+    import__unsupported_media_type
+    import__session_authenticated__passes_csrf_check
+    import__moves_compaction_point_past_itself
+    import_cards__command
+    """
+
+    def test_import__jsonl__creates_lists_and_cards_in_order(self, client, board):
+        body = jsonl(
+            {"list": "To do", "content": "a"},
+            {"list": "Done", "content": "b"},
+            {"list": "To do", "content": "c"},
+            {"list": "Empty"},
+        )
+
+        response = post_import(client, board, body)
+
+        assert response.status_code == 201
+        assert response.data == {"lists": 3, "cards": 3}
+        to_do, done, empty = board.kanbanlist_set.order_by("ordinal")
+        assert [to_do.title, done.title, empty.title] == ["To do", "Done", "Empty"]
+        assert contents(to_do) == ["a", "c"]
+        assert contents(done) == ["b"]
+        assert contents(empty) == []
+        assert list(
+            to_do.kanbancard_set.order_by("ordinal").values_list("ordinal", flat=True)
+        ) == [ORDINAL_GAP, 2 * ORDINAL_GAP]
+
+    def test_import__csv__creates_lists_and_cards_in_order(self, client, board):
+        body = 'list,content\nTo do,a\nTo do,"b, with a comma"\nEmpty\n'
+
+        response = post_import(client, board, body, content_type="text/csv")
+
+        assert response.status_code == 201
+        to_do, empty = board.kanbanlist_set.order_by("ordinal")
+        assert contents(to_do) == ["a", "b, with a comma"]
+        assert contents(empty) == []
+
+    def test_import__csv__empty_content_cell__creates_an_empty_card(
+        self, client, board
+    ):
+        body = 'list,content\nTo do,\nTo do,""\n'
+
+        response = post_import(client, board, body, content_type="text/csv")
+
+        assert response.status_code == 201
+        assert contents(KL.objects.get()) == ["", ""]
+
+    def test_import__appends_to_existing_lists(self, client, board):
+        klist = KL.objects.create(title="To do", kanban_board=board)
+        KC.objects.create(content="first", kanban_list=klist)
+
+        post_import(client, board, jsonl({"list": "To do", "content": "second"}))
+
+        assert contents(klist) == ["first", "second"]
+        assert board.kanbanlist_set.count() == 1
+
+    @pytest.mark.parametrize(
+        "batch_size",
+        # Small batches repeat the INSERT, by design.
+        [pytest.param(7, marks=pytest.mark.nplusone(threshold=None)), 1000],
+    )
+    def test_import__query_count_does_not_grow_with_rows(self, board, batch_size):
+        from ..bulk import import_rows
+
+        def queries_for(count):
+            rows = [("To do", str(i)) for i in range(count)]
+            with CaptureQueriesContext(connection) as queries:
+                import_rows(board, rows, batch_size=batch_size)
+            return len(queries)
+
+        small, large = queries_for(10), queries_for(500)
+
+        # Only the number of INSERT batches grows.
+        assert large - small <= 500 // batch_size
+
+    def test_import__past_the_ordinal_limit__respreads_the_list(self, client, board):
+        klist = KL.objects.create(title="To do", kanban_board=board)
+        KC.objects.create(
+            content="a", kanban_list=klist, ordinal=ORDINAL_LIMIT - ORDINAL_GAP
+        )
+
+        post_import(
+            client, board, jsonl(*({"list": "To do", "content": c} for c in "bc"))
+        )
+
+        assert contents(klist) == ["a", "b", "c"]
+        assert list(
+            klist.kanbancard_set.order_by("ordinal").values_list("ordinal", flat=True)
+        ) == [ORDINAL_GAP, 2 * ORDINAL_GAP, 3 * ORDINAL_GAP]
+
+    def test_import__malformed_row__imports_nothing(self, client, board):
+        body = jsonl({"list": "To do", "content": "a"}) + "not json\n"
+
+        response = post_import(client, board, body)
+
+        assert response.status_code == 400
+        assert "line 2" in response.data["detail"]
+        assert not KL.objects.exists()
+
+    def test_import__unsupported_media_type(self, client, board):
+        response = post_import(client, board, "<xml/>", content_type="text/xml")
+
+        assert response.status_code == 415
+
+    @pytest.mark.parametrize(
+        "body, content_type",
+        [
+            (jsonl({"list": "To do", "content": "a"}), "application/jsonl"),
+            ("list,content\nTo do,a\n", "text/csv"),
+        ],
+    )
+    def test_import__session_authenticated__passes_csrf_check(
+        self, board, body, content_type
+    ):
+        # The CSRF check reads request.POST, and so parses the body.
+        client = APIClient(enforce_csrf_checks=True)
+        client.force_login(
+            User.objects.create_superuser(username="admin", password="admin12345")
+        )
+        token = "a" * 32
+        client.cookies["csrftoken"] = token
+
+        response = client.post(
+            f"/boards/{board.id}/import/",
+            body,
+            content_type=content_type,
+            HTTP_X_CSRFTOKEN=token,
+        )
+
+        assert response.status_code == 201
+        assert contents(KL.objects.get()) == ["a"]
+
+    def test_import__moves_compaction_point_past_itself(self, client, board):
+        cursor = APIClient().get(f"/boards/{board.id}/changes/").json()["cursor"]
+
+        post_import(client, board, jsonl({"list": "To do", "content": "a"}))
+        data = APIClient().get(f"/boards/{board.id}/changes/", {"since": cursor}).json()
+
+        assert data["snapshot"]["lists"][0]["cards"][0]["content"] == "a"
+        assert (
+            APIClient()
+            .get(f"/boards/{board.id}/changes/", {"since": data["cursor"]})
+            .json()["changes"]
+            == []
+        )
+
+    def test_import_cards__command(self, board, tmp_path):
+        path = tmp_path / "cards.csv"
+        path.write_text("list,content\nTo do,a\nTo do,b\n")
+
+        call_command("import_cards", board.id, str(path), batch_size=1)
+
+        assert contents(KL.objects.get()) == ["a", "b"]
+
+
+@pytest.mark.django_db()
+class TestExport:
+    """
+    export__round_trips_through_import
+    export__csv
+    export_cards__command
+    """
+
+    @pytest.fixture
+    def filled(self, board):
+        for title in ["To do", "Doing", "Done"]:
+            klist = KL.objects.create(title=title, kanban_board=board)
+            for i in range(3 if title != "Doing" else 0):
+                KC.objects.create(content=f"{title} {i}", kanban_list=klist)
+        board.kanbanlist_set.get(title="Done").change_ordinal(0)
+        return board
+
+    @pytest.mark.parametrize("format", ["jsonl", "csv"])
+    def test_export__round_trips_through_import(self, client, filled, format):
+        exported = export(filled, format)
+        copy = KB.objects.create(title="Copy")
+
+        content_type = {"jsonl": "application/jsonl", "csv": "text/csv"}[format]
+        post_import(client, copy, exported, content_type=content_type)
+
+        assert export(copy, format) == exported
+        assert [l.title for l in copy.kanbanlist_set.order_by("ordinal")] == [
+            "Done",
+            "To do",
+            "Doing",
+        ]
+
+    def test_export__csv(self, filled):
+        lines = export(filled, "csv").splitlines()
+
+        assert lines[:2] == ["list,content", "Done,Done 0"]
+        assert "Doing" in lines
+
+    def test_export_cards__command(self, filled, capsys):
+        call_command("export_cards", filled.id)
+
+        rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert rows[0] == {"list": "Done", "content": "Done 0"}
+        assert {"list": "Doing"} in rows
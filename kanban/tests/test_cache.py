@@ -0,0 +1,119 @@
+from django.db import connection
+from rest_framework.test import APIClient
+
+import pytest
+from ..cache import snapshots
+from ..serializers import snapshot_rows
+from ..models import KanbanBoard as KB, KanbanList as KL, KanbanCard as KC
+
+
+@pytest.fixture
+def board():
+    board = KB.objects.create(title="My Board")
+    klist = KL.objects.create(title="My List", kanban_board=board)
+    KC.objects.create(content="My Card", kanban_list=klist)
+    return board
+
+
+def read(board):
+    return APIClient().get(f"/boards/{board.id}/").json()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBoardSnapshotCache:
+    """
+    get__hot_board__is_served_without_queries
+    invalidate__card_save_bumps_version
+    invalidate__ordinal_shift_bumps_version
+    invalidate__list_delete_bumps_version
+    invalidate__other_boards_stay_cached
+    get__miss__reads_the_board_in_one_transaction
+    get__miss__async__reads_the_board_in_one_transaction
+    stats__exported_as_metrics
+    """
+
+    def test_get__hot_board__is_served_without_queries(
+        self, board, django_assert_num_queries
+    ):
+        first = read(board)
+
+        with django_assert_num_queries(0):
+            assert read(board) == first
+
+        assert snapshots.stats() == {"hits": 1, "misses": 1}
+
+    def test_invalidate__card_save_bumps_version(self, board):
+        read(board)
+        card = KC.objects.get()
+        card.content = "Edited"
+        card.save()
+
+        assert read(board)["lists"][0]["cards"][0]["content"] == "Edited"
+        assert snapshots.stats() == {"hits": 0, "misses": 2}
+
+    def test_invalidate__ordinal_shift_bumps_version(self, board):
+        klist = KL.objects.create(title="Other List", kanban_board=board)
+        read(board)
+
+        klist.change_ordinal(0)
+
+        assert read(board)["lists"][0]["id"] == klist.id
+
+    def test_invalidate__list_delete_bumps_version(self, board):
+        read(board)
+
+        KL.objects.get().delete()
+
+        assert read(board)["lists"] == []
+
+    def test_invalidate__other_boards_stay_cached(self, board):
+        other = KB.objects.create(title="Other Board")
+        read(board)
+        read(other)
+
+        KL.objects.create(title="New List", kanban_board=other)
+        read(board)
+        read(other)
+
+        assert snapshots.stats() == {"hits": 1, "misses": 3}
+
+    def atomic_serializations(self, monkeypatch):
+        """Record, for each board serialized, whether it was in a transaction."""
+
+        serialize = snapshot_rows.serialize
+        atomic = []
+
+        def serialize_and_check(board):
+            atomic.append(connection.in_atomic_block)
+            return serialize(board)
+
+        monkeypatch.setattr(snapshot_rows, "serialize", serialize_and_check)
+        return atomic
+
+    def test_get__miss__reads_the_board_in_one_transaction(self, board, monkeypatch):
+        atomic = self.atomic_serializations(monkeypatch)
+
+        # The browsable API reads the board through the viewset.
+        APIClient().get(f"/boards/{board.id}/", HTTP_ACCEPT="text/html")
+
+        assert atomic == [True]
+
+    def test_get__miss__async__reads_the_board_in_one_transaction(
+        self, board, monkeypatch
+    ):
+        atomic = self.atomic_serializations(monkeypatch)
+
+        read(board)
+
+        assert atomic == [True]
+
+    def test_stats__exported_as_metrics(self, board, settings):
+        settings.INSTRUMENTATION = {**settings.INSTRUMENTATION, "enabled": True}
+        read(board)
+        read(board)
+
+        text = APIClient().get("/metrics/").content.decode()
+
+        assert "# TYPE kanban_snapshot_cache_hits_total counter" in text
+        assert "kanban_snapshot_cache_hits_total 1\n" in text
+        assert "kanban_snapshot_cache_misses_total 1\n" in text
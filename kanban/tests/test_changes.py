@@ -0,0 +1,173 @@
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+import pytest
+from ..models import KanbanBoard as KB, KanbanList as KL, KanbanCard as KC
+from ..ordinals import ORDINAL_GAP
+
+
+def sync(board, since=None):
+    params = {} if since is None else {"since": since}
+    response = APIClient().get(f"/boards/{board.id}/changes/", params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def state_from_snapshot(snapshot):
+    """Build a client's view of a board from a snapshot."""
+    return {
+        "title": snapshot["title"],
+        "kanbanlist": {
+            l["id"]: {"ordinal": l["ordinal"], "title": l["title"]}
+            for l in snapshot["lists"]
+        },
+        "kanbancard": {
+            c["id"]: {"ordinal": c["ordinal"], "content": c["content"], "list": l["id"]}
+            for l in snapshot["lists"]
+            for c in l["cards"]
+        },
+    }
+
+
+def in_scope(state, model, scope_id):
+    if model == "kanbanlist":
+        return state["kanbanlist"].values()
+    return [c for c in state["kanbancard"].values() if c["list"] == scope_id]
+
+
+def apply(state, change):
+    """Apply one change to a client's view of a board, as a client would."""
+    kind, model, data = change["kind"], change["model"], change["data"]
+
+    if model == "kanbanboard":
+        state["title"] = data["title"]
+    elif kind in ("create", "update"):
+        row = {"ordinal": data["ordinal"]}
+        if model == "kanbanlist":
+            row["title"] = data["title"]
+        else:
+            row["content"] = data["content"]
+            row["list"] = data["kanban_list_id"]
+        state[model][change["object_id"]] = row
+    elif kind == "delete":
+        state[model].pop(change["object_id"])
+        if model == "kanbanlist":
+            state["kanbancard"] = {
+                id: c
+                for id, c in state["kanbancard"].items()
+                if c["list"] != change["object_id"]
+            }
+    elif kind == "move":
+        state[model][change["object_id"]]["ordinal"] = data["ordinal"]
+    elif kind == "shift":
+        for row in in_scope(state, model, data["scope_id"]):
+            if row["ordinal"] >= data["start"] and (
+                data["end"] is None or row["ordinal"] <= data["end"]
+            ):
+                row["ordinal"] += data["by"]
+    elif kind == "reorder":
+        for id, ordinal in data["ordinals"].items():
+            state[model][int(id)]["ordinal"] = ordinal
+    elif kind == "normalize":
+        rows = sorted(
+            in_scope(state, model, data["scope_id"]), key=lambda r: r["ordinal"]
+        )
+        for position, row in enumerate(rows, start=1):
+            row["ordinal"] = data["min"] + position * data["gap"]
+
+
+@pytest.fixture
+def board():
+    board = KB.objects.create(title="My Board")
+    for title in "ab":
+        klist = KL.objects.create(title=title, kanban_board=board)
+        for content in "123":
+            KC.objects.create(content=content, kanban_list=klist)
+    return board
+
+
+@pytest.mark.django_db()
+class TestChanges:
+    """
+    changes__without_cursor__sends_snapshot_and_cursor
+    changes__replayed_over_snapshot__reproduce_board_exactly
+    changes__list_moved_between_boards__replayed_with_its_cards
+    changes__since_compacted_cursor__sends_snapshot
+    changes__rejects_invalid_cursor
+    """
+
+    def test_changes__without_cursor__sends_snapshot_and_cursor(self, board):
+        data = sync(board)
+
+        assert data["snapshot"]["id"] == board.id
+        assert sync(board, since=data["cursor"])["changes"] == []
+
+    def test_changes__replayed_over_snapshot__reproduce_board_exactly(self, board):
+        start = sync(board)
+        state = state_from_snapshot(start["snapshot"])
+
+        list_a, list_b = board.kanbanlist_set.order_by("ordinal")
+        list_c = KL.objects.create(title="c", kanban_board=board)
+        cards = list(list_a.kanbancard_set.order_by("ordinal"))
+
+        # Exhaust the gap in front of the second card, forcing shifts.
+        for _ in range(ORDINAL_GAP.bit_length() + 1):
+            cards.insert(1, cards.pop())
+            cards[1].change_ordinal(1)
+
+        KL.objects.reorder(board, [list_c.id, list_a.id])
+        KC.objects.normalize(list_a)
+        KC.objects.delete_and_compact(cards[0])
+
+        moved = KC.objects.get(pk=cards[1].pk)
+        moved.kanban_list = list_b
+        moved.save()
+
+        edited = KC.objects.get(pk=cards[2].pk)
+        edited.content = "edited"
+        edited.save()
+
+        list_b.change_ordinal(0)
+        list_c.delete()
+        board.title = "Renamed"
+        board.save()
+
+        delta = sync(board, since=start["cursor"])
+        for change in delta["changes"]:
+            apply(state, change)
+
+        end = sync(board)
+        assert delta["cursor"] == end["cursor"]
+        assert state == state_from_snapshot(end["snapshot"])
+
+    def test_changes__list_moved_between_boards__replayed_with_its_cards(self, board):
+        other = KB.objects.create(title="Other")
+        moved = KL.objects.create(title="c", kanban_board=other)
+        KC.objects.create(content="c", kanban_list=moved)
+        starts = {b: sync(b) for b in [board, other]}
+
+        moved = KL.objects.get(pk=moved.pk)
+        moved.kanban_board = board
+        moved.save()
+
+        for b, start in starts.items():
+            state = state_from_snapshot(start["snapshot"])
+            for change in sync(b, since=start["cursor"])["changes"]:
+                apply(state, change)
+            assert state == state_from_snapshot(sync(b)["snapshot"])
+
+    def test_changes__since_compacted_cursor__sends_snapshot(self, board):
+        cursor = sync(board)["cursor"]
+        for klist in board.kanbanlist_set.all():
+            klist.change_ordinal(5)
+
+        call_command("compact_changes", keep=1)
+
+        data = sync(board, since=cursor)
+        assert "snapshot" in data
+        assert sync(board, since=data["cursor"])["changes"] == []
+
+    def test_changes__rejects_invalid_cursor(self, board):
+        response = APIClient().get(f"/boards/{board.id}/changes/", {"since": "x"})
+
+        assert response.status_code == 400
@@ -0,0 +1,241 @@
+from django.db import IntegrityError, transaction
+
+import pytest
+from ..concurrency import is_ordinal_collision, retrying
+from ..models import (
+    KanbanBoard as KB,
+    KanbanList as KL,
+    KanbanCard as KC,
+    KanbanChange,
+    OrderedModel,
+)
+
+
+@pytest.fixture
+def board():
+    board = KB.objects.create(title="My Board")
+    for title in "abc":
+        KL.objects.create(title=title, kanban_board=board)
+    board.refresh_from_db()
+    return board
+
+
+def version(board):
+    board.refresh_from_db(fields=["version"])
+    return board.version
+
+
+def collision():
+    return IntegrityError(
+        "UNIQUE constraint failed: kanban_kanbanlist.kanban_board_id, "
+        "kanban_kanbanlist.ordinal"
+    )
+
+
+@pytest.mark.django_db()
+class TestExpectedVersion:
+    """
+    reorder__at_the_expected_version__applies_and_reports_the_new_version
+    reorder__at_another_version__conflicts_with_the_changes_since
+    reorder__at_another_version_without_a_cursor__conflicts_with_a_snapshot
+    reorder__of_cards__expects_the_version_of_their_board
+    reorder__without_a_version__applies
+    import__at_another_version__conflicts_and_imports_nothing
+    import__at_the_expected_version__applies
+    """
+
+    def ids(self, board):
+        return list(
+            board.kanbanlist_set.order_by("ordinal").values_list("id", flat=True)
+        )
+
+    def test_reorder__at_the_expected_version__applies_and_reports_the_new_version(
+        self, client, board
+    ):
+        a, b, c = self.ids(board)
+
+        response = client.post(
+            f"/boards/{board.id}/reorder/",
+            {"ids": [c, a, b], "version": board.version},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        assert self.ids(board) == [c, a, b]
+        assert (
+            response["Board-Version"] == str(board.version + 1) == str(version(board))
+        )
+
+    def test_reorder__at_another_version__conflicts_with_the_changes_since(
+        self, client, board
+    ):
+        a, b, c = self.ids(board)
+        seen, cursor = board.version, KanbanChange.objects.cursor(board)
+        # Someone else renames a list meanwhile.
+        renamed = KL.objects.get(pk=a)
+        renamed.title = "renamed"
+        renamed.save()
+
+        response = client.post(
+            f"/boards/{board.id}/reorder/",
+            {"ids": [c, a, b], "version": seen, "since": cursor},
+            format="json",
+        )
+
+        assert response.status_code == 409
+        assert response.data["version"] == version(board) == seen + 1
+        assert [
+            (change["kind"], change["object_id"]) for change in response.data["changes"]
+        ] == [("update", a)]
+        assert response.data["cursor"] == KanbanChange.objects.cursor(board)
+        # Nothing was applied.
+        assert self.ids(board) == [a, b, c]
+
+    def test_reorder__at_another_version_without_a_cursor__conflicts_with_a_snapshot(
+        self, client, board
+    ):
+        a, b, c = self.ids(board)
+
+        response = client.post(
+            f"/boards/{board.id}/reorder/",
+            {"ids": [c, a, b], "version": board.version - 1},
+            format="json",
+        )
+
+        assert response.status_code == 409
+        assert [row["id"] for row in response.data["snapshot"]["lists"]] == [a, b, c]
+
+    def test_reorder__of_cards__expects_the_version_of_their_board(self, client, board):
+        kanban_list = board.kanbanlist_set.first()
+        x, y = [KC.objects.create(content=c, kanban_list=kanban_list) for c in "xy"]
+        seen = version(board)
+
+        stale = client.post(
+            f"/lists/{kanban_list.id}/reorder/",
+            {"ids": [y.id, x.id], "version": seen - 1},
+            format="json",
+        )
+        current = client.post(
+            f"/lists/{kanban_list.id}/reorder/",
+            {"ids": [y.id, x.id], "version": seen},
+            format="json",
+        )
+
+        assert stale.status_code == 409
+        assert current.status_code == 200
+        assert current["Board-Version"] == str(seen + 1)
+
+    def test_reorder__without_a_version__applies(self, client, board):
+        a, b, c = self.ids(board)
+
+        response = client.post(
+            f"/boards/{board.id}/reorder/", {"ids": [b, a]}, format="json"
+        )
+
+        assert response.status_code == 200
+        assert self.ids(board) == [b, a, c]
+
+    def import_(self, client, board, **query):
+        query = "&".join(f"{name}={value}" for name, value in query.items())
+        return client.generic(
+            "POST",
+            f"/boards/{board.id}/import/?{query}",
+            '{"list": "a", "content": "imported"}\n',
+            content_type="application/jsonl",
+        )
+
+    def test_import__at_another_version__conflicts_and_imports_nothing(
+        self, client, board
+    ):
+        response = self.import_(client, board, version=board.version + 1)
+
+        assert response.status_code == 409
+        assert response.data["version"] == board.version
+        assert KC.objects.count() == 0
+        assert version(board) == response.data["version"]
+
+    def test_import__at_the_expected_version__applies(self, client, board):
+        response = self.import_(client, board, version=board.version)
+
+        assert response.status_code == 201
+        assert KC.objects.count() == 1
+        assert response["Board-Version"] == str(version(board))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestRetrying:
+    """
+    retrying__retries_ordinal_collisions
+    retrying__is_bounded
+    retrying__does_not_retry_other_integrity_errors
+    retrying__inside_a_transaction__calls_once
+    save__retried_after_a_collision__counts_and_records_once
+    """
+
+    def failing(self, errors):
+        calls = []
+
+        def func():
+            calls.append(len(calls))
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            return "done"
+
+        return func, calls
+
+    def test_retrying__retries_ordinal_collisions(self):
+        func, calls = self.failing([collision(), collision()])
+
+        assert retrying(func, attempts=3) == "done"
+        assert len(calls) == 3
+
+    def test_retrying__is_bounded(self):
+        func, calls = self.failing([collision()] * 5)
+
+        with pytest.raises(IntegrityError):
+            retrying(func, attempts=3)
+        assert len(calls) == 3
+
+    def test_retrying__does_not_retry_other_integrity_errors(self):
+        error = IntegrityError("CHECK constraint failed: title")
+        func, calls = self.failing([error])
+
+        assert not is_ordinal_collision(error)
+        with pytest.raises(IntegrityError):
+            retrying(func, attempts=3)
+        assert len(calls) == 1
+
+    def test_retrying__inside_a_transaction__calls_once(self):
+        func, calls = self.failing([collision()])
+
+        with pytest.raises(IntegrityError), transaction.atomic():
+            retrying(func, attempts=3)
+        assert len(calls) == 1
+
+    def test_save__retried_after_a_collision__counts_and_records_once(
+        self, monkeypatch
+    ):
+        board = KB.objects.create(title="My Board")
+        save = OrderedModel._save
+        attempts = []
+
+        # The first attempt writes the row, then collides, as a deferred
+        # constraint would at commit.
+        def colliding_save(self, *args, **kwargs):
+            save(self, *args, **kwargs)
+            attempts.append(self.pk)
+            if len(attempts) == 1:
+                raise collision()
+
+        monkeypatch.setattr(OrderedModel, "_save", colliding_save)
+        kanban_list = KL(title="a", kanban_board=board)
+        kanban_list.save()
+
+        assert len(attempts) == 2
+        assert list(KL.objects.values_list("pk", flat=True)) == [kanban_list.pk]
+        board.refresh_from_db()
+        assert board.list_count == 1
+        assert board.version == 1
+        assert list(board.kanbanchange_set.values_list("kind", "object_id")) == [
+            ("create", kanban_list.pk)
+        ]
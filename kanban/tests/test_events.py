@@ -0,0 +1,197 @@
+import asyncio
+import json
+import threading
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+
+import pytest
+from ..asgi import BoardEventStream
+from ..events import BoardEventHub, hub, publish_board_events
+from ..models import KanbanBoard as KB, KanbanList as KL
+
+
+def run(coroutine_function):
+    return async_to_sync(coroutine_function)()
+
+
+def http_scope(path, method="GET"):
+    return {"type": "http", "method": method, "path": path, "headers": []}
+
+
+def parse_event(message):
+    fields = dict(
+        line.split(": ", 1) for line in message["body"].decode().strip().splitlines()
+    )
+    return fields["event"], json.loads(fields["data"])
+
+
+@pytest.fixture
+def board():
+    return KB.objects.create(title="My Board")
+
+
+class TestBoardEventHub:
+    """
+    publish__fans_out_to_every_subscriber_of_the_board
+    publish__from_another_thread__is_delivered
+    publish__to_slow_consumer__keeps_newest_events
+    close__unsubscribes
+    """
+
+    def test_publish__fans_out_to_every_subscriber_of_the_board(self):
+        events = BoardEventHub(queue_size=4)
+
+        async def scenario():
+            subscriptions = [events.subscribe(1) for _ in range(3)]
+            other = events.subscribe(2)
+
+            events.publish(1, {"version": 1})
+            await asyncio.sleep(0)
+
+            assert [await s.get(timeout=1) for s in subscriptions] == [
+                {"version": 1}
+            ] * 3
+            assert await other.get(timeout=0.01) is None
+
+        run(scenario)
+
+    def test_publish__from_another_thread__is_delivered(self):
+        events = BoardEventHub(queue_size=4)
+
+        async def scenario():
+            subscription = events.subscribe(1)
+
+            publisher = threading.Thread(
+                target=events.publish, args=(1, {"version": 1})
+            )
+            publisher.start()
+            publisher.join()
+
+            assert await subscription.get(timeout=1) == {"version": 1}
+
+        run(scenario)
+
+    def test_publish__to_slow_consumer__keeps_newest_events(self):
+        events = BoardEventHub(queue_size=2)
+
+        async def scenario():
+            slow = events.subscribe(1)
+            for version in range(1, 6):
+                events.publish(1, {"version": version})
+            await asyncio.sleep(0)
+
+            assert slow.dropped == 3
+            assert await slow.get(timeout=1) == {"version": 4}
+            assert await slow.get(timeout=1) == {"version": 5}
+
+        run(scenario)
+
+    def test_close__unsubscribes(self):
+        events = BoardEventHub(queue_size=2)
+
+        async def scenario():
+            with events.subscribe(1):
+                assert events.subscriber_count(1) == 1
+            assert events.subscriber_count(1) == 0
+            assert events.watched([1]) == []
+
+        run(scenario)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBoardEventStream:
+    """
+    stream__sends_current_event_then_one_per_change
+    stream__sends_heartbeat_when_idle
+    stream__missing_board__not_found
+    stream__other_paths__pass_through
+    publish__unwatched_board__costs_no_queries
+    """
+
+    def test_stream__sends_current_event_then_one_per_change(self, board):
+        app = BoardEventStream(None, heartbeat=5)
+
+        async def scenario():
+            stream = ApplicationCommunicator(
+                app, http_scope(f"/boards/{board.id}/events/")
+            )
+            await stream.send_input({"type": "http.request"})
+
+            start = await stream.receive_output(1)
+            assert start["status"] == 200
+            assert (b"content-type", b"text/event-stream") in start["headers"]
+
+            kind, current = parse_event(await stream.receive_output(1))
+            assert kind == "board"
+            assert current == {"id": board.id, "version": 0, "cursor": 0}
+
+            await sync_to_async(KL.objects.create)(title="List", kanban_board=board)
+
+            kind, changed = parse_event(await stream.receive_output(1))
+            assert changed["version"] == 1
+            assert changed["cursor"] > current["cursor"]
+
+            await stream.send_input({"type": "http.disconnect"})
+            await stream.wait(1)
+            assert hub.subscriber_count(board.id) == 0
+
+        run(scenario)
+
+    def test_stream__sends_heartbeat_when_idle(self, board):
+        app = BoardEventStream(None, heartbeat=0.01)
+
+        async def scenario():
+            stream = ApplicationCommunicator(
+                app, http_scope(f"/boards/{board.id}/events/")
+            )
+            await stream.send_input({"type": "http.request"})
+            await stream.receive_output(1)
+            await stream.receive_output(1)
+
+            assert (await stream.receive_output(1))["body"] == b": heartbeat\n\n"
+
+            await stream.send_input({"type": "http.disconnect"})
+            await stream.wait(1)
+
+        run(scenario)
+
+    def test_stream__missing_board__not_found(self, board):
+        app = BoardEventStream(None)
+
+        async def scenario():
+            stream = ApplicationCommunicator(
+                app, http_scope(f"/boards/{board.id + 1}/events/")
+            )
+            await stream.send_input({"type": "http.request"})
+
+            assert (await stream.receive_output(1))["status"] == 404
+
+        run(scenario)
+        assert hub.subscriber_count(board.id + 1) == 0
+
+    def test_stream__other_paths__pass_through(self):
+        scopes = []
+
+        async def inner(scope, receive, send):
+            scopes.append(scope)
+
+        async def scenario():
+            app = BoardEventStream(inner)
+            await app(http_scope("/boards/1/"), None, None)
+            await app(http_scope("/boards/1/events/", method="POST"), None, send)
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        run(scenario)
+        assert [scope["path"] for scope in scopes] == ["/boards/1/"]
+        assert sent[0]["status"] == 405
+
+    def test_publish__unwatched_board__costs_no_queries(
+        self, board, django_assert_num_queries
+    ):
+        with django_assert_num_queries(0):
+            publish_board_events(sender=KB, board_ids=(board.id,))
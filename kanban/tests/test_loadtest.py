@@ -0,0 +1,120 @@
+import asyncio
+import random
+
+import pytest
+from ..benchmarks import load
+from ..benchmarks.scenarios import dragged, seed_board
+from ..models import KanbanCard as KC
+
+
+class TestLoadReport:
+    """
+    percentile__nearest_rank
+    recorder__summarizes_by_kind_and_in_total
+    dragged__moves_one_end_of_a_window_to_the_other
+    """
+
+    def test_percentile__nearest_rank(self):
+        ordered = list(range(1, 101))
+
+        assert load.percentile(ordered, 0.50) == 50
+        assert load.percentile(ordered, 0.99) == 99
+        assert load.percentile([7], 0.95) == 7
+        assert load.percentile([], 0.5) is None
+
+    def test_recorder__summarizes_by_kind_and_in_total(self):
+        recorder = load.Recorder()
+        for seconds in [0.1, 0.2, 0.3]:
+            recorder.record("snapshot", seconds, 200)
+        recorder.record("snapshot", 0.1, 304)
+        recorder.record("move_card", 0.5, 500)
+        recorder.record("move_card", 0.5, None)
+        recorder.record("move_card_versioned", 0.2, 409)
+
+        summary = recorder.summary(seconds=2)
+
+        snapshot = summary["kinds"]["snapshot"]
+        assert snapshot["requests"] == 4
+        assert snapshot["errors"] == 0
+        assert snapshot["p50"] == 0.1
+        assert snapshot["statuses"] == {"200": 3, "304": 1}
+        assert summary["kinds"]["move_card"]["error_rate"] == 1.0
+        # A conflict is counted apart from the errors.
+        assert summary["kinds"]["move_card_versioned"]["errors"] == 0
+        assert summary["kinds"]["move_card_versioned"]["conflicts"] == 1
+        assert summary["total"]["requests"] == 7
+        assert summary["total"]["rps"] == 3.5
+        assert summary["total"]["errors"] == 2
+        assert summary["total"]["conflicts"] == 1
+        assert summary["total"]["p99"] == 0.5
+        assert summary["total"]["statuses"] == {
+            "200": 3,
+            "304": 1,
+            "409": 1,
+            "500": 1,
+            "None": 1,
+        }
+
+    def test_dragged__moves_one_end_of_a_window_to_the_other(self):
+        ids = list(range(10))
+        for seed in range(20):
+            moved = dragged(random.Random(seed), ids)
+
+            start = ids.index(min(moved))
+            window = ids[start : start + len(moved)]
+            assert sorted(moved) == window
+            assert moved in (window[1:] + window[:1], window[-1:] + window[:-1])
+
+
+# The virtual users repeat their requests, by design.
+@pytest.mark.nplusone(threshold=None)
+# The applications run on other threads, which must see the seeded board.
+@pytest.mark.django_db(transaction=True)
+class TestLoadTest:
+    """
+    run_load__every_app_and_transport
+    run_load__writes
+    run_load__import_mix
+    run_load__contended_mix
+    """
+
+    # One virtual user: concurrent transactions would lock each other out
+    # of the in-memory test database, which the loadtest command does not
+    # use (see there).
+    def run(self, app, transport, mix):
+        board = seed_board(lists=3, cards=4)
+        headers = load.authenticate()
+        return asyncio.run(
+            load.run_load(app, transport, mix, board, headers, 1, 0.3, import_rows=5)
+        )
+
+    @pytest.mark.parametrize("transport", load.TRANSPORTS)
+    @pytest.mark.parametrize("app", load.APPS)
+    def test_run_load__every_app_and_transport(self, app, transport):
+        summary = self.run(app, transport, "polling")
+
+        assert summary["total"]["requests"] > 0
+        assert summary["total"]["errors"] == 0
+        assert set(summary["kinds"]) == {"snapshot", "changes"}
+
+    @pytest.mark.parametrize("app", load.APPS)
+    def test_run_load__writes(self, app):
+        summary = self.run(app, "inprocess", "drag-and-drop")
+
+        assert set(summary["kinds"]) == {"move_card", "move_list"}
+        assert summary["total"]["errors"] == 0
+
+    def test_run_load__import_mix(self):
+        summary = self.run("wsgi", "inprocess", "import")
+
+        imports = summary["kinds"]["import"]
+        assert imports["statuses"] == {"201": imports["requests"]}
+        assert KC.objects.count() == 3 * 4 + 5 * imports["requests"]
+
+    def test_run_load__contended_mix(self):
+        summary = self.run("wsgi", "inprocess", "contended")
+
+        drags = summary["kinds"]["move_card_versioned"]
+        # A lone user always edits the version it last saw.
+        assert drags["statuses"] == {"200": drags["requests"]}
+        assert drags["conflicts"] == 0
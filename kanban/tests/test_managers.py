@@ -0,0 +1,135 @@
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from .. import ordinals
+from ..models import KanbanBoard as KB, KanbanList as KL, KanbanCard as KC
+from ..ordinals import ORDINAL_GAP
+from .conftest import ordered
+
+
+# Rewrites that could collide take two statements, parking the rows
+# first, unless the unique constraints are deferred (PostgreSQL).
+PHASES = 1 if KC.objects.deferred_uniqueness() else 2
+
+
+def card_updates(queries):
+    return [q for q in queries if q["sql"].startswith('UPDATE "kanban_kanbancard"')]
+
+
+@pytest.fixture
+def klist():
+    kboard = KB.objects.create(title="My Board")
+    return KL.objects.create(title="My List", kanban_board=kboard)
+
+
+@pytest.fixture
+def dense_cards(klist):
+    """2,000 cards with no gaps left between their ordinals."""
+    KC.objects.bulk_create(
+        KC(kanban_list=klist, ordinal=i, content=str(i)) for i in range(1, 2001)
+    )
+    return klist.kanbancard_set.order_by("ordinal")
+
+
+@pytest.mark.django_db()
+class TestOrdinalManager:
+    """
+    shift__moves_a_range_without_collisions
+    move__to_top_of_dense_list__is_set_based
+    delete_and_compact__closes_the_hole
+    normalize__respreads_in_two_statements
+    unique_constraint__rejects_colliding_ordinals
+    move__locks_the_board
+    move__to_the_end_past_the_ordinal_limit__respreads_the_scope
+    create__past_the_ordinal_limit__respreads_the_scope
+    """
+
+    def test_shift__moves_a_range_without_collisions(self, klist, dense_cards):
+        # Every shifted ordinal lands on one that is still occupied.
+        KC.objects.shift(klist, start=2, by=1)
+
+        ordinals = list(dense_cards.values_list("ordinal", flat=True))
+        assert ordinals[:3] == [1, 3, 4]
+        assert ordinals[-1] == 2001
+
+    def test_move__to_top_of_dense_list__is_set_based(self, klist, dense_cards):
+        last = dense_cards.last()
+        first = dense_cards.first()
+
+        with CaptureQueriesContext(connection) as queries:
+            last.change_ordinal(0)
+
+        # PHASES statements open a gap, one places the card.
+        assert len(card_updates(queries)) == PHASES + 1
+        assert len([q for q in queries if "SAVEPOINT" not in q["sql"]]) < 10
+        assert ordered(klist.kanbancard_set)[:2] == [last, first]
+
+    def test_delete_and_compact__closes_the_hole(self, klist):
+        a, b, c, d = [KC.objects.create(content=x, kanban_list=klist) for x in "abcd"]
+
+        KC.objects.delete_and_compact(b)
+
+        assert ordered(klist.kanbancard_set) == [a, c, d]
+        assert [c.ordinal for c in ordered(klist.kanbancard_set)] == [
+            ORDINAL_GAP,
+            2 * ORDINAL_GAP,
+            3 * ORDINAL_GAP,
+        ]
+
+    def test_normalize__respreads_in_two_statements(self, klist, dense_cards):
+        expected = list(dense_cards.values_list("pk", flat=True))
+
+        with CaptureQueriesContext(connection) as queries:
+            KC.objects.normalize(klist)
+
+        assert len(card_updates(queries)) == PHASES
+        assert list(dense_cards.values_list("pk", flat=True)) == expected
+        assert list(dense_cards.values_list("ordinal", flat=True)) == [
+            i * ORDINAL_GAP for i in range(1, 2001)
+        ]
+
+    def test_unique_constraint__rejects_colliding_ordinals(self, klist, dense_cards):
+        with pytest.raises(IntegrityError), transaction.atomic():
+            with connection.cursor() as cursor:
+                # Check deferred constraints per statement, as SQLite does.
+                if KC.objects.deferred_uniqueness():
+                    cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            dense_cards.filter(ordinal=2).update(ordinal=1)
+
+    @pytest.mark.skipif(
+        not connection.features.has_select_for_update,
+        reason="SQLite serializes write transactions without row locks.",
+    )
+    def test_move__locks_the_board(self, klist, dense_cards):
+        with CaptureQueriesContext(connection) as queries:
+            dense_cards.last().change_ordinal(0)
+
+        locks = [q["sql"] for q in queries if q["sql"].endswith("FOR UPDATE")]
+        assert len(locks) == 1
+        assert '"kanban_kanbanboard"' in locks[0]
+
+    def test_move__to_the_end_past_the_ordinal_limit__respreads_the_scope(
+        self, klist, monkeypatch
+    ):
+        monkeypatch.setattr(ordinals, "ORDINAL_LIMIT", 4 * ORDINAL_GAP)
+        a, b, c = [KC.objects.create(content=c, kanban_list=klist) for c in "abc"]
+
+        a.change_ordinal(3)
+        b.change_ordinal(3)
+
+        assert ordered(klist.kanbancard_set) == [c, a, b]
+        assert [card.ordinal for card in ordered(klist.kanbancard_set)] == [
+            ORDINAL_GAP * i for i in (2, 3, 4)
+        ]
+
+    def test_create__past_the_ordinal_limit__respreads_the_scope(self, klist):
+        cards = [KC.objects.create(content=c, kanban_list=klist) for c in "ab"]
+        KC.objects.filter(pk=cards[1].pk).update(ordinal=ordinals.ORDINAL_LIMIT)
+
+        cards.append(KC.objects.create(content="c", kanban_list=klist))
+
+        assert ordered(klist.kanbancard_set) == cards
+        assert [card.ordinal for card in ordered(klist.kanbancard_set)] == [
+            ORDINAL_GAP * i for i in (1, 2, 3)
+        ]
@@ -0,0 +1,184 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+import pytest
+from .. import search
+from ..models import KanbanBoard as KB, KanbanList as KL, KanbanCard as KC
+
+
+def hits(url, **params):
+    """GET a page of search hits, and return its body."""
+    response = APIClient().get(url, params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def ids(page):
+    return [hit["id"] for hit in page["results"]]
+
+
+@pytest.fixture
+def board():
+    board = KB.objects.create(title="Dental Office")
+    todo = KL.objects.create(title="To do", kanban_board=board)
+    done = KL.objects.create(title="Done", kanban_board=board)
+    for content, kanban_list in [
+        ("Order crowns for the lab", todo),
+        ("Call the lab about crowns, crowns and more crowns", todo),
+        ("Café order", todo),
+        ("Sterilize the instruments", done),
+    ]:
+        KC.objects.create(content=content, kanban_list=kanban_list)
+    return board
+
+
+@pytest.mark.django_db()
+class TestSearch:
+    """
+    search_cards__ranks_the_best_hits_first
+    search_cards__matches_every_word
+    search_cards__last_word_is_a_prefix
+    search_cards__ignores_diacritics
+    search_cards__is_scoped_to_the_board
+    search_cards__query_syntax_is_searched_for
+    search_cards__follows_updates_and_deletes
+    search_cards__pages_by_number_in_one_query_each
+    search_cards__requires_a_word
+    search_cards__unknown_board_not_found
+    search_boards__by_title
+    rebuild_search_index__indexes_rows_written_without_the_triggers
+    """
+
+    def test_search_cards__ranks_the_best_hits_first(self, board):
+        page = hits(f"/boards/{board.id}/search/", q="crowns")
+
+        assert [hit["content"] for hit in page["results"]] == [
+            "Call the lab about crowns, crowns and more crowns",
+            "Order crowns for the lab",
+        ]
+        first, second = page["results"]
+        assert first["score"] > second["score"]
+        assert first["list"] == board.kanbanlist_set.get(title="To do").id
+
+    def test_search_cards__matches_every_word(self, board):
+        page = hits(f"/boards/{board.id}/search/", q="order lab")
+
+        assert [hit["content"] for hit in page["results"]] == [
+            "Order crowns for the lab"
+        ]
+
+    def test_search_cards__last_word_is_a_prefix(self, board):
+        page = hits(f"/boards/{board.id}/search/", q="steril")
+
+        assert [hit["content"] for hit in page["results"]] == [
+            "Sterilize the instruments"
+        ]
+
+    def test_search_cards__ignores_diacritics(self, board):
+        page = hits(f"/boards/{board.id}/search/", q="cafe")
+
+        assert [hit["content"] for hit in page["results"]] == ["Café order"]
+
+    def test_search_cards__is_scoped_to_the_board(self, board):
+        other = KB.objects.create(title="Other")
+        KC.objects.create(
+            content="Crowns elsewhere",
+            kanban_list=KL.objects.create(title="Elsewhere", kanban_board=other),
+        )
+
+        page = hits(f"/boards/{other.id}/search/", q="crowns")
+
+        assert [hit["content"] for hit in page["results"]] == ["Crowns elsewhere"]
+
+    @pytest.mark.parametrize(
+        "q, count",
+        [('crowns"', 2), ("crowns AND", 1), ("content:crowns", 0), ("NEAR(", 0)],
+    )
+    def test_search_cards__query_syntax_is_searched_for(self, board, q, count):
+        page = hits(f"/boards/{board.id}/search/", q=q)
+
+        assert len(page["results"]) == count
+
+    def test_search_cards__follows_updates_and_deletes(self, board):
+        order, call = KC.objects.filter(content__contains="crowns").order_by("id")
+
+        call.content = "Call the lab about veneers"
+        call.save()
+        order.delete()
+        # Moves rewrite ordinals, not content; the index is left alone.
+        KC.objects.move(KC.objects.get(content="Café order"), 0)
+
+        assert hits(f"/boards/{board.id}/search/", q="crowns")["results"] == []
+        assert ids(hits(f"/boards/{board.id}/search/", q="veneers")) == [call.id]
+        assert len(hits(f"/boards/{board.id}/search/", q="cafe")["results"]) == 1
+
+    def test_search_cards__pages_by_number_in_one_query_each(self, board):
+        kanban_list = board.kanbanlist_set.first()
+        KC.objects.bulk_create(
+            KC(content=f"Implant {i}", kanban_list=kanban_list, ordinal=10**9 + i)
+            for i in range(7)
+        )
+
+        seen = []
+        page = hits(f"/boards/{board.id}/search/", q="implant", page_size=3)
+        assert page["previous"] is None
+        while True:
+            seen += ids(page)
+            if page["next"] is None:
+                break
+            with CaptureQueriesContext(connection) as queries:
+                page = hits(page["next"])
+            # The board, and one page of hits.
+            assert len(queries) == 2
+
+        assert sorted(seen) == sorted(
+            KC.objects.filter(content__startswith="Implant").values_list(
+                "id", flat=True
+            )
+        )
+        assert ids(hits(page["previous"])) == seen[3:6]
+
+    @pytest.mark.parametrize("q", ["", "  ", "!?"])
+    def test_search_cards__requires_a_word(self, board, q):
+        response = APIClient().get(f"/boards/{board.id}/search/", {"q": q})
+
+        assert response.status_code == 400
+        assert "q" in response.json()
+
+    def test_search_cards__unknown_board_not_found(self, board):
+        response = APIClient().get(f"/boards/{board.id + 1}/search/", {"q": "lab"})
+
+        assert response.status_code == 404
+
+    def test_search_boards__by_title(self, board):
+        KB.objects.create(title="Front desk")
+        renamed = KB.objects.create(title="Back office")
+        renamed.title = "Back room"
+        renamed.save()
+
+        page = hits("/boards/search/", q="office")
+
+        assert ids(page) == [board.id]
+        assert ids(hits("/boards/search/", q="room")) == [renamed.id]
+
+    def test_rebuild_search_index__indexes_rows_written_without_the_triggers(
+        self, board
+    ):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TRIGGER {search.CARD_INDEX}_insert")
+            KC.objects.create(
+                content="Unindexed crowns", kanban_list=board.kanbanlist_set.first()
+            )
+            assert len(hits(f"/boards/{board.id}/search/", q="crowns")["results"]) == 2
+
+            out = StringIO()
+            call_command("rebuild_search_index", stdout=out)
+
+        assert len(hits(f"/boards/{board.id}/search/", q="crowns")["results"]) == 3
+        assert out.getvalue().strip() == (
+            "Rebuilt the search index of 5 card(s) and 1 board(s)."
+        )
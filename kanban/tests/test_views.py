@@ -0,0 +1,400 @@
+import asyncio
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import AsyncClient
+from rest_framework.test import APIClient
+
+import pytest
+from ..models import KanbanBoard as KB, KanbanList as KL, KanbanCard as KC
+from ..serializers import (
+    KanbanBoardSerializer,
+    KanbanBoardSnapshotSerializer,
+    KanbanCardListingSerializer,
+    snapshot_rows,
+)
+from ..threads import pool, run_sync
+from .conftest import ordered
+
+
+@pytest.fixture
+def board():
+    return KB.objects.create(title="My Board")
+
+
+@pytest.mark.django_db()
+class TestReorder:
+    """
+    reorder__full_ordering_of_board_lists
+    reorder__partial_ordering_keeps_unlisted_cards_in_place
+    reorder__is_one_bulk_update
+    reorder__rejects_duplicate_ids
+    reorder__rejects_ids_from_another_scope
+    """
+
+    def test_reorder__full_ordering_of_board_lists(self, client, board):
+        a, b, c = [KL.objects.create(title=t, kanban_board=board) for t in "abc"]
+
+        response = client.post(
+            f"/boards/{board.id}/reorder/", {"ids": [c.id, a.id, b.id]}, format="json"
+        )
+
+        assert response.status_code == 200
+        assert [row["id"] for row in response.data] == [c.id, a.id, b.id]
+        assert ordered(board.kanbanlist_set) == [c, a, b]
+        assert [row["ordinal"] for row in response.data] == [
+            l.ordinal for l in ordered(board.kanbanlist_set)
+        ]
+
+    def test_reorder__partial_ordering_keeps_unlisted_cards_in_place(
+        self, client, board
+    ):
+        klist = KL.objects.create(title="My List", kanban_board=board)
+        a, b, c, d = [KC.objects.create(content=x, kanban_list=klist) for x in "abcd"]
+
+        response = client.post(
+            f"/lists/{klist.id}/reorder/", {"ids": [d.id, b.id]}, format="json"
+        )
+
+        assert response.status_code == 200
+        assert ordered(klist.kanbancard_set) == [a, d, c, b]
+
+    def test_reorder__is_one_bulk_update(self, board):
+        lists = [KL.objects.create(title=str(i), kanban_board=board) for i in range(50)]
+
+        with CaptureQueriesContext(connection) as queries:
+            KL.objects.reorder(board, [l.id for l in reversed(lists)])
+
+        # One statement parks the moved rows (unless the unique constraints
+        # are deferred), one writes their new ordinals.
+        updates = [
+            q for q in queries if q["sql"].startswith('UPDATE "kanban_kanbanlist"')
+        ]
+        assert len(updates) == (1 if KL.objects.deferred_uniqueness() else 2)
+        assert ordered(board.kanbanlist_set) == lists[::-1]
+
+    def test_reorder__rejects_duplicate_ids(self, client, board):
+        a = KL.objects.create(title="a", kanban_board=board)
+
+        response = client.post(
+            f"/boards/{board.id}/reorder/", {"ids": [a.id, a.id]}, format="json"
+        )
+
+        assert response.status_code == 400
+
+    def test_reorder__rejects_ids_from_another_scope(self, client, board):
+        a = KL.objects.create(title="a", kanban_board=board)
+        other = KL.objects.create(
+            title="b", kanban_board=KB.objects.create(title="Other Board")
+        )
+
+        response = client.post(
+            f"/boards/{board.id}/reorder/", {"ids": [other.id, a.id]}, format="json"
+        )
+
+        assert response.status_code == 400
+        assert KL.objects.get(pk=other.pk).ordinal == other.ordinal
+
+
+@pytest.mark.django_db()
+class TestBoardSnapshot:
+    """
+    retrieve__returns_ordered_lists_and_cards
+    retrieve__query_count_is_constant
+    """
+
+    def fill(self, board, lists, cards):
+        for i in range(lists):
+            klist = KL.objects.create(title=f"List {i}", kanban_board=board)
+            for j in range(cards):
+                KC.objects.create(content=f"Card {j}", kanban_list=klist)
+
+    def test_retrieve__returns_ordered_lists_and_cards(self, board):
+        a = KL.objects.create(title="a", kanban_board=board)
+        b = KL.objects.create(title="b", kanban_board=board)
+        card_1 = KC.objects.create(content="1", kanban_list=b)
+        card_2 = KC.objects.create(content="2", kanban_list=b)
+        b.change_ordinal(0)
+        card_2.change_ordinal(0)
+
+        response = APIClient().get(f"/boards/{board.id}/")
+
+        assert response.status_code == 200
+        assert response.json()["title"] == "My Board"
+        assert [l["id"] for l in response.json()["lists"]] == [b.id, a.id]
+        assert [c["id"] for c in response.json()["lists"][0]["cards"]] == [
+            card_2.id,
+            card_1.id,
+        ]
+        assert response.json()["lists"][1]["cards"] == []
+
+    @pytest.mark.parametrize("lists, cards", [(1, 1), (5, 20)])
+    def test_retrieve__query_count_is_constant(
+        self, board, lists, cards, django_assert_num_queries
+    ):
+        self.fill(board, lists, cards)
+
+        # One query for the board's version (for its ETag), then one
+        # query each for the board, its lists and their cards, in one
+        # transaction: here, a savepoint in the test's, and its release.
+        with django_assert_num_queries(6):
+            response = APIClient().get(f"/boards/{board.id}/")
+
+        assert len(response.json()["lists"]) == lists
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBoardConditionalGet:
+    """
+    retrieve__sends_etag_and_last_modified
+    retrieve__if_none_match__not_modified_without_serializing
+    retrieve__if_none_match__after_change__sends_new_board
+    retrieve__if_modified_since__not_modified
+    """
+
+    def test_retrieve__sends_etag_and_last_modified(self, board):
+        response = APIClient().get(f"/boards/{board.id}/")
+
+        assert response.status_code == 200
+        assert response["ETag"].startswith('"board-')
+        assert response["Last-Modified"]
+
+    def test_retrieve__if_none_match__not_modified_without_serializing(
+        self, board, django_assert_num_queries
+    ):
+        etag = APIClient().get(f"/boards/{board.id}/")["ETag"]
+
+        with django_assert_num_queries(0):
+            response = APIClient().get(f"/boards/{board.id}/", HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+    def test_retrieve__if_none_match__after_change__sends_new_board(self, board):
+        etag = APIClient().get(f"/boards/{board.id}/")["ETag"]
+
+        KL.objects.create(title="New List", kanban_board=board)
+        response = APIClient().get(f"/boards/{board.id}/", HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert len(response.json()["lists"]) == 1
+
+    def test_retrieve__if_modified_since__not_modified(self, board):
+        last_modified = APIClient().get(f"/boards/{board.id}/")["Last-Modified"]
+
+        response = APIClient().get(
+            f"/boards/{board.id}/", HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        assert response.status_code == 304
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReads:
+    """
+    retrieve__concurrent_clients__get_the_same_snapshot
+    retrieve__browsable_api__falls_back_to_viewset
+    retrieve__missing_board__not_found
+    changes__missing_board__not_found
+    run_sync__threads_are_bounded_by_pool
+    """
+
+    def test_retrieve__concurrent_clients__get_the_same_snapshot(self, board):
+        klist = KL.objects.create(title="My List", kanban_board=board)
+        KC.objects.create(content="My Card", kanban_list=klist)
+
+        async def read_concurrently():
+            client = AsyncClient()
+            return await asyncio.gather(
+                *[client.get(f"/boards/{board.id}/") for _ in range(20)]
+            )
+
+        responses = async_to_sync(read_concurrently)()
+
+        assert {response.status_code for response in responses} == {200}
+        assert len({response.content for response in responses}) == 1
+        assert responses[0].json()["lists"][0]["cards"][0]["content"] == "My Card"
+
+    def test_retrieve__browsable_api__falls_back_to_viewset(self, board):
+        json = APIClient().get(f"/boards/{board.id}/")
+        html = APIClient().get(f"/boards/{board.id}/", HTTP_ACCEPT="text/html")
+
+        assert html.status_code == 200
+        assert html["Content-Type"].startswith("text/html")
+        assert html["ETag"] != json["ETag"]
+
+    def test_retrieve__missing_board__not_found(self, board):
+        response = APIClient().get(f"/boards/{board.id + 1}/")
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "Not found."}
+
+    def test_changes__missing_board__not_found(self, board):
+        response = APIClient().get(f"/boards/{board.id + 1}/changes/", {"since": 0})
+
+        assert response.status_code == 404
+
+    def test_run_sync__threads_are_bounded_by_pool(self):
+        threads = set()
+
+        def work():
+            threads.add(threading.current_thread().name)
+            time.sleep(0.01)
+
+        async def run_concurrently():
+            await asyncio.gather(*[run_sync(work)() for _ in range(50)])
+
+        async_to_sync(run_concurrently)()
+
+        assert 1 < len(threads) <= pool._max_workers
+
+
+@pytest.mark.django_db()
+class TestListings:
+    """
+    boards__list_without_lists_and_cards
+    cards__in_list_then_card_order
+    cards__filtered_by_list
+    cards__page_is_one_query_at_any_depth
+    cards__moving_a_card_behind_the_cursor_does_not_shift_the_next_page
+    cards__invalid_list__bad_request
+    """
+
+    def fill(self, board, lists, cards):
+        klists = [
+            KL.objects.create(title=f"List {i}", kanban_board=board)
+            for i in range(lists)
+        ]
+        for klist in klists:
+            for j in range(cards):
+                KC.objects.create(content=f"Card {j}", kanban_list=klist)
+        return klists
+
+    def pages(self, url, **params):
+        page = APIClient().get(url, params).json()
+        yield page
+        while page["next"] is not None:
+            page = APIClient().get(page["next"]).json()
+            yield page
+
+    def test_boards__list_without_lists_and_cards(self, board):
+        other = KB.objects.create(title="Other Board")
+
+        response = APIClient().get("/boards/", {"page_size": 1})
+
+        assert response.status_code == 200
+        assert response.json()["results"] == [
+            {
+                "id": board.id,
+                "title": "My Board",
+                "version": board.version,
+                "updated_at": response.json()["results"][0]["updated_at"],
+                "list_count": 0,
+            }
+        ]
+        next_page = APIClient().get(response.json()["next"]).json()
+        assert [b["id"] for b in next_page["results"]] == [other.id]
+
+    def test_cards__in_list_then_card_order(self, board):
+        a, b = self.fill(board, 2, 3)
+        KC.objects.get(kanban_list=a, content="Card 2").change_ordinal(0)
+
+        cards = [
+            (card["list"], card["content"])
+            for page in self.pages("/cards/", page_size=2)
+            for card in page["results"]
+        ]
+
+        assert cards == [
+            (a.id, "Card 2"),
+            (a.id, "Card 0"),
+            (a.id, "Card 1"),
+            (b.id, "Card 0"),
+            (b.id, "Card 1"),
+            (b.id, "Card 2"),
+        ]
+
+    def test_cards__filtered_by_list(self, board):
+        a, b = self.fill(board, 2, 3)
+
+        response = APIClient().get("/cards/", {"list": b.id})
+
+        assert [card["list"] for card in response.json()["results"]] == [b.id] * 3
+
+    def test_cards__page_is_one_query_at_any_depth(
+        self, board, django_assert_num_queries
+    ):
+        self.fill(board, 4, 5)
+
+        page = APIClient().get("/cards/", {"page_size": 3}).json()
+        while page["next"] is not None:
+            with django_assert_num_queries(1):
+                page = APIClient().get(page["next"]).json()
+
+    def test_cards__moving_a_card_behind_the_cursor_does_not_shift_the_next_page(
+        self, board
+    ):
+        (klist,) = self.fill(board, 1, 6)
+        first = APIClient().get("/cards/", {"page_size": 3}).json()
+
+        # Move the first card to the end of the list: the next page still
+        # starts after the third card, not after what is now the third.
+        KC.objects.get(pk=first["results"][0]["id"]).change_ordinal(5)
+        second = APIClient().get(first["next"]).json()
+
+        assert [card["content"] for card in second["results"]] == [
+            "Card 3",
+            "Card 4",
+            "Card 5",
+        ]
+
+    def test_cards__invalid_list__bad_request(self):
+        response = APIClient().get("/cards/", {"list": "one"})
+
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db()
+class TestRowSerializers:
+    """
+    snapshot__same_output_as_model_serializer
+    boards__same_output_as_model_serializer
+    cards__same_output_as_model_serializer
+    """
+
+    def test_snapshot__same_output_as_model_serializer(self, board):
+        a = KL.objects.create(title="a", kanban_board=board)
+        b = KL.objects.create(title="b", kanban_board=board)
+        KL.objects.create(title="empty", kanban_board=board)
+        for klist in (a, b, a):
+            KC.objects.create(content=f"in {klist.title}", kanban_list=klist)
+        b.change_ordinal(0)
+
+        expected = KanbanBoardSnapshotSerializer(
+            KB.objects.with_lists_and_cards().get(pk=board.pk)
+        ).data
+
+        assert snapshot_rows.serialize(board) == expected
+
+    def test_boards__same_output_as_model_serializer(self, board):
+        response = APIClient().get("/boards/")
+
+        assert response.json()["results"] == [
+            KanbanBoardSerializer(KB.objects.get(pk=board.pk)).data
+        ]
+
+    def test_cards__same_output_as_model_serializer(self, board):
+        klist = KL.objects.create(title="a", kanban_board=board)
+        KC.objects.create(content="1", kanban_list=klist)
+        KC.objects.create(content="2", kanban_list=klist)
+
+        response = APIClient().get("/cards/")
+
+        assert (
+            response.json()["results"]
+            == KanbanCardListingSerializer(KC.objects.all(), many=True).data
+        )
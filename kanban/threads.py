@@ -0,0 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+# The threads that run the sync-only, database-free pieces of the async
+# views (e.g. cache backends with blocking clients). Bounding the pool
+# bounds how many threads a burst of slow clients can pin.
+pool = ThreadPoolExecutor(
+    max_workers=settings.KANBAN.get("sync_pool_workers"),
+    thread_name_prefix="kanban-sync",
+)
+
+
+def run_sync(func):
+    """
+    Wrap a sync-only callable so that it runs on the bounded pool.
+
+    Never use this for database access: Django ties connections to
+    threads, so ORM calls go through Django's own async API (or
+    thread-sensitive `sync_to_async`) instead.
+    """
+
+    return sync_to_async(func, thread_sensitive=False, executor=pool)
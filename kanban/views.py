@@ -1,3 +1,474 @@
-from django.shortcuts import render
+from asgiref.sync import sync_to_async
+from flexdentaldemoapi.conditional import (
+    ConditionalGetMixin,
+    prepare_validators,
+    set_validators,
+)
+from flexdentaldemoapi.pagination import RankedPagination
+from flexdentaldemoapi.renderers import FastJSONRenderer
+from flexdentaldemoapi.rows import RowListModelMixin
+from flexdentaldemoapi.transactions import atomic_write
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import UnsupportedMediaType, ValidationError
+from rest_framework.response import Response
 
-# Create your views here.
+from . import bulk, search
+from .batch import Batch, BatchError
+from .concurrency import VersionConflict, expect_version, retrying
+from .cache import snapshots
+from .models import KanbanBoard, KanbanList, KanbanCard, KanbanChange
+from .parsers import CSVParser, JSONLinesParser
+from .renderers import CSVRenderer, JSONLinesRenderer
+from .serializers import (
+    BatchSerializer,
+    ChangesQuerySerializer,
+    ExpectedVersionSerializer,
+    KanbanBoardRowSerializer,
+    KanbanBoardSerializer,
+    KanbanBoardSnapshotSerializer,
+    KanbanCardListingRowSerializer,
+    KanbanCardListingSerializer,
+    KanbanChangeSerializer,
+    ReorderSerializer,
+    SearchQuerySerializer,
+    snapshot_rows,
+)
+
+
+def catch_up(board, since):
+    """
+    Return what a client that synced up to the cursor `since` needs to
+    catch up with a board: the changes after it, or a snapshot of the
+    board if there is no cursor or if the changes after it have been
+    compacted away. Either way, with the cursor to sync from next time.
+    Call it in a transaction, so that what it reads agrees.
+    """
+
+    if since is None or since < board.compacted_through:
+        return {
+            "cursor": KanbanChange.objects.cursor(board),
+            "snapshot": snapshot_rows.serialize(board),
+        }
+
+    changes = list(board.kanbanchange_set.filter(id__gt=since))
+    return {
+        "cursor": changes[-1].id if changes else since,
+        "changes": KanbanChangeSerializer(changes, many=True).data,
+    }
+
+
+def conflict(error, since):
+    """
+    The response to a mutation refused with a VersionConflict: the
+    board's current version, and what the client needs to catch up.
+    """
+
+    with transaction.atomic():
+        board = KanbanBoard.objects.get(pk=error.board_id)
+        return Response(
+            {
+                "detail": f"The board has changed since version {error.version}.",
+                "version": board.version,
+                **catch_up(board, since),
+            },
+            status=409,
+        )
+
+
+def versioned(response, board_id):
+    """Tell the client which version of the board a mutation left it at."""
+
+    response["Board-Version"] = str(
+        KanbanBoard.objects.values_list("version", flat=True).get(pk=board_id)
+    )
+    return response
+
+
+class ReorderMixin:
+    """
+    Adds a `reorder` action that applies an ordering of ids to the
+    children of one object, in one transaction and one bulk update.
+
+    An ordering may carry the `version` of the board it was made
+    against; if the board has changed since, it is refused with 409
+    Conflict (see kanban.concurrency).
+    """
+
+    # The ordered model whose rows are the children of this viewset's objects.
+    child_model = None
+
+    @action(detail=True, methods=["post"])
+    def reorder(self, request, pk=None):
+        parent = self.get_object()
+        board_id = self.child_model.scope_board_id(parent)
+
+        serializer = ReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        def apply():
+            expect_version(board_id, data.get("version"))
+            ordinals = self.child_model.objects.reorder(parent, data["ids"])
+            return versioned(
+                Response(
+                    [{"id": id, "ordinal": ordinal} for id, ordinal in ordinals.items()]
+                ),
+                board_id,
+            )
+
+        try:
+            return retrying(apply)
+        except VersionConflict as error:
+            return conflict(error, data.get("since"))
+        except ValueError as error:
+            raise ValidationError({"ids": [str(error)]})
+
+
+class KanbanBoardViewSet(
+    ReorderMixin,
+    ConditionalGetMixin,
+    RowListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = KanbanBoard.objects.all()
+    lookup_value_regex = r"\d+"
+    serializer_class = KanbanBoardSnapshotSerializer
+    row_serializer_class = KanbanBoardRowSerializer
+    child_model = KanbanList
+    keyset = ("id",)
+
+    def get_serializer_class(self):
+        # A listing of boards leaves their lists and cards out.
+        if self.action == "list":
+            return KanbanBoardSerializer
+        return super().get_serializer_class()
+
+    def get_validators(self, request, *args, **kwargs):
+        if self.action == "list":
+            return None, None
+
+        current = snapshots.version(self.kwargs[self.lookup_field])
+        if current is None:
+            return None, None
+
+        version, updated_at = current
+        return f"board-{self.kwargs[self.lookup_field]}-{version}", updated_at
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(self.retrieve_snapshot, request, *args, **kwargs)
+
+    def retrieve_snapshot(self, request, *args, **kwargs):
+        def build():
+            # In one transaction, so that the rows cached are those of the
+            # version they are cached under.
+            with transaction.atomic():
+                board = self.get_object()
+                return board, snapshot_rows.serialize(board)
+
+        return Response(snapshots.get(self.kwargs[self.lookup_field], build))
+
+    @action(detail=True)
+    def changes(self, request, pk=None):
+        """
+        Return the changes to a board after the cursor `since`, or a
+        snapshot of the board if there is no cursor or if the changes
+        after it have been compacted away. Either way, the response
+        carries the cursor to sync from next time.
+        """
+
+        query = ChangesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        since = query.validated_data.get("since")
+
+        with transaction.atomic():
+            return Response(catch_up(self.get_object(), since))
+
+    @action(detail=True, methods=["post"])
+    def batch(self, request, pk=None):
+        """
+        Apply an ordered list of operations on the board and its lists and
+        cards, all in one transaction or none at all; see kanban.batch.
+        Returns one result per operation. As a reorder, a batch may carry
+        the `version` of the board it was made against.
+        """
+
+        board = self.get_object()
+
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        def apply():
+            expect_version(board.pk, data.get("version"))
+            results = Batch(board).run(data["operations"])
+            return versioned(Response({"results": results}), board.pk)
+
+        try:
+            return retrying(apply)
+        except VersionConflict as error:
+            return conflict(error, data.get("since"))
+        except BatchError as error:
+            raise ValidationError({"operations": {error.index: [error.message]}})
+
+    @action(detail=False, url_path="search", pagination_class=RankedPagination)
+    def search_boards(self, request):
+        """
+        Search the titles of every board for all the words of `?q=`, best
+        hits first, a page at a time; see kanban.search.
+        """
+
+        return self.paginated_hits(request, search.search_boards)
+
+    @action(detail=True, url_path="search", pagination_class=RankedPagination)
+    def search_cards(self, request, pk=None):
+        """
+        Search the cards of a board for all the words of `?q=`, best hits
+        first, a page at a time; see kanban.search.
+        """
+
+        board = self.get_object()
+        return self.paginated_hits(
+            request, lambda words: search.search_cards(board.pk, words)
+        )
+
+    def paginated_hits(self, request, hits):
+        query = SearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        page = self.paginate_queryset(hits(query.validated_data["q"]))
+        return self.get_paginated_response(page)
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[JSONLinesParser, CSVParser],
+    )
+    def import_cards(self, request, pk=None):
+        """
+        Append lists and cards to a board from a request body of JSON
+        Lines (application/jsonl) or CSV (text/csv); see kanban.bulk.
+        The body is parsed as a stream, never read whole.
+
+        As a reorder, an import may carry the `version` of the board it
+        was made against, and the client's cursor, `since`, in its query.
+        """
+
+        board = self.get_object()
+
+        query = ExpectedVersionSerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        version = query.validated_data.get("version")
+
+        formats = {
+            media_type: format for format, media_type in bulk.CONTENT_TYPES.items()
+        }
+        format = formats.get(request.content_type.split(";")[0].strip())
+        if format is None:
+            raise UnsupportedMediaType(request.content_type)
+
+        # Not retried: the body is read as the rows are imported.
+        lines = (line.decode("utf-8") for line in request.stream or ())
+        try:
+            with atomic_write():
+                expect_version(board.pk, version)
+                created_lists, imported_cards = bulk.import_rows(
+                    board, bulk.parse_rows(lines, format)
+                )
+                response = Response(
+                    {"lists": created_lists, "cards": imported_cards}, status=201
+                )
+                return versioned(response, board.pk)
+        except VersionConflict as error:
+            return conflict(error, query.validated_data.get("since"))
+        except ValueError as error:
+            raise ValidationError({"detail": str(error)})
+
+    @action(
+        detail=True,
+        url_path="export",
+        renderer_classes=[JSONLinesRenderer, CSVRenderer],
+    )
+    def export_cards(self, request, pk=None):
+        """
+        Stream a board's lists and cards as JSON Lines or CSV, as chosen
+        by the Accept header or `?format=jsonl|csv`; see kanban.bulk.
+        """
+
+        board = self.get_object()
+        format = request.accepted_renderer.format
+
+        response = StreamingHttpResponse(
+            bulk.render_rows(bulk.export_rows(board), format),
+            content_type=bulk.CONTENT_TYPES[format],
+        )
+        response[
+            "Content-Disposition"
+        ] = f'attachment; filename="board-{board.pk}.{format}"'
+        return response
+
+
+class KanbanListViewSet(ReorderMixin, viewsets.GenericViewSet):
+    queryset = KanbanList.objects.all()
+    lookup_value_regex = r"\d+"
+    child_model = KanbanCard
+
+
+class KanbanCardViewSet(RowListModelMixin, viewsets.GenericViewSet):
+    """
+    All cards, in list and then card order, optionally of one list only
+    (`?list=<id>`). Paged on the (kanban_list, ordinal) unique index.
+    """
+
+    queryset = KanbanCard.objects.all()
+    serializer_class = KanbanCardListingSerializer
+    row_serializer_class = KanbanCardListingRowSerializer
+    keyset = ("kanban_list", "ordinal")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        kanban_list = self.request.query_params.get("list")
+        if kanban_list is not None:
+            if not kanban_list.isdigit():
+                raise ValidationError({"list": ["A valid integer is required."]})
+            queryset = queryset.filter(kanban_list=kanban_list)
+
+        return queryset
+
+
+# The JSON reads of a board are served by async views on Django's async
+# ORM, so that slow clients do not pin a worker thread each. Requests for
+# other formats (e.g. the browsable API), and other methods, fall back to
+# the viewset above. Boards are readable by anyone, as in the viewset.
+
+browsable_board = KanbanBoardViewSet.as_view(
+    {"get": "retrieve"}, basename="kanbanboard", detail=True
+)
+browsable_board_changes = KanbanBoardViewSet.as_view(
+    {"get": "changes"},
+    basename="kanbanboard",
+    detail=True,
+    **KanbanBoardViewSet.changes.kwargs,
+)
+
+
+def serves_json(request):
+    """Whether a request is a read that the async views answer, in JSON."""
+
+    if request.method not in ("GET", "HEAD"):
+        return False
+
+    format = request.GET.get("format")
+    if format is not None:
+        return format == "json"
+    return "text/html" not in request.headers.get("Accept", "")
+
+
+def json_response(data, status=200):
+    return HttpResponse(
+        FastJSONRenderer().render(data), status=status, content_type="application/json"
+    )
+
+
+def not_found():
+    return json_response({"detail": "Not found."}, status=404)
+
+
+async def board_snapshot(request, pk):
+    """
+    The async twin of `KanbanBoardViewSet.retrieve`: a snapshot of a
+    board, from the same snapshot cache and with the same validators.
+    """
+
+    if not serves_json(request):
+        return await sync_to_async(browsable_board)(request, pk=pk)
+
+    current = await snapshots.aversion(pk)
+    if current is None:
+        return not_found()
+
+    version, updated_at = current
+    etag, last_modified = prepare_validators(
+        f"board-{pk}-{version}", updated_at, "json"
+    )
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+
+        async def build():
+            return await sync_to_async(read_board_and_snapshot)(pk)
+
+        try:
+            response = json_response(await snapshots.aget(pk, build))
+        except KanbanBoard.DoesNotExist:
+            return not_found()
+
+    return set_validators(response, etag, last_modified)
+
+
+async def board_changes(request, pk):
+    """The async twin of `KanbanBoardViewSet.changes`."""
+
+    if not serves_json(request):
+        return await sync_to_async(browsable_board_changes)(request, pk=pk)
+
+    query = ChangesQuerySerializer(data=request.GET)
+    if not query.is_valid():
+        return json_response(query.errors, status=400)
+    since = query.validated_data.get("since")
+
+    # The changes are read before the board, so that if they are being
+    # compacted away meanwhile, the board is read with its new
+    # compacted_through and a snapshot is sent instead.
+    if since is not None:
+        changes = [
+            change
+            async for change in KanbanChange.objects.filter(
+                kanban_board_id=pk, id__gt=since
+            )
+        ]
+
+    try:
+        board = await KanbanBoard.objects.only("compacted_through").aget(pk=pk)
+    except KanbanBoard.DoesNotExist:
+        return not_found()
+
+    if since is None or since < board.compacted_through:
+        return json_response(await sync_to_async(read_snapshot_and_cursor)(pk))
+
+    return json_response(
+        {
+            "cursor": changes[-1].id if changes else since,
+            "changes": KanbanChangeSerializer(changes, many=True).data,
+        }
+    )
+
+
+def read_board_and_snapshot(pk):
+    # In one transaction, so that the rows cached are those of the version
+    # they are cached under. The async ORM cannot hold a transaction.
+    with transaction.atomic():
+        board = KanbanBoard.objects.get(pk=pk)
+        return board, snapshot_rows.serialize(board)
+
+
+def read_snapshot_and_cursor(pk):
+    # The snapshot and the cursor are read in one transaction, so that
+    # they agree with each other.
+    with transaction.atomic():
+        board = KanbanBoard.objects.get(pk=pk)
+        return {
+            "cursor": KanbanChange.objects.cursor(board),
+            "snapshot": snapshot_rows.serialize(board),
+        }
+
+
+# CSRF checks are left to the viewset, as for any DRF view.
+board_snapshot.csrf_exempt = True
+board_changes.csrf_exempt = True
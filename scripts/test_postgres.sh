@@ -0,0 +1,22 @@
+#!/bin/sh
+# Run the test suite against a throwaway PostgreSQL cluster.
+#
+# Needs the PostgreSQL server binaries (initdb, pg_ctl) on PATH and
+# psycopg2 installed. Arguments are passed on to pytest, e.g.
+#
+#     scripts/test_postgres.sh kanban -x
+set -eu
+
+cluster=$(mktemp -d)
+trap 'pg_ctl -D "$cluster/data" -m immediate stop >/dev/null 2>&1 || true; rm -rf "$cluster"' EXIT
+
+initdb -D "$cluster/data" -U postgres --auth=trust >/dev/null
+# Listen on a Unix socket in the cluster's directory only.
+pg_ctl -D "$cluster/data" -l "$cluster/log" -w \
+    -o "-k $cluster -c listen_addresses=''" start >/dev/null
+
+DJANGO_DB_ENGINE=postgresql \
+DJANGO_DB_HOST="$cluster" \
+DJANGO_DB_USER=postgres \
+DJANGO_DB_NAME=postgres \
+    python -m pytest "$@"